@@ -63,7 +63,7 @@ CREATE TABLE `Document` (
   UNIQUE KEY `doc_id` (`doc_id`),
   UNIQUE KEY `doc_name` (`doc_name`),
   KEY `function_id` (`function_id`),
-  CONSTRAINT `document_ibfk_1` FOREIGN KEY (`function_id`) REFERENCES `func` (`id`)
+  CONSTRAINT `document_ibfk_1` FOREIGN KEY (`function_id`) REFERENCES `Func` (`id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=13 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -154,8 +154,8 @@ CREATE TABLE `Order_of_dismissal` (
   UNIQUE KEY `order_id` (`order_id`),
   KEY `spec_id` (`spec_id`),
   KEY `reas_id` (`reas_id`),
-  CONSTRAINT `order_of_dismissal_ibfk_1` FOREIGN KEY (`spec_id`) REFERENCES `specialist` (`id`) ON DELETE RESTRICT,
-  CONSTRAINT `order_of_dismissal_ibfk_2` FOREIGN KEY (`reas_id`) REFERENCES `dismissal_info` (`id`)
+  CONSTRAINT `order_of_dismissal_ibfk_1` FOREIGN KEY (`spec_id`) REFERENCES `Specialist` (`id`) ON DELETE RESTRICT,
+  CONSTRAINT `order_of_dismissal_ibfk_2` FOREIGN KEY (`reas_id`) REFERENCES `Dismissal_info` (`id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=45 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -169,6 +169,30 @@ INSERT INTO `Order_of_dismissal` VALUES (29,715,'2020-03-25','Неудобное
 /*!40000 ALTER TABLE `Order_of_dismissal` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `Order_of_dismissal_history`
+--
+
+DROP TABLE IF EXISTS `Order_of_dismissal_history`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `Order_of_dismissal_history` (
+  `id` int(11) NOT NULL,
+  `order_id` int(11) NOT NULL,
+  `order_date` date NOT NULL,
+  `true_reason` varchar(200) DEFAULT NULL,
+  `spec_id` int(11) NOT NULL,
+  `reas_id` int(11) NOT NULL,
+  `archived_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  KEY `spec_id` (`spec_id`),
+  KEY `reas_id` (`reas_id`),
+  KEY `order_date` (`order_date`),
+  CONSTRAINT `order_of_dismissal_history_ibfk_1` FOREIGN KEY (`spec_id`) REFERENCES `Specialist_history` (`id`) ON DELETE RESTRICT,
+  CONSTRAINT `order_of_dismissal_history_ibfk_2` FOREIGN KEY (`reas_id`) REFERENCES `Dismissal_info` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `Specialist`
 --
@@ -187,7 +211,7 @@ CREATE TABLE `Specialist` (
   PRIMARY KEY (`id`),
   UNIQUE KEY `spec_id` (`spec_id`),
   KEY `function_id` (`function_id`),
-  CONSTRAINT `specialist_ibfk_1` FOREIGN KEY (`function_id`) REFERENCES `func` (`id`) ON DELETE SET NULL
+  CONSTRAINT `specialist_ibfk_1` FOREIGN KEY (`function_id`) REFERENCES `Func` (`id`) ON DELETE SET NULL
 ) ENGINE=InnoDB AUTO_INCREMENT=20 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -201,6 +225,28 @@ INSERT INTO `Specialist` VALUES (1,237,'Елисеев Станислав Юли
 /*!40000 ALTER TABLE `Specialist` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `Specialist_history`
+--
+
+DROP TABLE IF EXISTS `Specialist_history`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `Specialist_history` (
+  `id` int(11) NOT NULL,
+  `spec_id` int(11) NOT NULL,
+  `spec_name` varchar(200) NOT NULL,
+  `birthday` date NOT NULL,
+  `start_date` date NOT NULL,
+  `end_date` date NOT NULL,
+  `function_id` int(11) DEFAULT NULL,
+  `archived_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  KEY `function_id` (`function_id`),
+  CONSTRAINT `specialist_history_ibfk_1` FOREIGN KEY (`function_id`) REFERENCES `Func` (`id`) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Temporary view structure for view `stuff_list`
 --
@@ -257,7 +303,7 @@ UNLOCK TABLES;
 /*!50001 SET collation_connection      = utf8mb4_general_ci */;
 /*!50001 CREATE ALGORITHM=UNDEFINED */
 /*!50013 DEFINER=`root`@`localhost` SQL SECURITY DEFINER */
-/*!50001 VIEW `exist_spec` AS select `f`.`struct_subdivision` AS `struct_subdivision`,`f`.`function_name` AS `function_name`,count(`sp`.`id`) AS `number_of_exist_spec` from (`func` `f` join `specialist` `sp` on((`f`.`id` = `sp`.`function_id`))) where (`sp`.`end_date` is null) group by `f`.`function_name` */;
+/*!50001 VIEW `exist_spec` AS select `f`.`struct_subdivision` AS `struct_subdivision`,`f`.`function_name` AS `function_name`,count(`sp`.`id`) AS `number_of_exist_spec` from (`Func` `f` join `Specialist` `sp` on((`f`.`id` = `sp`.`function_id`))) where (`sp`.`end_date` is null) group by `f`.`function_name` */;
 /*!50001 SET character_set_client      = @saved_cs_client */;
 /*!50001 SET character_set_results     = @saved_cs_results */;
 /*!50001 SET collation_connection      = @saved_col_connection */;
@@ -280,6 +326,42 @@ UNLOCK TABLES;
 /*!50001 SET character_set_results     = @saved_cs_results */;
 /*!50001 SET collation_connection      = @saved_col_connection */;
 
+--
+-- Final view structure for view `Order_of_dismissal_all`
+--
+
+/*!50001 DROP VIEW IF EXISTS `Order_of_dismissal_all`*/;
+/*!50001 SET @saved_cs_client          = @@character_set_client */;
+/*!50001 SET @saved_cs_results         = @@character_set_results */;
+/*!50001 SET @saved_col_connection     = @@collation_connection */;
+/*!50001 SET character_set_client      = utf8mb4 */;
+/*!50001 SET character_set_results     = utf8mb4 */;
+/*!50001 SET collation_connection      = utf8mb4_general_ci */;
+/*!50001 CREATE ALGORITHM=UNDEFINED */
+/*!50013 DEFINER=`root`@`localhost` SQL SECURITY DEFINER */
+/*!50001 VIEW `Order_of_dismissal_all` AS select `id` AS `id`,`order_id` AS `order_id`,`order_date` AS `order_date`,`true_reason` AS `true_reason`,`spec_id` AS `spec_id`,`reas_id` AS `reas_id` from `Order_of_dismissal` union all select `id` AS `id`,`order_id` AS `order_id`,`order_date` AS `order_date`,`true_reason` AS `true_reason`,`spec_id` AS `spec_id`,`reas_id` AS `reas_id` from `Order_of_dismissal_history` */;
+/*!50001 SET character_set_client      = @saved_cs_client */;
+/*!50001 SET character_set_results     = @saved_cs_results */;
+/*!50001 SET collation_connection      = @saved_col_connection */;
+
+--
+-- Final view structure for view `Specialist_all`
+--
+
+/*!50001 DROP VIEW IF EXISTS `Specialist_all`*/;
+/*!50001 SET @saved_cs_client          = @@character_set_client */;
+/*!50001 SET @saved_cs_results         = @@character_set_results */;
+/*!50001 SET @saved_col_connection     = @@collation_connection */;
+/*!50001 SET character_set_client      = utf8mb4 */;
+/*!50001 SET character_set_results     = utf8mb4 */;
+/*!50001 SET collation_connection      = utf8mb4_general_ci */;
+/*!50001 CREATE ALGORITHM=UNDEFINED */
+/*!50013 DEFINER=`root`@`localhost` SQL SECURITY DEFINER */
+/*!50001 VIEW `Specialist_all` AS select `id` AS `id`,`spec_id` AS `spec_id`,`spec_name` AS `spec_name`,`birthday` AS `birthday`,`start_date` AS `start_date`,`end_date` AS `end_date`,`function_id` AS `function_id` from `Specialist` union all select `id` AS `id`,`spec_id` AS `spec_id`,`spec_name` AS `spec_name`,`birthday` AS `birthday`,`start_date` AS `start_date`,`end_date` AS `end_date`,`function_id` AS `function_id` from `Specialist_history` */;
+/*!50001 SET character_set_client      = @saved_cs_client */;
+/*!50001 SET character_set_results     = @saved_cs_results */;
+/*!50001 SET collation_connection      = @saved_col_connection */;
+
 --
 -- Final view structure for view `stuff_list`
 --
@@ -293,7 +375,7 @@ UNLOCK TABLES;
 /*!50001 SET collation_connection      = utf8mb4_general_ci */;
 /*!50001 CREATE ALGORITHM=UNDEFINED */
 /*!50013 DEFINER=`root`@`localhost` SQL SECURITY DEFINER */
-/*!50001 VIEW `stuff_list` AS select `f`.`struct_subdivision` AS `struct_subdivision`,`f`.`function_name` AS `function_name`,floor(ceiling((sum(((`d`.`number` * `d`.`period`) * `d`.`time`)) / `wti`.`hour_year`))) AS `number_of_spec`,`f`.`salary` AS `salary` from ((`func` `f` join `document` `d` on((`f`.`id` = `d`.`function_id`))) join `work_time_info` `wti` on((`wti`.`current_year` = '2023'))) group by `f`.`function_name` order by `f`.`function_name` */;
+/*!50001 VIEW `stuff_list` AS select `f`.`struct_subdivision` AS `struct_subdivision`,`f`.`function_name` AS `function_name`,floor(ceiling((sum(((`d`.`number` * `d`.`period`) * `d`.`time`)) / `wti`.`hour_year`))) AS `number_of_spec`,`f`.`salary` AS `salary` from ((`Func` `f` join `Document` `d` on((`f`.`id` = `d`.`function_id`))) join `Work_time_info` `wti` on((`wti`.`current_year` = '2023'))) group by `f`.`function_name` order by `f`.`function_name` */;
 /*!50001 SET character_set_client      = @saved_cs_client */;
 /*!50001 SET character_set_results     = @saved_cs_results */;
 /*!50001 SET collation_connection      = @saved_col_connection */;
@@ -0,0 +1,97 @@
+-- Схема базы данных olimp для встроенного движка SQLite.
+-- Соответствует OlimpDBextended.sql (MySQL), выполняется автоматически при первом подключении.
+
+PRAGMA foreign_keys = OFF;
+
+CREATE TABLE IF NOT EXISTS Dismissal_info (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  reason_id int NOT NULL UNIQUE,
+  short_reason varchar(100) NOT NULL UNIQUE,
+  full_reason varchar(200) NOT NULL UNIQUE
+);
+
+INSERT OR IGNORE INTO Dismissal_info VALUES (1,3,'пт. 3 ст.77 ТК РФ','Расторжение трудового договора по инициативе работника'),(2,2,'пт.10 ст.77 ТК РФ','Обстоятельства, не зависящие от воли сторон'),(3,5,'пт. 5 ст.81 ТК РФ','Неоднократное неисполнение работником трудовых обязанностей'),(4,6,'пт. 6а ст.81 ТК РФ','Однократное грубое нарушение работником трудовых обязанностей: прогул');
+
+CREATE TABLE IF NOT EXISTS Func (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  function_id int NOT NULL,
+  function_name varchar(100) NOT NULL UNIQUE,
+  struct_subdivision varchar(100) NOT NULL,
+  salary float NOT NULL,
+  UNIQUE (function_id, function_name)
+);
+
+INSERT OR IGNORE INTO Func VALUES (6,21229,'Главный технолог','Отдел главного технолога',50000),(21,13383,'Заместитель директора','Администрация',45000),(22,13900,'Главный бухгалтер','Бухгалтерия',32000),(23,11518,'Бухгалтер','Бухгалтерия',45000),(24,13597,'Начальний отдела кадров','Отдел кадров',25000),(25,12454,'Ведущий бухгалтер','Бухгалтерия',45000),(26,13481,'Менеджер отдела закупок','Отдел закупок',35000),(27,13825,'Начальник отдела закупок','Отдел закупок',25000),(28,14956,'Специалист по кадрам','Отдел кадров',35000),(29,11993,'Главный инженер','Администрация',45000),(30,15429,'Офис-менеджер','Администрация',25000),(31,15005,'Инженер по охране труда','Отдел кадров',32000),(32,13803,'Начальник склада','Склад',45000),(33,13385,'Кладовщик','Склад',35000),(34,13901,'Инспектор','Администрация',45000),(38,22222,'Разнорабочий','Склад',32000);
+
+CREATE TABLE IF NOT EXISTS Document (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  doc_id int NOT NULL UNIQUE,
+  doc_name varchar(100) NOT NULL UNIQUE,
+  time float NOT NULL,
+  number int NOT NULL,
+  period float NOT NULL,
+  function_id int DEFAULT NULL REFERENCES Func (id)
+);
+CREATE INDEX IF NOT EXISTS document_function_id ON Document (function_id);
+
+INSERT OR IGNORE INTO Document VALUES (7,632,'График разработки ППР',8.5,3,1,6),(8,624,'ППР',70,3,1,6),(9,635,'ПОС',80,3,1,6),(10,610,'Технологические карты',75,1,0.2,6);
+
+CREATE TABLE IF NOT EXISTS Specialist (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  spec_id int NOT NULL UNIQUE,
+  spec_name varchar(200) NOT NULL,
+  birthday date NOT NULL,
+  start_date date NOT NULL,
+  end_date date DEFAULT NULL,
+  function_id int DEFAULT NULL REFERENCES Func (id) ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS specialist_function_id ON Specialist (function_id);
+
+INSERT OR IGNORE INTO Specialist VALUES (1,237,'Елисеев Станислав Юлианович','1986-05-27','2002-02-01',NULL,6),(2,173,'Русаков В.В.','1988-02-15','2007-04-29','2020-03-25',21),(3,212,'Савельев О.О.','1992-04-01','2003-05-08','2021-04-08',22),(4,236,'Самсонов Д.Е.','1985-03-18','2008-12-20','2022-04-16',23),(5,216,'Сидоров К.К.','1982-10-24','2009-02-01','2021-02-25',24),(6,243,'Снитко А.П','1977-11-13','2015-10-20','2022-05-27',25),(7,241,'Тимофеев А.П.','1988-08-11','2016-12-14','2020-06-16',26),(8,217,'Титов Р.К.','1990-12-01','2020-08-06','2021-06-30',27),(9,203,'Третьяков В.Д.','1985-02-16','2014-03-14','2020-07-21',28),(10,227,'Третьяков М.В.','1986-04-17','2014-08-25','2022-07-28',29),(11,239,'Трофимов Л.Е.','1982-12-25','2009-01-08','2021-08-23',30),(12,221,'Уланов Г.Г.','1986-10-04','2010-08-13','2022-08-25',31),(13,225,'Ульянов П.В.','1986-05-11','2018-04-21','2020-08-30',32),(14,201,'Федосеев П.Р.','1979-12-25','2013-03-03','2022-09-17',33),(15,200,'Фролов А.Д.','1988-02-15','2007-04-29','2015-09-20',34);
+
+CREATE TABLE IF NOT EXISTS Order_of_dismissal (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  order_id int NOT NULL UNIQUE,
+  order_date date NOT NULL,
+  true_reason varchar(200) DEFAULT NULL,
+  spec_id int NOT NULL REFERENCES Specialist (id) ON DELETE RESTRICT,
+  reas_id int NOT NULL REFERENCES Dismissal_info (id)
+);
+CREATE INDEX IF NOT EXISTS order_of_dismissal_spec_id ON Order_of_dismissal (spec_id);
+CREATE INDEX IF NOT EXISTS order_of_dismissal_reas_id ON Order_of_dismissal (reas_id);
+
+INSERT OR IGNORE INTO Order_of_dismissal VALUES (29,715,'2020-03-25','Неудобное местоположение',2,3),(30,720,'2021-04-08',NULL,3,4),(31,717,'2022-04-16','Недовольство начальником',4,1),(32,723,'2021-02-25','Маленькая зарплата',5,1),(33,724,'2022-05-27',NULL,6,3),(34,725,'2020-06-16','Недовольство начальником',7,1),(35,721,'2021-06-30',NULL,8,4),(36,718,'2020-07-21','Маленькая зарплата',9,1),(37,716,'2022-07-28',NULL,10,2),(38,719,'2021-08-23',NULL,11,2),(39,722,'2022-08-25','Маленькая зарплата',12,1),(40,728,'2020-08-30',NULL,13,3),(41,726,'2022-09-17',NULL,14,3),(42,727,'2015-09-20','Недовольство начальником',15,1);
+
+CREATE TABLE IF NOT EXISTS Work_time_info (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  current_year int NOT NULL UNIQUE,
+  hour_year int NOT NULL,
+  hour_day int NOT NULL DEFAULT 8,
+  day_year int NOT NULL
+);
+
+INSERT OR IGNORE INTO Work_time_info VALUES (1,2023,1976,8,247);
+
+CREATE VIEW IF NOT EXISTS Exist_spec AS
+SELECT f.struct_subdivision, f.function_name, count(sp.id) AS number_of_exist_spec
+FROM Func AS f
+JOIN Specialist AS sp ON f.id=sp.function_id
+WHERE sp.end_date IS NULL
+GROUP BY f.function_name;
+
+CREATE VIEW IF NOT EXISTS Stuff_list AS
+SELECT f.struct_subdivision, f.function_name, floor(ceil(sum(d.number * d.period * d.time)
+/ wti.hour_year)) AS number_of_spec, f.salary
+FROM Func AS f
+JOIN Document AS d ON f.id=d.function_id
+JOIN Work_time_info AS wti ON wti.current_year=2023
+GROUP BY f.function_name
+ORDER BY f.function_name;
+
+CREATE VIEW IF NOT EXISTS Missing_unit_info AS
+SELECT sl.struct_subdivision, sl.function_name, sl.number_of_spec, es.number_of_exist_spec,
+(sl.number_of_spec - es.number_of_exist_spec) AS deviation
+FROM Stuff_list AS sl
+JOIN Exist_spec AS es ON sl.function_name=es.function_name;
+
+PRAGMA foreign_keys = ON;
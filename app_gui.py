@@ -1,11 +1,24 @@
 from abc import ABC
+from collections import OrderedDict
 from datetime import datetime
+from functools import partial
 import traceback
 from PyQt5 import QtWidgets as qtw, QtCore as qtc, QtGui as qtg
-from PyQt5.QtPrintSupport import QPrintDialog, QPrinter, QPrintPreviewDialog
-from documents import DocumentHandler, DataHandler, Subdivision, Documents, Units, DismissalOrder, DismissalInfo, TimeInfo
+from PyQt5.QtPrintSupport import QAbstractPrintDialog, QPrintDialog, QPrinter
+from config import ARCHIVE_AFTER_YEARS, SYNC_INTERVAL
+from documents import DocumentHandler, DataHandler, Subdivision, Documents, Units, DismissalOrder, DismissalInfo, TimeInfo, \
+    ChangeLog, QueryControl, RESULT_CACHE, peek_cached, prefetch
+from records import Record, format_value
+from typing import Callable, TYPE_CHECKING
 import sys
-import pandas as pd
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from print_layout import TablePageLayout
+
+# Разрешение изображений, добавляемых в экспортируемые документы, и ширина изображения в pdf.
+EXPORT_DPI = 200
+CHART_WIDTH = 600
 
 
 class MainWindow(qtw.QMainWindow):
@@ -26,12 +39,21 @@ class MainWindow(qtw.QMainWindow):
         self.open_action = self.file_menu.addAction("Открыть")
         self.save_as_pdf_action = self.file_menu.addAction("Сохранить как PDF")
         self.save_as_xlsx_action = self.file_menu.addAction("Сохранить как XLSX")
+        self.print_preview_action = self.file_menu.addAction("Предварительный просмотр")
+        self.print_action = self.file_menu.addAction("Печать")
+        self.print_action.setShortcut("Ctrl+P")
+        self.export_pareto_action = self.file_menu.addAction("Экспорт диаграмм Парето за период")
+        self.export_all_action = self.file_menu.addAction("Экспорт всех документов в XLSX")
+        self.export_table_action = self.file_menu.addAction("Экспорт таблицы в CSV/Parquet")
         self.file_menu.addSeparator()
         self.exit_action = self.file_menu.addAction("Закрыть")
         self.exit_action.setShortcut("Ctrl+Q")
         self.edit_menu = self.menu_bar.addMenu("Правка")
         self.add_row = self.edit_menu.addAction("Добавить строку")
         self.del_row = self.edit_menu.addAction("Удалить строку")
+        self.edit_menu.addSeparator()
+        self.scenario_action = self.edit_menu.addAction("Моделирование штатного расписания")
+        self.archive_action = self.edit_menu.addAction("Перенести уволенных сотрудников в архив")
         self.view_menu = self.menu_bar.addMenu("Вид")
         self.documents_view = self.view_menu.addAction("Список документов")
         self.documents_view.setCheckable(True)
@@ -44,8 +66,15 @@ class MainWindow(qtw.QMainWindow):
         self.documents_view.triggered.connect(self.show_document_list)
         self.save_as_pdf_action.triggered.connect(self.save_pdf)
         self.save_as_xlsx_action.triggered.connect(self.save_xlsx)
+        self.print_preview_action.triggered.connect(self.print_preview)
+        self.print_action.triggered.connect(self.print_document)
+        self.export_pareto_action.triggered.connect(self.export_pareto_diagrams)
+        self.export_all_action.triggered.connect(self.export_all_reports)
+        self.export_table_action.triggered.connect(self.export_table_data)
         self.add_row.triggered.connect(self.add_new_data)
         self.del_row.triggered.connect(self.del_cur_row)
+        self.scenario_action.triggered.connect(self.open_scenario)
+        self.archive_action.triggered.connect(self.archive_dismissed)
 
         # Создание центральной части интерфейса.
         self.main_screen = qtw.QWidget()
@@ -54,6 +83,18 @@ class MainWindow(qtw.QMainWindow):
         self.main_screen.setLayout(self.layout)
         self.title_label = qtw.QLabel("Choose your destiny!")
         self.table = qtw.QTableWidget()
+        # Строки открытой таблицы в исходных типах (для редактируемых таблиц - записи records.py) в порядке вывода.
+        self.table_rows = []
+        # Столбец и порядок (по убыванию или нет) последней сортировки таблицы нажатием на заголовок.
+        self.table_sort = None
+        self.table.horizontalHeader().setSectionsClickable(True)
+        self.table.horizontalHeader().sectionClicked.connect(self.sort_table)
+        # Документ формируется в фоновом потоке, кнопка останавливает выполняемые для него запросы.
+        self.report_control = None
+        self.cancel_report_button = qtw.QPushButton("Остановить формирование")
+        self.cancel_report_button.setFixedWidth(200)
+        self.cancel_report_button.setHidden(True)
+        self.cancel_report_button.clicked.connect(self.cancel_report)
         self.create_pareto_diagram_button = qtw.QPushButton("Построить диаграмму")
         self.create_pareto_diagram_button.setFixedWidth(200)
         self.sort_year_widget = qtw.QWidget()
@@ -66,8 +107,13 @@ class MainWindow(qtw.QMainWindow):
         self.sort_year_widget.layout().addWidget(self.sort_year_button)
         self.sort_year_widget.setHidden(True)
         self.sort_year_button.setEnabled(False)
+        self.chart_label = qtw.QLabel()
+        self.chart_label.setAlignment(qtc.Qt.AlignCenter)
+        self.chart_label.setHidden(True)
         self.layout.addWidget(self.title_label)
+        self.layout.addWidget(self.cancel_report_button)
         self.layout.addWidget(self.table)
+        self.layout.addWidget(self.chart_label)
         self.layout.addWidget(self.sort_year_widget)
         self.layout.addWidget(self.create_pareto_diagram_button)
         self.layout.setAlignment(qtc.Qt.AlignCenter)
@@ -109,11 +155,160 @@ class MainWindow(qtw.QMainWindow):
         self.data_widget.data_signal.connect(self.take_data)
         self.create_pareto_diagram_button.clicked.connect(self.create_pareto_diagram)
         self.sort_year_signal.connect(self.take_doc_data)
+        self.settings = qtc.QSettings("MGSU", "Olimp")
+        self.sync_version = None
+        self.sync_running = False
+        self.sync_timer = qtc.QTimer(self)
+        self.sync_timer.timeout.connect(self.poll_changes)
         self.show()
+        qtc.QTimer.singleShot(0, self.start_warm_up)
+        if SYNC_INTERVAL > 0:
+            self.poll_changes()
+            self.sync_timer.start(int(SYNC_INTERVAL * 1000))
+
+    def poll_changes(self) -> None:
+        """
+        Запрашивает в фоновом потоке изменения, сделанные другими пользователями после последнего опроса.
+        :return: None
+        """
+        if self.sync_running:
+            return
+        self.sync_running = True
+        worker = Worker(ChangeLog.pull, self.sync_version)
+        worker.signals.result.connect(self.apply_changes)
+        worker.signals.error.connect(print)
+        worker.signals.finished.connect(lambda: setattr(self, "sync_running", False))
+        qtc.QThreadPool.globalInstance().start(worker)
+
+    def apply_changes(self, result: tuple[int, dict]) -> None:
+        """
+        Обновляет изменённые строки в открытой таблице. Если изменились таблицы, данные из которых выводятся
+        в открытой таблице (например, наименование должности для таблицы "Документы"), или журнал изменений
+        сокращён после прошлого опроса (changes is None), таблица загружается заново.
+        :param result: tuple[int, dict | None]
+        :return: None
+        """
+        self.sync_version, changes = result
+        text = self.title_label.text()
+        if changes is None and text in DataHandler.names:
+            self.take_data(text)
+            return
+        if not changes or text not in DataHandler.names:
+            return
+        data_list = DataHandler().data_list
+        changed_tables = {data_list[name].table for name in changes}
+        if changed_tables & set(getattr(data_list[text], "depends_on", ())):
+            self.take_data(text)
+            return
+        for row_key, rows in changes.get(text, ()):
+            self.update_rows(text, rows, row_key)
+
+    def start_warm_up(self) -> None:
+        """
+        Запускает в фоновом потоке подключение к базе и предварительную загрузку справочников и последнего
+        открытого документа, чтобы первое действие пользователя не ожидало подключения.
+        :return: None
+        """
+        last_table = self.settings.value("last_table", "")
+        restored = self.restore_table(last_table)
+        worker = Worker(prefetch, (last_table,) if last_table and not restored else ())
+        worker.signals.error.connect(lambda error: print("Ошибка предварительной загрузки:", error))
+        qtc.QThreadPool.globalInstance().start(worker)
+
+    @staticmethod
+    def table_source(text: str) -> Callable | None:
+        """
+        Возвращает метод получения данных таблицы или документа с переданным наименованием.
+        :param text: str
+        :return: Callable | None
+        """
+        if text in DataHandler.names:
+            return DataHandler().data_list[text].show
+        return DocumentHandler().doc_func_dict.get(text)
+
+    def restore_table(self, text: str) -> bool:
+        """
+        Сразу показывает таблицу или документ из постоянного кэша и запускает в фоновом потоке проверку данных,
+        после которой таблица обновляется, если данные в базе изменились. Возвращает False, если данных в кэше нет.
+        :param text: str
+        :return: bool
+        """
+        source = self.table_source(text)
+        cached = peek_cached(source) if source is not None else None
+        if not cached or not cached[1]:
+            return False
+        self.fill_table(*cached, text)
+        worker = Worker(source)
+        worker.signals.result.connect(partial(self.revalidate_table, text, cached))
+        worker.signals.error.connect(print)
+        qtc.QThreadPool.globalInstance().start(worker)
+        return True
+
+    def revalidate_table(self, text: str, cached: tuple, data: tuple) -> None:
+        """
+        Заменяет показанные из кэша данные актуальными, если они различаются и таблица всё ещё открыта.
+        :param text: str
+        :param cached: tuple
+        :param data: tuple
+        :return: None
+        """
+        if self.title_label.text() == text and data != cached and data[1]:
+            self.fill_table(*data, text)
 
     def refresh_data_in_table(self):
+        RESULT_CACHE.clear()
         self.take_data(self.title_label.text())
 
+    def reload_table(self) -> None:
+        """
+        Заново загружает открытую таблицу или документ после изменения данных в базе.
+        :return: None
+        """
+        text = self.title_label.text()
+        if text in DataHandler.names:
+            self.take_data(text)
+        elif text in DocumentHandler().doc_func_dict:
+            self.take_doc_data(text, self.sorted_year)
+
+    def open_scenario(self) -> None:
+        """
+        Запрашивает год и открывает окно моделирования штатного расписания.
+        :return: None
+        """
+        from scenario import StaffingScenario
+
+        year, ok = qtw.QInputDialog.getText(self, "Моделирование штатного расписания", "Введите год:",
+                                            text=str(datetime.now().year + 1))
+        if not ok or not year:
+            return
+        try:
+            scenario = StaffingScenario.load(year)
+        except ValueError as e:
+            qtw.QMessageBox.information(self, "Внимание!", str(e), qtw.QMessageBox.Ok)
+            return
+        self.scenario_widget = ScenarioWidget(scenario)
+        self.scenario_widget.committed.connect(self.reload_table)
+
+    def archive_dismissed(self) -> None:
+        """
+        Запрашивает количество лет после увольнения и переносит давно уволенных сотрудников и их приказы
+        в архивные таблицы в фоновом потоке. Архивные данные остаются в документах об увольнениях.
+        :return: None
+        """
+        from archive import archive_cutoff, archive_dismissed
+
+        years, ok = qtw.QInputDialog.getInt(self, "Архив сотрудников", "Уволенные более лет назад:",
+                                            ARCHIVE_AFTER_YEARS, 0, 100)
+        if not ok:
+            return
+        worker = Worker(archive_dismissed, archive_cutoff(years))
+        worker.signals.result.connect(lambda counts: qtw.QMessageBox.information(
+            self, "Архив сотрудников", f"Перенесено сотрудников: {counts[0]}, приказов: {counts[1]}",
+            qtw.QMessageBox.Ok))
+        worker.signals.result.connect(lambda counts: self.reload_table())
+        worker.signals.error.connect(print)
+        qtc.QThreadPool.globalInstance().start(worker)
+
     @property
     def label_to_object_dict(self) -> dict:
         """
@@ -136,8 +331,7 @@ class MainWindow(qtw.QMainWindow):
         for col in range(model.columnCount()):
             headers.append(model.headerData(col, qtc.Qt.Horizontal))
         self.dialog_widget = self.label_to_object_dict[self.title_label.text()](headers)
-        # self.dialog_widget.closed.connect(self.refresh_data_in_table)
-
+        self.dialog_widget.submitted.connect(partial(self.update_rows, self.title_label.text()))
 
     def edit_cur_row(self) -> None:
         """
@@ -154,9 +348,9 @@ class MainWindow(qtw.QMainWindow):
         for col in range(model.columnCount()):
             headers.append(model.headerData(col, qtc.Qt.Horizontal))
 
-        row_data = [model.index(cur_row, i).data() for i in range(model.columnCount())]
-        self.dialog_widget = self.label_to_object_dict[self.title_label.text()](headers=headers, row_data=row_data)
-        self.take_data(self.title_label.text())
+        self.dialog_widget = self.label_to_object_dict[self.title_label.text()](headers=headers,
+                                                                                 row_data=self.table_rows[cur_row])
+        self.dialog_widget.submitted.connect(partial(self.update_rows, self.title_label.text()))
 
     def del_cur_row(self) -> None:
         """
@@ -171,9 +365,87 @@ class MainWindow(qtw.QMainWindow):
             msg = self.question_message_pop()
             if msg == qtw.QMessageBox.Cancel:
                 return
-        some_data = self.table.model().index(cur_row, 0).data()
-        DataHandler().data_list[self.title_label.text()].del_data(some_data)
-        self.take_data(self.title_label.text())
+        DataHandler().data_list[self.title_label.text()].del_data(self.table_rows[cur_row][0])
+        self.table.removeRow(cur_row)
+        del self.table_rows[cur_row]
+
+    def update_rows(self, text: str, rows: list[Record], old_key: int | str | None) -> None:
+        """
+        Обновляет в таблице только изменённые строки, не перезагружая документ: заменяет строку с ключом old_key
+        или добавляет новые строки. Строки ставятся на место, которое они заняли бы при сортировке таблицы
+        пользователем или в запросе документа (ChangeLog.row_position); в таблицах без сортировки изменённая
+        строка остаётся на месте, новые добавляются в конец. Положение прокрутки и выделение сохраняются.
+        :param text: str
+        :param rows: list[Record]
+        :param old_key: int | str | None
+        :return: None
+        """
+        if self.title_label.text() != text:
+            return
+        obj = DataHandler().data_list.get(text)
+        row_num = self.find_row(old_key) if old_key is not None else -1
+        if row_num != -1:
+            if len(rows) == 1 and ChangeLog.row_position(obj, self.table_rows, rows[0], self.table_sort) is None:
+                self.set_row(row_num, rows[0])
+                return
+            self.table.removeRow(row_num)
+            del self.table_rows[row_num]
+        for data_row in rows:
+            row_num = ChangeLog.row_position(obj, self.table_rows, data_row, self.table_sort)
+            if row_num is None:
+                row_num = len(self.table_rows)
+            self.table.insertRow(row_num)
+            self.table_rows.insert(row_num, data_row)
+            self.set_row(row_num, data_row)
+
+    def find_row(self, key: int | str) -> int:
+        """
+        Возвращает номер строки таблицы, в первом столбце которой находится key, или -1.
+        :param key: int | str
+        :return: int
+        """
+        for item in self.table.findItems(str(key), qtc.Qt.MatchExactly):
+            if item.column() == 0:
+                return item.row()
+        return -1
+
+    def set_row(self, row_num: int, data_row: tuple) -> None:
+        """
+        Заполняет строку таблицы значениями из базы. Значения записей выводятся в формате столбцов их схемы,
+        сама строка сохраняется в table_rows без преобразования.
+        :param row_num: int
+        :param data_row: tuple
+        :return: None
+        """
+        if row_num == len(self.table_rows):
+            self.table_rows.append(data_row)
+        else:
+            self.table_rows[row_num] = data_row
+        if isinstance(data_row, Record):
+            for i in range(len(data_row)):
+                self.table.setItem(row_num, i, qtw.QTableWidgetItem(data_row.text(i)))
+        else:
+            for i, element in enumerate(data_row):
+                self.table.setItem(row_num, i, qtw.QTableWidgetItem(format_value(element)))
+
+    def sort_table(self, column: int) -> None:
+        """
+        Сортирует строки редактируемой таблицы по столбцу column с ключом сортировки из схемы записей.
+        Повторное нажатие на заголовок того же столбца меняет порядок сортировки.
+        :param column: int
+        :return: None
+        """
+        if not self.table_rows or not isinstance(self.table_rows[0], Record):
+            return
+        descending = self.table_sort == (column, False)
+        self.table_sort = (column, descending)
+        sort_key = self.table_rows[0].columns[column].sort_key
+        rows = sorted(self.table_rows, key=lambda row: sort_key(row[column]), reverse=descending)
+        for row_num, data_row in enumerate(rows):
+            self.set_row(row_num, data_row)
+        header = self.table.horizontalHeader()
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(column, qtc.Qt.DescendingOrder if descending else qtc.Qt.AscendingOrder)
 
     @classmethod
     def question_message_pop(cls) -> int:
@@ -253,6 +525,9 @@ class MainWindow(qtw.QMainWindow):
         self.title_label.setText(text)
         self.table.clear()
         self.table.setRowCount(0)
+        self.table_rows = []
+        self.table_sort = None
+        self.table.horizontalHeader().setSortIndicatorShown(False)
         column_number = len(doc_data[0])
         self.table.setColumnCount(column_number)
         self.table.setHorizontalHeaderLabels(headers)
@@ -263,14 +538,12 @@ class MainWindow(qtw.QMainWindow):
         for data_row in doc_data:
             row_num = self.table.rowCount()
             self.table.insertRow(row_num)
-            for i, element in enumerate(data_row):
-                if element is None:
-                    element = ''
-                self.table.setItem(row_num, i, qtw.QTableWidgetItem(str(element)))
+            self.set_row(row_num, data_row)
         # index = self.table.model().index(self.table.rowCount()-1, 0)
         self.table.scrollToBottom()
         # self.table.scrollToItem(self.table.item(self.table.rowCount(), 0), qtw.QAbstractItemView.PositionAtCenter)
-        if self.title_label.text() in ("Штатное расписание", "Анкета", "Диаграмма Парето"):
+        if self.title_label.text() in ("Штатное расписание", "Штатное расписание по годам", "Анкета", "Диаграмма Парето",
+                                       "Текучесть кадров", "Форма справки о недостающих кадрах"):
             self.sort_year_widget.setHidden(False)
             self.sort_year_line.clear()
         else:
@@ -279,6 +552,7 @@ class MainWindow(qtw.QMainWindow):
             self.create_pareto_diagram_button.setHidden(False)
         else:
             self.create_pareto_diagram_button.setHidden(True)
+        self.chart_label.setHidden(True)
         if self.title_label.text() in DataHandler.names:
             self.data_manage_button_widget.setHidden(False)
         else:
@@ -299,124 +573,458 @@ class MainWindow(qtw.QMainWindow):
             print(f"Здесь ошибка", e)
         else:
             self.fill_table(headers, doc_data, text)
+            self.settings.setValue("last_table", text)
 
     def take_doc_data(self, text: str, year: str | None = None) -> None:
         """
-        Получает данные документа из базы по выбранному названию и вызывает метод fill_table для заполнения таблицы
-        в интерфейсе программы. При наличии введённого года фильтрует записи.
+        Запускает в фоновом потоке получение данных документа из базы по выбранному названию, после которого
+        таблица заполняется методом show_doc_data. При наличии введённого года фильтрует записи. Запросы документа
+        ограничены по времени (DocumentHandler.report_timeout), формирование можно остановить кнопкой.
+        Незавершённое формирование предыдущего документа останавливается.
         :param text: str
         :param year: str | None = None
         :return: None
         """
-        try:
-            if year:
-                data = DocumentHandler().doc_func_dict[text](year)
-                self.sorted_year = year
-            else:
-                data = DocumentHandler().doc_func_dict[text]()
-                self.sorted_year = None
-            headers = data[0]
-            doc_data = data[1]
-        except KeyError as e:
-            traceback.print_exc()
-        else:
-            self.fill_table(headers, doc_data, text)
+        func = DocumentHandler().doc_func_dict.get(text)
+        if func is None:
+            print("Неизвестный документ", text)
+            return
+        self.sorted_year = year or None
+        self.cancel_report()
+        control = QueryControl(DocumentHandler.report_timeout(func))
+        self.report_control = control
+        self.cancel_report_button.setEnabled(True)
+        self.cancel_report_button.setHidden(False)
+        worker = Worker(control.call, func, *((year,) if year else ()))
+        worker.signals.result.connect(partial(self.show_doc_data, control, text))
+        worker.signals.error.connect(partial(self.report_failed, control))
+        worker.signals.finished.connect(partial(self.report_finished, control))
+        qtc.QThreadPool.globalInstance().start(worker)
+
+    def show_doc_data(self, control: QueryControl, text: str, data: tuple) -> None:
+        """
+        Заполняет таблицу данными документа, если за это время не был запрошен другой документ.
+        :param control: QueryControl
+        :param text: str
+        :param data: tuple
+        :return: None
+        """
+        if control is not self.report_control:
+            return
+        headers, doc_data = data
+        self.fill_table(headers, doc_data, text)
+        self.settings.setValue("last_table", text)
+
+    def report_failed(self, control: QueryControl, error: str) -> None:
+        """
+        Сообщает о превышении ограничения времени запросов документа. Остановленное пользователем формирование
+        ошибкой не считается, остальные ошибки выводятся в консоль.
+        :param control: QueryControl
+        :param error: str
+        :return: None
+        """
+        if control.timed_out and control is self.report_control:
+            qtw.QMessageBox.information(self, "Внимание!",
+                                        f"Документ формировался дольше {control.timeout:g} с, запрос остановлен.",
+                                        qtw.QMessageBox.Ok)
+        elif not control.cancelled:
+            print(error)
+
+    def export_failed(self, error: str) -> None:
+        """
+        Сообщает пользователю об ошибке экспорта, выполнявшегося в фоновом потоке. Полный текст ошибки
+        выводится в консоль.
+        :param error: str - текст ошибки с трассировкой (см. Worker)
+        :return: None
+        """
+        print(error)
+        message = error.strip().splitlines()[-1] if error.strip() else "Неизвестная ошибка"
+        if "pyarrow" in message:
+            message += "\nДля экспорта в Parquet установите пакет pyarrow (pip install -r requirements.txt)."
+        qtw.QMessageBox.warning(self, "Ошибка экспорта", f"Не удалось выполнить экспорт:\n{message}",
+                                qtw.QMessageBox.Ok)
+
+    def report_finished(self, control: QueryControl) -> None:
+        """
+        Скрывает кнопку остановки после завершения формирования текущего документа.
+        :param control: QueryControl
+        :return: None
+        """
+        if control is self.report_control:
+            self.report_control = None
+            self.cancel_report_button.setHidden(True)
+
+    def cancel_report(self) -> None:
+        """
+        Останавливает формирование текущего документа: выполняемые запросы прерываются на сервере,
+        подключения возвращаются в пул. Запросы прерываются в отдельных потоках (не в пуле потоков, который
+        может быть занят самим документом), поэтому интерфейс не ожидает сервер.
+        :return: None
+        """
+        if self.report_control is not None:
+            self.cancel_report_button.setEnabled(False)
+            try:
+                self.report_control.cancel()
+            except Exception:
+                traceback.print_exc()
 
     def create_pareto_diagram(self) -> None:
         """
-        Отправляет запрос на создание диаграммы Парето.
+        Отправляет запрос на создание диаграммы Парето. Изображение строится в фоновом потоке и выводится
+        под таблицей методом show_pareto_diagram.
         :return: None
         """
-        if self.sorted_year:
-            DocumentHandler.create_pareto_diagram(self.sorted_year)
-        else:
-            DocumentHandler.create_pareto_diagram()
+        args = (self.sorted_year,) if self.sorted_year else ()
+        self.create_pareto_diagram_button.setEnabled(False)
+        worker = Worker(DocumentHandler.create_pareto_diagram, *args)
+        worker.signals.result.connect(self.show_pareto_diagram)
+        worker.signals.error.connect(print)
+        worker.signals.finished.connect(lambda: self.create_pareto_diagram_button.setEnabled(True))
+        qtc.QThreadPool.globalInstance().start(worker)
+
+    def show_pareto_diagram(self, image: bytes) -> None:
+        """
+        Выводит построенное изображение диаграммы Парето, если пользователь не перешёл к другому документу.
+        :param image: bytes
+        :return: None
+        """
+        if self.title_label.text() != "Диаграмма Парето":
+            return
+        pixmap = qtg.QPixmap()
+        pixmap.loadFromData(image, "PNG")
+        self.chart_label.setPixmap(pixmap)
+        self.chart_label.setHidden(False)
 
     def save_pdf(self) -> None:
         """
-        Настраивает printer, вызывает метод по созданию html-представления документа и сохраняет в формате pdf.
+        Сохраняет активный документ в формате pdf в фоновом потоке. Страницы раскладываются так же, как при печати,
+        большие документы формируются по частям в нескольких процессах (см. pdf_export.py).
         :return: None
         """
         file_name, _ = qtw.QFileDialog.getSaveFileName(self, "Export PDF", None, 'PDF files (.pdf);;All Files()')
         if file_name:
             if not qtc.QFileInfo(file_name).suffix():
                 file_name += ".pdf"
-            printer = QPrinter(QPrinter.PrinterResolution)
-            printer.setOutputFormat(QPrinter.PdfFormat)
-            printer.setOutputFileName(file_name)
-            doc = self.create_html_from_table()
-            doc.setPageSize(qtc.QSizeF(printer.pageRect().size()))
-            doc.print_(printer)
+            model = self.table.model()
+            headers = [model.headerData(col, qtc.Qt.Horizontal) for col in range(model.columnCount())]
+            worker = Worker(self.write_pdf, file_name, self.title_label.text(), headers, list(self.table_rows),
+                            self.sorted_year)
+            worker.signals.error.connect(self.export_failed)
+            qtc.QThreadPool.globalInstance().start(worker)
+
+    @classmethod
+    def write_pdf(cls, file_name: str, title: str, headers: list[str], rows: list, year: str | None) -> int:
+        """
+        Строит изображения документа и сохраняет его в PDF. Выполняется в фоновом потоке.
+        :param file_name: str
+        :param title: str
+        :param headers: list[str]
+        :param rows: list
+        :param year: str | None
+        :return: int
+        """
+        from pdf_export import export_pdf
+
+        return export_pdf(file_name, title, headers, rows, cls.chart_images(title, year))
+
+    @staticmethod
+    def print_to_pdf(doc: qtg.QTextDocument, file_name: str) -> None:
+        """
+        Настраивает printer и сохраняет документ в формате pdf.
+        :param doc: qtg.QTextDocument
+        :param file_name: str
+        :return: None
+        """
+        printer = QPrinter(QPrinter.PrinterResolution)
+        printer.setOutputFormat(QPrinter.PdfFormat)
+        printer.setOutputFileName(file_name)
+        doc.setPageSize(qtc.QSizeF(printer.pageRect().size()))
+        doc.print_(printer)
+
+    def table_page_layout(self, page_size: qtc.QSizeF,
+                          images: list[tuple[str, bytes]] | None = None) -> "TablePageLayout":
+        """
+        Создаёт раскладку активного документа по печатным страницам размером page_size (пт). Значения ячеек
+        читаются из таблицы только при отрисовке страниц.
+        :param page_size: qtc.QSizeF
+        :param images: list[tuple[str, bytes]] | None = None - изображения, построенные with_chart_images
+        :return: TablePageLayout
+        """
+        from print_layout import TablePageLayout
+
+        model = self.table.model()
+        headers = [model.headerData(col, qtc.Qt.Horizontal) for col in range(model.columnCount())]
+        return TablePageLayout(self.title_label.text(), headers, model.rowCount(),
+                               lambda row, col: model.index(row, col).data(), page_size, images)
+
+    def print_preview(self) -> None:
+        """
+        Открывает окно предварительного просмотра печати активного документа.
+        :return: None
+        """
+        def show_preview(images: list[tuple[str, bytes]]) -> None:
+            self.preview_dialog = PrintPreviewDialog(partial(self.table_page_layout, images=images), self)
+            self.preview_dialog.show()
+
+        self.with_chart_images(show_preview)
+
+    def print_document(self) -> None:
+        """
+        Печатает активный документ без предварительного просмотра.
+        :return: None
+        """
+        self.with_chart_images(lambda images: PrintPreviewDialog.print_with_dialog(
+            QPrinter(QPrinter.HighResolution), partial(self.table_page_layout, images=images), self))
+
+    @staticmethod
+    def chart_images(title: str, year: str | None = None) -> list[tuple[str, bytes]]:
+        """
+        Возвращает список изображений (заголовок, PNG), которые относятся к документу title и должны быть
+        добавлены при экспорте. Изображения берутся из кэша, если они уже были построены, иначе выполняется
+        запрос и построение, поэтому метод вызывается только из фонового потока.
+        :param title: str
+        :param year: str | None = None
+        :return: list[tuple[str, bytes]]
+        """
+        if title != "Диаграмма Парето":
+            return []
+        args = (year,) if year else ()
+        return [("Диаграмма Парето", DocumentHandler.create_pareto_diagram(*args, dpi=EXPORT_DPI))]
+
+    def with_chart_images(self, callback: Callable[[list[tuple[str, bytes]]], None]) -> None:
+        """
+        Строит изображения активного документа (chart_images) в фоновом потоке и передаёт их в callback,
+        если пользователь не перешёл к другому документу. Для документов без изображений callback
+        вызывается сразу.
+        :param callback: Callable[[list[tuple[str, bytes]]], None]
+        :return: None
+        """
+        title = self.title_label.text()
+        if title != "Диаграмма Парето":
+            callback([])
+            return
+        worker = Worker(self.chart_images, title, self.sorted_year)
+        worker.signals.result.connect(lambda images: callback(images) if self.title_label.text() == title else None)
+        worker.signals.error.connect(print)
+        qtc.QThreadPool.globalInstance().start(worker)
 
     def save_xlsx(self) -> None:
         """
         Сохраняет в формате xlsx, используя ExcelWriter. Вызывает метод create_dataframe_from_table для перевода
-        табличных значений в DataFrame.
+        табличных значений в DataFrame, изображения строятся и книга записывается в фоновом потоке.
         :return: None
         """
         file_name, _ = qtw.QFileDialog.getSaveFileName(self, "Export XLSX", None, "Книга Excel (.xlsx);;All Files()")
         if file_name:
             if not qtc.QFileInfo(file_name).suffix():
                 file_name += ".xlsx"
-            writer = pd.ExcelWriter(file_name, engine="xlsxwriter")
-            df = self.create_dataframe_from_table()
-            df.to_excel(writer, startrow=2, sheet_name="Лист1", index=False)
-            workbook = writer.book
-            worksheet = writer.sheets["Лист1"]
-            for i, col in enumerate(df.columns):
-                col_len = df[col].astype(str).str.len().max()
-                col_len = max(col_len, len(col)) + 2
-                worksheet.set_column(i, i, col_len)
-            writer.save()
+            worker = Worker(self.write_xlsx, file_name, self.create_dataframe_from_table(), self.title_label.text(),
+                            self.sorted_year)
+            worker.signals.error.connect(self.export_failed)
+            qtc.QThreadPool.globalInstance().start(worker)
 
-    def create_dataframe_from_table(self) -> pd.DataFrame:
+    @classmethod
+    def write_xlsx(cls, file_name: str, df: "pd.DataFrame", title: str, year: str | None) -> None:
+        """
+        Строит изображения документа и сохраняет его в книгу xlsx. Выполняется в фоновом потоке.
+        :param file_name: str
+        :param df: pd.DataFrame
+        :param title: str
+        :param year: str | None
+        :return: None
+        """
+        import pandas as pd
+        writer = pd.ExcelWriter(file_name, engine="xlsxwriter")
+        cls.write_xlsx_sheet(writer, "Лист1", df, cls.chart_images(title, year))
+        writer.save()
+
+    @staticmethod
+    def write_xlsx_sheet(writer: "pd.ExcelWriter", sheet_name: str, df: "pd.DataFrame",
+                         images: list[tuple[str, bytes]] | None = None) -> None:
+        """
+        Записывает таблицу на лист книги Excel и вставляет под ней переданные изображения.
+        :param writer: pd.ExcelWriter
+        :param sheet_name: str
+        :param df: pd.DataFrame
+        :param images: list[tuple[str, bytes]] | None = None
+        :return: None
         """
-        Создаёт pandas.DataFrame из данных активного документа.
+        import io
+
+        df.to_excel(writer, startrow=2, sheet_name=sheet_name, index=False)
+        worksheet = writer.sheets[sheet_name]
+        for i, col in enumerate(df.columns):
+            col_len = df[col].astype(str).str.len().max() if len(df) else 0
+            col_len = max(col_len, len(col)) + 2
+            worksheet.set_column(i, i, col_len)
+        row = len(df) + 5
+        for caption, image in images or ():
+            worksheet.write(row, 0, caption)
+            worksheet.insert_image(row + 1, 0, f"{caption}.png", {"image_data": io.BytesIO(image),
+                                                                  "x_scale": 100 / EXPORT_DPI,
+                                                                  "y_scale": 100 / EXPORT_DPI})
+            row += 25
+
+    def create_dataframe_from_table(self) -> "pd.DataFrame":
+        """
+        Создаёт pandas.DataFrame из данных активного документа. Значения берутся из строк таблицы в исходных
+        типах, поэтому числа и даты попадают в книгу Excel числами и датами.
         :return: pd.DataFrame
         """
-        headers = []
+        import pandas as pd
         model = self.table.model()
-        for col in range(model.columnCount()):
-            headers.append(model.headerData(col, qtc.Qt.Horizontal))
-        df = pd.DataFrame(columns=headers)
-        for row in range(model.rowCount()):
-            for col in range(model.columnCount()):
-                df.at[row, headers[col]] = model.index(row, col).data()
-        return df
+        headers = [model.headerData(col, qtc.Qt.Horizontal) for col in range(model.columnCount())]
+        return pd.DataFrame.from_records(self.table_rows, columns=headers)
+
+    @staticmethod
+    def add_images_to_document(doc: qtg.QTextDocument, images: list[tuple[str, bytes]] | None) -> str:
+        """
+        Добавляет изображения в ресурсы документа и возвращает html-код для их вывода.
+        :param doc: qtg.QTextDocument
+        :param images: list[tuple[str, bytes]] | None
+        :return: str
+        """
+        html = ""
+        for caption, image in images or ():
+            name = f"image{id(image)}.png"
+            doc.addResource(qtg.QTextDocument.ImageResource, qtc.QUrl(name), qtg.QImage.fromData(image))
+            html += f"<h2>{caption}</h2><img src='{name}' width='{CHART_WIDTH}'>"
+        return html
+
+    def export_pareto_diagrams(self) -> None:
+        """
+        Запрашивает период и файл и сохраняет диаграммы Парето за каждый год периода в один документ pdf
+        (по странице на год) или в книгу xlsx (по листу на год). Диаграммы строятся параллельно в фоновом потоке.
+        :return: None
+        """
+        period, ok = qtw.QInputDialog.getText(self, "Экспорт диаграмм Парето", "Введите период (например, 2015-2022):")
+        if not ok or not period:
+            return
+        try:
+            first, _, last = period.partition("-")
+            years = [str(year) for year in range(int(first), int(last or first) + 1)]
+        except ValueError:
+            qtw.QMessageBox.information(self, "Внимание!", "Период указан неверно!", qtw.QMessageBox.Ok)
+            return
+        file_name, _ = qtw.QFileDialog.getSaveFileName(self, "Export", None,
+                                                       "PDF files (.pdf);;Книга Excel (.xlsx);;All Files()")
+        if not file_name:
+            return
+        if not qtc.QFileInfo(file_name).suffix():
+            file_name += ".pdf"
+        worker = Worker(DocumentHandler.pareto_export, years, dpi=EXPORT_DPI)
+        worker.signals.result.connect(lambda exports: self.write_pareto_export(file_name, exports))
+        worker.signals.error.connect(self.export_failed)
+        qtc.QThreadPool.globalInstance().start(worker)
+
+    def export_all_reports(self) -> None:
+        """
+        Запрашивает файл и сохраняет все документы в книгу xlsx, по листу на документ. Данные всех документов
+        выбираются в фоновом потоке из одного согласованного снимка базы.
+        :return: None
+        """
+        from workbook import export_all_reports
 
-    def create_html_from_table(self) -> qtg.QTextDocument:
+        file_name, _ = qtw.QFileDialog.getSaveFileName(self, "Export XLSX", None, "Книга Excel (.xlsx);;All Files()")
+        if not file_name:
+            return
+        if not qtc.QFileInfo(file_name).suffix():
+            file_name += ".xlsx"
+        worker = Worker(export_all_reports, file_name)
+        worker.signals.result.connect(lambda titles: qtw.QMessageBox.information(
+            self, "Экспорт", f"Сохранено документов: {len(titles)}", qtw.QMessageBox.Ok))
+        worker.signals.error.connect(self.export_failed)
+        qtc.QThreadPool.globalInstance().start(worker)
+
+    def export_table_data(self) -> None:
+        """
+        Запрашивает таблицу и файл и выгружает все строки таблицы из базы в CSV или Parquet в фоновом потоке.
+        Строки выгружаются частями, поэтому размер таблицы не ограничен.
+        :return: None
         """
-        Создаёт html-представление активного документа.
-        :return: qtg.QTextDocument
+        from table_export import FORMATS, export_table
+
+        names = list(DataHandler.names)
+        current = self.title_label.text()
+        name, ok = qtw.QInputDialog.getItem(self, "Экспорт таблицы", "Таблица:", names,
+                                            names.index(current) if current in names else 0, False)
+        if not ok:
+            return
+        filters = {f"{title} (*{suffix})": suffix for suffix, title in FORMATS.items()}
+        file_name, selected = qtw.QFileDialog.getSaveFileName(self, "Export", None, ";;".join(filters))
+        if not file_name:
+            return
+        if not file_name.endswith(tuple(FORMATS)):
+            file_name += filters.get(selected, ".csv")
+        worker = Worker(export_table, DataHandler().data_list[name].table, file_name)
+        worker.signals.result.connect(lambda count: qtw.QMessageBox.information(
+            self, "Экспорт", f"Выгружено строк: {count}", qtw.QMessageBox.Ok))
+        worker.signals.error.connect(self.export_failed)
+        qtc.QThreadPool.globalInstance().start(worker)
+
+    def write_pareto_export(self, file_name: str,
+                            exports: dict[str, tuple[bytes, tuple[tuple[str, ...], list[tuple]]]]) -> None:
+        """
+        Сохраняет построенные диаграммы Парето и данные для них (см. DocumentHandler.pareto_export) в файл pdf
+        или xlsx.
+        :param file_name: str
+        :param exports: dict[str, tuple[bytes, tuple[tuple[str, ...], list[tuple]]]]
+        :return: None
         """
+        if qtc.QFileInfo(file_name).suffix().lower() == "xlsx":
+            import pandas as pd
+            writer = pd.ExcelWriter(file_name, engine="xlsxwriter")
+            for year, (image, (headers, data)) in exports.items():
+                df = pd.DataFrame(data, columns=headers)
+                self.write_xlsx_sheet(writer, year, df, [(f"Диаграмма Парето с {year} г.", image)])
+            writer.save()
+            return
         doc = qtg.QTextDocument()
-        model = self.table.model()
-        html = """
-        <html>
-        <head>
-        <style>
-        table, th, td {
-            border: 1px solid black;
-            border-collapse: collapse;
-        }
-        </style>
-        </head>
-        """
-        html += f"<h1>{self.title_label.text()}</h1>"
-        html += "<table><thead>"
-        html += "<tr>"
-        for col in range(model.columnCount()):
-            html += f"<th>{model.headerData(col, qtc.Qt.Horizontal)}</th>"
-        html += "</tr></thead>"
-        html += "<tbody>"
-        for row in range(model.rowCount()):
-            html += "<tr>"
-            for col in range(model.columnCount()):
-                html += f"<td>{model.index(row, col).data()}</td>"
-            html += "</tr>"
-        html += "</tbody></table>"
+        html = ""
+        for i, (year, (image, _)) in enumerate(exports.items()):
+            page_break = " style='page-break-before: always'" if i else ""
+            html += f"<div{page_break}>"
+            html += self.add_images_to_document(doc, [(f"Диаграмма Парето с {year} г.", image)])
+            html += "</div>"
         doc.setHtml(html)
-        return doc
+        self.print_to_pdf(doc, file_name)
+
+
+class WorkerSignals(qtc.QObject):
+    """
+    Сигналы, которые Worker транслирует из фонового потока.
+    """
+
+    result = qtc.pyqtSignal(object)
+    error = qtc.pyqtSignal(str)
+    finished = qtc.pyqtSignal()
+
+
+class Worker(qtc.QRunnable):
+    """
+    Класс описывает задачу, выполняемую в пуле потоков Qt. Результат или текст ошибки передаётся сигналами.
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self) -> None:
+        """
+        Выполняет переданную функцию и транслирует сигналы result/error и finished.
+        :return: None
+        """
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception:
+            self.signals.error.emit(traceback.format_exc())
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
 
 
 class MyDockWidget(qtw.QDockWidget):
@@ -491,6 +1099,7 @@ class DocumentWidget(qtw.QWidget):
         for i, doc in enumerate(DocumentHandler.staff_list_docs):
             setattr(self, f"staff_list_in_doc_{i}", qtw.QTreeWidgetItem(self.staff_list_input, [doc]))
         self.staff_list = qtw.QTreeWidgetItem(self.staff_list_output, ["Штатное расписание"])
+        self.staff_matrix = qtw.QTreeWidgetItem(self.staff_list_output, ["Штатное расписание по годам"])
         self.missing_unit_info_parent = qtw.QTreeWidgetItem(self.doc_tree_widget,
                                                             ["Определение годовой потребности в недостающем персонале"])
         self.missing_unit_info_input = qtw.QTreeWidgetItem(self.missing_unit_info_parent, ["Входные документы"])
@@ -505,6 +1114,8 @@ class DocumentWidget(qtw.QWidget):
         for i, doc in enumerate(DocumentHandler.pareto_docs):
             setattr(self, f"pareto_in_doc_{i}", qtw.QTreeWidgetItem(self.pareto_input, [doc]))
         self.missing_unit_info = qtw.QTreeWidgetItem(self.pareto_output, ["Диаграмма Парето"])
+        for i, doc in enumerate(("Текучесть кадров", "Средний стаж работы", "Удержание сотрудников")):
+            setattr(self, f"turnover_out_doc_{i}", qtw.QTreeWidgetItem(self.pareto_output, [doc]))
         self.doc_tree_widget.expandAll()
         self.doc_tree_widget.adjustSize()
         self.doc_tree_widget.setHeaderLabel("Решение задач")
@@ -530,8 +1141,9 @@ class BaseDialogWidget(qtw.QWidget):
     Необходимо переопределить методы create_fields и on_submit для корретной работы.
     """
     closed = qtc.pyqtSignal()
+    submitted = qtc.pyqtSignal(list, object)
 
-    def __init__(self, headers: list[str], row_data: list[str] | None = None):
+    def __init__(self, headers: list[str], row_data: Record | None = None):
         super().__init__()
         self.row_data = row_data
         self.headers = headers
@@ -551,24 +1163,6 @@ class BaseDialogWidget(qtw.QWidget):
         self.setLayout(self.layout)
         self.show()
 
-    @staticmethod
-    def str_to_table_date(string: str) -> datetime:
-        """
-        Переводит строку с датой формата базы данных в объект datetime.
-        :param string: str
-        :return: datetime
-        """
-        return datetime.strptime(string, "%Y-%m-%d")
-
-    @staticmethod
-    def date_to_database_format(date: str) -> str:
-        """
-        Переводит строку с табличным форматом данных в строку формата базы данных.
-        :param date: str
-        :return: str
-        """
-        return datetime.strptime(date, "%d.%m.%Y").strftime("%Y-%m-%d")
-
     @staticmethod
     def _get_list_from_bd(object_name: type, index: int, cond_index: int | None = None) -> list[str]:
         """
@@ -640,6 +1234,16 @@ class BaseDialogWidget(qtw.QWidget):
         """
         raise NotImplementedError
 
+    def submit_rows(self, rows: list[Record]) -> None:
+        """
+        Транслирует сигнал submitted с изменёнными строками и ключом редактируемой строки и закрывает
+        диалоговое окно.
+        :param rows: list[Record]
+        :return: None
+        """
+        self.submitted.emit(rows, self.row_data[0] if self.row_data else None)
+        self.close()
+
     def closeEvent(self, event: qtg.QCloseEvent) -> None:
         """
         Запускает closeEvent, транслируя сигнал closed.
@@ -655,7 +1259,7 @@ class SubdivisionDialogWidget(BaseDialogWidget):
     Описывает поведение диалогового окна для таблицы "Структурные подразделения".
     """
 
-    def __init__(self, headers: list[str], row_data: list[str] | None = None):
+    def __init__(self, headers: list[str], row_data: Record | None = None):
         super().__init__(headers, row_data)
 
     def create_fields(self) -> None:
@@ -674,23 +1278,23 @@ class SubdivisionDialogWidget(BaseDialogWidget):
         self.layout.addRow(self.headers[3], self.salary_line_edit)
 
     def fill_fields_with_data(self) -> None:
-        self.id_line_edit.setText(self.row_data[0])
-        self.func_line_edit.setText(self.row_data[1])
-        self.struct_line_edit.setCurrentIndex(self.struct_line_edit.findText(self.row_data[2]))
-        self.salary_line_edit.setText(self.row_data[3])
+        self.id_line_edit.setText(self.row_data.text(0))
+        self.func_line_edit.setText(self.row_data.function_name)
+        self.struct_line_edit.setCurrentIndex(self.struct_line_edit.findText(self.row_data.struct_subdivision))
+        self.salary_line_edit.setText(self.row_data.text(3))
 
     def on_submit(self):
         fid, func, struct, salary = self.id_line_edit.text(), self.func_line_edit.text(), \
                                     self.struct_line_edit.currentText(), self.salary_line_edit.text()
         try:
             if self.row_data:
-                Subdivision.edit_data(fid, func, struct, salary, self.row_data[0])
+                rows = Subdivision.edit_data(fid, func, struct, salary, self.row_data[0])
             else:
-                Subdivision.add_data(fid, func, struct, salary)
+                rows = Subdivision.add_data(fid, func, struct, salary)
         except Exception as e:
             print(e)
         else:
-            self.close()
+            self.submit_rows(rows)
 
 
 class DocumentsDialogWidget(BaseDialogWidget):
@@ -698,7 +1302,7 @@ class DocumentsDialogWidget(BaseDialogWidget):
         Описывает поведение диалогового окна для таблицы "Документы".
     """
 
-    def __init__(self, headers: list[str], row_data: list[str] | None = None):
+    def __init__(self, headers: list[str], row_data: Record | None = None):
         super().__init__(headers, row_data)
 
     def create_fields(self) -> None:
@@ -718,12 +1322,12 @@ class DocumentsDialogWidget(BaseDialogWidget):
         self.layout.addRow(self.headers[5], self.period_line_edit)
 
     def fill_fields_with_data(self) -> None:
-        self.id_line_edit.setText(self.row_data[0])
-        self.name_line_edit.setText(self.row_data[1])
-        self.func_line_edit.setCurrentIndex(self.func_line_edit.findText(self.row_data[2]))
-        self.time_line_edit.setText(self.row_data[3])
-        self.count_line_edit.setText(self.row_data[4])
-        self.period_line_edit.setText(self.row_data[5])
+        self.id_line_edit.setText(self.row_data.text(0))
+        self.name_line_edit.setText(self.row_data.doc_name)
+        self.func_line_edit.setCurrentIndex(self.func_line_edit.findText(self.row_data.function_name))
+        self.time_line_edit.setText(self.row_data.text(3))
+        self.count_line_edit.setText(self.row_data.text(4))
+        self.period_line_edit.setText(self.row_data.text(5))
 
     def on_submit(self) -> None:
         did, name, func, time, count, period = self.id_line_edit.text(), self.name_line_edit.text(), \
@@ -731,13 +1335,13 @@ class DocumentsDialogWidget(BaseDialogWidget):
                                                self.count_line_edit.text(), self.period_line_edit.text()
         try:
             if self.row_data:
-                Documents.edit_data(did, name, func, time, count, period, self.row_data[0])
+                rows = Documents.edit_data(did, name, func, time, count, period, self.row_data[0])
             else:
-                Documents.add_data(did, name, func, time, count, period)
+                rows = Documents.add_data(did, name, func, time, count, period)
         except Exception as e:
             traceback.print_exc()
         else:
-            self.close()
+            self.submit_rows(rows)
 
 
 class UnitsDialogWidget(BaseDialogWidget):
@@ -745,7 +1349,7 @@ class UnitsDialogWidget(BaseDialogWidget):
         Описывает поведение диалогового окна для таблицы "Сотрудники".
     """
 
-    def __init__(self, headers: list[str], row_data: list[str] | None = None):
+    def __init__(self, headers: list[str], row_data: Record | None = None):
         super().__init__(headers, row_data)
 
     def create_fields(self) -> None:
@@ -776,23 +1380,23 @@ class UnitsDialogWidget(BaseDialogWidget):
         self.layout.addRow(self.e_date_label, self.e_date_line_edit)
 
     def fill_fields_with_data(self) -> None:
-        self.id_line_edit.setText(self.row_data[0])
-        self.name_line_edit.setText(self.row_data[1])
-        self.birthday_line_edit.setDate(self.str_to_table_date(self.row_data[2]))
-        self.func_line_edit.setCurrentIndex(self.func_line_edit.findText(self.row_data[3]))
-        self.st_date_line_edit.setDate(self.str_to_table_date(self.row_data[4]))
+        self.id_line_edit.setText(self.row_data.text(0))
+        self.name_line_edit.setText(self.row_data.spec_name)
+        self.birthday_line_edit.setDate(qtc.QDate(self.row_data.birthday))
+        self.func_line_edit.setCurrentIndex(self.func_line_edit.findText(self.row_data.function_name))
+        self.st_date_line_edit.setDate(qtc.QDate(self.row_data.start_date))
         self.open_e_date_section_label.setHidden(False)
         self.open_e_date_section_checkbox.setHidden(False)
         self.open_e_date_section_checkbox.stateChanged.connect(self.open_e_date_section)
-        if self.row_data[5]:
+        if self.row_data.end_date:
             self.open_e_date_section_checkbox.setChecked(True)
 
     def open_e_date_section(self):
         if self.open_e_date_section_checkbox.isChecked():
             self.e_date_label.setHidden(False)
             self.e_date_line_edit.setHidden(False)
-            if self.row_data[5]:
-                self.e_date_line_edit.setDate(self.str_to_table_date(self.row_data[5]))
+            if self.row_data.end_date:
+                self.e_date_line_edit.setDate(qtc.QDate(self.row_data.end_date))
             else:
                 self.e_date_line_edit.setDate(qtc.QDate.currentDate())
         else:
@@ -802,21 +1406,21 @@ class UnitsDialogWidget(BaseDialogWidget):
             # print(self.e_date_line_edit.minimumDate())
 
     def on_submit(self) -> None:
-        uid, name, birth, func, st_date, e_date = self.id_line_edit.text(), self.name_line_edit.text(), \
-                                               self.birthday_line_edit.text(), self.func_line_edit.currentText(), \
-                                               self.st_date_line_edit.text(), self.e_date_line_edit.text()
-        birth, st_date, e_date = map(self.date_to_database_format, (birth, st_date, e_date))
-        if e_date == "1752-09-14":
-            e_date = None
+        uid, name, birth, func, st_date = self.id_line_edit.text(), self.name_line_edit.text(), \
+                                          self.birthday_line_edit.date().toPyDate(), \
+                                          self.func_line_edit.currentText(), self.st_date_line_edit.date().toPyDate()
+        e_date = None
+        if self.e_date_line_edit.date() != self.e_date_line_edit.minimumDate():
+            e_date = self.e_date_line_edit.date().toPyDate()
         try:
             if self.row_data:
-                Units.edit_data(uid, name, birth, func, st_date, e_date, self.row_data[0])
+                rows = Units.edit_data(uid, name, birth, func, st_date, e_date, self.row_data[0])
             else:
-                Units.add_data(uid, name, birth, func, st_date)
+                rows = Units.add_data(uid, name, birth, func, st_date)
         except Exception as e:
             print(e)
         else:
-            self.close()
+            self.submit_rows(rows)
 
 
 class DismissalOrderDialogWidget(BaseDialogWidget):
@@ -824,7 +1428,7 @@ class DismissalOrderDialogWidget(BaseDialogWidget):
         Описывает поведение диалогового окна для таблицы "Приказ об увольнении".
     """
 
-    def __init__(self, headers: list[str], row_data: list[str] | None = None):
+    def __init__(self, headers: list[str], row_data: Record | None = None):
         super().__init__(headers, row_data)
 
     def create_fields(self) -> None:
@@ -845,29 +1449,28 @@ class DismissalOrderDialogWidget(BaseDialogWidget):
         self.layout.addRow(self.headers[4], self.real_reas_line_edit)
 
     def fill_fields_with_data(self) -> None:
-        self.id_line_edit.setText(self.row_data[0])
-        self.date_line_edit.setDate(self.str_to_table_date(self.row_data[1]))
-        name_id = self.name_line_edit.findText(self.row_data[2])
+        self.id_line_edit.setText(self.row_data.text(0))
+        self.date_line_edit.setDate(qtc.QDate(self.row_data.order_date))
+        name_id = self.name_line_edit.findText(self.row_data.spec_name)
         if name_id == -1:
-            self.name_line_edit.addItem(self.row_data[2])
-        self.name_line_edit.setCurrentIndex(self.name_line_edit.findText(self.row_data[2]))
-        self.reas_line_edit.setCurrentIndex(self.reas_line_edit.findText(self.row_data[3]))
-        self.real_reas_line_edit.setText(self.row_data[4])
+            self.name_line_edit.addItem(self.row_data.spec_name)
+        self.name_line_edit.setCurrentIndex(self.name_line_edit.findText(self.row_data.spec_name))
+        self.reas_line_edit.setCurrentIndex(self.reas_line_edit.findText(self.row_data.short_reason))
+        self.real_reas_line_edit.setText(self.row_data.text(4))
 
     def on_submit(self) -> None:
-        doid, date, name, reas, real_reas = self.id_line_edit.text(), self.date_line_edit.text(), \
+        doid, date, name, reas, real_reas = self.id_line_edit.text(), self.date_line_edit.date().toPyDate(), \
                                                   self.name_line_edit.currentText(), self.reas_line_edit.currentText(), \
                                                   self.real_reas_line_edit.text()
-        date = self.date_to_database_format(date)
         try:
             if self.row_data:
-                DismissalOrder.edit_data(doid, date, name, reas, real_reas, self.row_data[0])
+                rows = DismissalOrder.edit_data(doid, date, name, reas, real_reas, self.row_data[0])
             else:
-                DismissalOrder.add_data(doid, date, name, reas, real_reas)
+                rows = DismissalOrder.add_data(doid, date, name, reas, real_reas)
         except Exception as e:
             print(e)
         else:
-            self.close()
+            self.submit_rows(rows)
 
 
 class DismissalInfoDialogWidget(BaseDialogWidget):
@@ -875,7 +1478,7 @@ class DismissalInfoDialogWidget(BaseDialogWidget):
         Описывает поведение диалогового окна для таблицы "Расшифровка причин увольнения".
     """
 
-    def __init__(self, headers: list[str], row_data: list[str] | None = None):
+    def __init__(self, headers: list[str], row_data: Record | None = None):
         super().__init__(headers, row_data)
 
     def create_fields(self) -> None:
@@ -887,22 +1490,22 @@ class DismissalInfoDialogWidget(BaseDialogWidget):
         self.layout.addRow(self.headers[2], self.f_reas_line_edit)
 
     def fill_fields_with_data(self) -> None:
-        self.id_line_edit.setText(self.row_data[0])
-        self.sh_reas_line_edit.setText(self.row_data[1])
-        self.f_reas_line_edit.setText(self.row_data[2])
+        self.id_line_edit.setText(self.row_data.text(0))
+        self.sh_reas_line_edit.setText(self.row_data.text(1))
+        self.f_reas_line_edit.setText(self.row_data.text(2))
 
     def on_submit(self) -> None:
         did, sh_reas, f_reas = self.id_line_edit.text(), self.sh_reas_line_edit.text(), \
                                             self.f_reas_line_edit.text()
         try:
             if self.row_data:
-                DismissalInfo.edit_data(did, sh_reas, f_reas, self.row_data[0])
+                rows = DismissalInfo.edit_data(did, sh_reas, f_reas, self.row_data[0])
             else:
-                DismissalInfo.add_data(did, sh_reas, f_reas)
+                rows = DismissalInfo.add_data(did, sh_reas, f_reas)
         except Exception as e:
             print(e)
         else:
-            self.close()
+            self.submit_rows(rows)
 
 
 class TimeInfoDialogWidget(BaseDialogWidget):
@@ -910,7 +1513,7 @@ class TimeInfoDialogWidget(BaseDialogWidget):
         Описывает поведение диалогового окна для таблицы "Данные о рабочем времени".
     """
 
-    def __init__(self, headers: list[str], row_data: list[str] | None = None):
+    def __init__(self, headers: list[str], row_data: Record | None = None):
         super().__init__(headers, row_data)
 
     def create_fields(self) -> None:
@@ -924,23 +1527,353 @@ class TimeInfoDialogWidget(BaseDialogWidget):
         self.layout.addRow(self.headers[3], self.dy_line_edit)
 
     def fill_fields_with_data(self) -> None:
-        self.year_line_edit.setText(self.row_data[0])
-        self.hy_line_edit.setText(self.row_data[1])
-        self.hd_line_edit.setText(self.row_data[2])
-        self.dy_line_edit.setText(self.row_data[3])
+        self.year_line_edit.setText(self.row_data.text(0))
+        self.hy_line_edit.setText(self.row_data.text(1))
+        self.hd_line_edit.setText(self.row_data.text(2))
+        self.dy_line_edit.setText(self.row_data.text(3))
 
     def on_submit(self) -> None:
         year, hy, hd, dy = self.year_line_edit.text(), self.hy_line_edit.text(), \
                                self.hd_line_edit.text(), self.dy_line_edit.text()
         try:
             if self.row_data:
-                TimeInfo.edit_data(year, hy, hd, dy, self.row_data[0])
+                rows = TimeInfo.edit_data(year, hy, hd, dy, self.row_data[0])
             else:
-                TimeInfo.add_data(year, hy, hd, dy)
+                rows = TimeInfo.add_data(year, hy, hd, dy)
         except Exception as e:
             print(e)
         else:
-            self.close()
+            self.submit_rows(rows)
+
+
+class ScenarioWidget(qtw.QWidget):
+    """
+    Окно моделирования штатного расписания. Изменения норм времени, количества и периодичности документов
+    и годового фонда рабочего времени сразу пересчитываются в памяти, в базу они записываются только
+    по кнопке "Сохранить в базу".
+    """
+    committed = qtc.pyqtSignal()
+    editable_columns = {3: "time", 4: "number", 5: "period"}
+
+    def __init__(self, scenario):
+        super().__init__()
+        self.scenario = scenario
+        self.setWindowTitle(f"Моделирование штатного расписания на {scenario.year} год")
+        self.setMinimumSize(800, 600)
+        self.layout = qtw.QVBoxLayout()
+        self.hour_year_spin = qtw.QSpinBox()
+        self.hour_year_spin.setRange(1, 8784)
+        self.hour_year_spin.setValue(int(scenario.hour_year))
+        hour_year_widget = qtw.QWidget()
+        hour_year_widget.setLayout(qtw.QHBoxLayout())
+        hour_year_widget.layout().addWidget(qtw.QLabel("Количество рабочих часов в году: "))
+        hour_year_widget.layout().addWidget(self.hour_year_spin)
+        self.docs_table = qtw.QTableWidget()
+        self.staff_table = qtw.QTableWidget()
+        self.missing_table = qtw.QTableWidget()
+        self.salary_fund_label = qtw.QLabel()
+        self.result_tabs = qtw.QTabWidget()
+        self.result_tabs.addTab(self.staff_table, "Штатное расписание")
+        self.result_tabs.addTab(self.missing_table, "Форма справки о недостающих кадрах")
+        self.button_widget = qtw.QWidget()
+        self.button_widget.setLayout(qtw.QHBoxLayout())
+        self.reset_button = qtw.QPushButton("Сбросить")
+        self.commit_button = qtw.QPushButton("Сохранить в базу")
+        self.close_button = qtw.QPushButton("Закрыть")
+        self.button_widget.layout().addWidget(self.reset_button)
+        self.button_widget.layout().addWidget(self.commit_button)
+        self.button_widget.layout().addWidget(self.close_button)
+        self.layout.addWidget(hour_year_widget)
+        self.layout.addWidget(self.docs_table)
+        self.layout.addWidget(self.result_tabs)
+        self.layout.addWidget(self.salary_fund_label)
+        self.layout.addWidget(self.button_widget)
+        self.setLayout(self.layout)
+
+        self.fill_documents()
+        self.recompute()
+        self.docs_table.itemChanged.connect(self.on_item_changed)
+        self.hour_year_spin.valueChanged.connect(self.on_hour_year_changed)
+        self.reset_button.clicked.connect(self.reset)
+        self.commit_button.clicked.connect(self.commit)
+        self.close_button.clicked.connect(self.close)
+        self.show()
+
+    @staticmethod
+    def fill(table: qtw.QTableWidget, headers: tuple[str, ...], rows: list[tuple], editable: tuple = ()) -> None:
+        """
+        Заполняет таблицу данными. Редактировать можно только ячейки столбцов editable.
+        :param table: qtw.QTableWidget
+        :param headers: tuple[str, ...]
+        :param rows: list[tuple]
+        :param editable: tuple = ()
+        :return: None
+        """
+        table.setRowCount(len(rows))
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        for row_num, row in enumerate(rows):
+            for col, value in enumerate(row):
+                item = qtw.QTableWidgetItem(f"{value:g}" if isinstance(value, float) else str(value))
+                if col not in editable:
+                    item.setFlags(item.flags() & ~qtc.Qt.ItemIsEditable)
+                table.setItem(row_num, col, item)
+        table.resizeColumnsToContents()
+
+    def fill_documents(self) -> None:
+        """
+        Заполняет таблицу документов текущими значениями сценария.
+        :return: None
+        """
+        self.docs_table.blockSignals(True)
+        self.fill(self.docs_table, *self.scenario.documents(), editable=tuple(self.editable_columns))
+        self.docs_table.blockSignals(False)
+
+    def recompute(self) -> None:
+        """
+        Пересчитывает сценарий и обновляет таблицы результатов.
+        :return: None
+        """
+        self.fill(self.staff_table, *self.scenario.staff_list())
+        self.fill(self.missing_table, *self.scenario.missing_unit_info())
+        self.salary_fund_label.setText(f"Фонд заработной платы: {self.scenario.salary_fund():,.2f} руб".replace(",", " "))
+        self.commit_button.setEnabled(bool(self.scenario.changed_documents())
+                                      or self.scenario.hour_year != self.scenario.original["hour_year"])
+
+    def on_item_changed(self, item: qtw.QTableWidgetItem) -> None:
+        """
+        Передаёт изменённое значение документа в сценарий. Неверное значение заменяется текущим.
+        :param item: qtw.QTableWidgetItem
+        :return: None
+        """
+        doc_id = int(self.docs_table.item(item.row(), 0).text())
+        field = self.editable_columns[item.column()]
+        try:
+            value = float(item.text().replace(",", "."))
+            if value < 0:
+                raise ValueError
+        except ValueError:
+            self.fill_documents()
+            return
+        self.scenario.set_document(doc_id, **{field: value})
+        self.recompute()
+
+    def on_hour_year_changed(self, value: int) -> None:
+        """
+        Передаёт в сценарий изменённое количество рабочих часов в году.
+        :param value: int
+        :return: None
+        """
+        self.scenario.set_hour_year(value)
+        self.recompute()
+
+    def reset(self) -> None:
+        """
+        Возвращает значения, загруженные из базы.
+        :return: None
+        """
+        self.scenario.reset()
+        self.hour_year_spin.blockSignals(True)
+        self.hour_year_spin.setValue(int(self.scenario.hour_year))
+        self.hour_year_spin.blockSignals(False)
+        self.fill_documents()
+        self.recompute()
+
+    def commit(self) -> None:
+        """
+        Записывает сценарий в базу данных и транслирует сигнал committed.
+        :return: None
+        """
+        try:
+            self.scenario.commit()
+        except Exception as e:
+            qtw.QMessageBox.warning(self, "Ошибка", str(e), qtw.QMessageBox.Ok)
+            return
+        self.recompute()
+        self.committed.emit()
+
+
+class PrintPreviewDialog(qtw.QDialog):
+    """
+    Окно предварительного просмотра печати. Страницы рисуются только при появлении в видимой части окна,
+    несколько последних отрисованных страниц хранятся в кэше изображений.
+    """
+    zoom_levels = (0.5, 0.75, 1.0, 1.25, 1.5, 2.0)
+
+    def __init__(self, make_layout: Callable[[qtc.QSizeF], "TablePageLayout"], parent: qtw.QWidget | None = None):
+        super().__init__(parent)
+        self.make_layout = make_layout
+        self.printer = QPrinter(QPrinter.HighResolution)
+        self.setWindowTitle("Предварительный просмотр")
+        self.resize(900, 800)
+        self.pages = PreviewPagesWidget()
+        self.scroll_area = qtw.QScrollArea()
+        self.scroll_area.setAlignment(qtc.Qt.AlignHCenter)
+        self.scroll_area.setWidget(self.pages)
+        self.page_label = qtw.QLabel()
+        self.zoom_box = qtw.QComboBox()
+        self.zoom_box.addItems([f"{int(zoom * 100)}%" for zoom in self.zoom_levels])
+        self.zoom_box.setCurrentIndex(self.zoom_levels.index(1.0))
+        self.print_button = qtw.QPushButton("Печать")
+        self.close_button = qtw.QPushButton("Закрыть")
+        toolbar = qtw.QHBoxLayout()
+        toolbar.addWidget(qtw.QLabel("Масштаб:"))
+        toolbar.addWidget(self.zoom_box)
+        toolbar.addWidget(self.page_label)
+        toolbar.addStretch()
+        toolbar.addWidget(self.print_button)
+        toolbar.addWidget(self.close_button)
+        layout = qtw.QVBoxLayout()
+        layout.addLayout(toolbar)
+        layout.addWidget(self.scroll_area)
+        self.setLayout(layout)
+
+        self.zoom_box.currentIndexChanged.connect(lambda i: self.pages.set_zoom(self.zoom_levels[i]))
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.update_page_label)
+        self.print_button.clicked.connect(self.print_pages)
+        self.close_button.clicked.connect(self.close)
+        self.update_layout()
+
+    @staticmethod
+    def page_geometry(printer: QPrinter) -> tuple[qtc.QSizeF, qtc.QRectF]:
+        """
+        Возвращает размер листа и область печати принтера в пунктах.
+        :param printer: QPrinter
+        :return: tuple[qtc.QSizeF, qtc.QRectF]
+        """
+        page_layout = printer.pageLayout()
+        return page_layout.fullRect(qtg.QPageLayout.Point).size(), page_layout.paintRect(qtg.QPageLayout.Point)
+
+    def update_layout(self) -> None:
+        """
+        Раскладывает документ по страницам текущего формата листа принтера.
+        :return: None
+        """
+        paper, paint_rect = self.page_geometry(self.printer)
+        self.pages.set_layout(self.make_layout(paint_rect.size()), paper, paint_rect.topLeft())
+        self.update_page_label()
+
+    def update_page_label(self) -> None:
+        current = self.pages.page_at(self.scroll_area.verticalScrollBar().value())
+        self.page_label.setText(f"Страница {current + 1} из {self.pages.page_layout.page_count}")
+
+    def print_pages(self) -> None:
+        """
+        Печатает документ и обновляет просмотр, если в диалоге печати изменён формат листа.
+        :return: None
+        """
+        if self.print_with_dialog(self.printer, self.make_layout, self):
+            self.update_layout()
+
+    @classmethod
+    def print_with_dialog(cls, printer: QPrinter, make_layout: Callable[[qtc.QSizeF], "TablePageLayout"],
+                          parent: qtw.QWidget | None = None) -> bool:
+        """
+        Открывает диалог печати и печатает страницы документа по одной. Возвращает True, если документ напечатан.
+        :param printer: QPrinter
+        :param make_layout: Callable[[qtc.QSizeF], TablePageLayout]
+        :param parent: qtw.QWidget | None = None
+        :return: bool
+        """
+        page_size = cls.page_geometry(printer)[1].size()
+        page_layout = make_layout(page_size)
+        dialog = QPrintDialog(printer, parent)
+        dialog.setOption(QAbstractPrintDialog.PrintPageRange)
+        dialog.setMinMax(1, page_layout.page_count)
+        if dialog.exec() != qtw.QDialog.Accepted:
+            return False
+        qtw.QApplication.setOverrideCursor(qtc.Qt.WaitCursor)
+        try:
+            # Раскладка строится заново, только если в диалоге печати изменён формат листа.
+            if cls.page_geometry(printer)[1].size() != page_size:
+                page_layout = make_layout(cls.page_geometry(printer)[1].size())
+            page_layout.print_pages(printer)
+        finally:
+            qtw.QApplication.restoreOverrideCursor()
+        return True
+
+
+class PreviewPagesWidget(qtw.QWidget):
+    """
+    Виджет страниц предварительного просмотра. Высота виджета равна высоте всех страниц, но рисуются только
+    страницы, попавшие в обновляемую область.
+    """
+    gap = 16
+    cache_size = 12
+
+    def __init__(self):
+        super().__init__()
+        self.page_layout = None
+        self.paper = qtc.QSizeF()
+        self.origin = qtc.QPointF()
+        self.zoom = 1.0
+        self.cache = OrderedDict()
+
+    @property
+    def dpi(self) -> float:
+        return self.logicalDpiX() * self.zoom
+
+    @property
+    def page_pixels(self) -> qtc.QSize:
+        return (self.paper * self.dpi / 72).toSize()
+
+    @property
+    def step(self) -> int:
+        return self.page_pixels.height() + self.gap
+
+    def set_layout(self, page_layout: "TablePageLayout", paper: qtc.QSizeF, origin: qtc.QPointF) -> None:
+        self.page_layout, self.paper, self.origin = page_layout, paper, origin
+        self.refresh()
+
+    def set_zoom(self, zoom: float) -> None:
+        self.zoom = zoom
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Очищает кэш страниц и пересчитывает размер виджета.
+        :return: None
+        """
+        self.cache.clear()
+        size = self.page_pixels
+        self.setFixedSize(size.width() + 2 * self.gap, self.page_layout.page_count * self.step + self.gap)
+        self.update()
+
+    def page_at(self, y: int) -> int:
+        if self.page_layout is None:
+            return 0
+        return min(max(0, y // self.step), self.page_layout.page_count - 1)
+
+    def page_image(self, page: int) -> qtg.QImage:
+        """
+        Возвращает изображение страницы, отрисовывая его при первом обращении.
+        :param page: int
+        :return: qtg.QImage
+        """
+        if page in self.cache:
+            self.cache.move_to_end(page)
+            return self.cache[page]
+        image = qtg.QImage(self.page_pixels, qtg.QImage.Format_RGB32)
+        dots_per_meter = round(self.dpi / 0.0254)
+        image.setDotsPerMeterX(dots_per_meter)
+        image.setDotsPerMeterY(dots_per_meter)
+        image.fill(qtc.Qt.white)
+        painter = qtg.QPainter(image)
+        painter.setRenderHint(qtg.QPainter.Antialiasing)
+        self.page_layout.render_page(painter, page, self.origin)
+        painter.end()
+        self.cache[page] = image
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return image
+
+    def paintEvent(self, event: qtg.QPaintEvent) -> None:
+        painter = qtg.QPainter(self)
+        painter.fillRect(event.rect(), self.palette().dark())
+        if self.page_layout is not None:
+            for page in range(self.page_at(event.rect().top()), self.page_at(event.rect().bottom()) + 1):
+                painter.drawImage(qtc.QPoint(self.gap, page * self.step + self.gap), self.page_image(page))
+        painter.end()
 
 
 if __name__ == "__main__":
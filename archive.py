@@ -0,0 +1,76 @@
+"""
+Перенос давно уволенных сотрудников и их приказов об увольнении из рабочих таблиц Specialist
+и Order_of_dismissal в архивные Specialist_history и Order_of_dismissal_history
+(migrations/003_history_tables.*.sql). Рабочие таблицы, с которыми работают редактирование данных
+и штатные документы, остаются небольшими; документы, которым нужна вся история увольнений,
+читают представления Specialist_all и Order_of_dismissal_all.
+
+Использование: python archive.py [лет после увольнения]
+"""
+from config import *
+from datetime import date
+from documents import RESULT_CACHE, OlimpDatabase
+import sys
+
+HISTORY_TABLES = ("Specialist_history", "Order_of_dismissal_history")
+_SPEC_COLUMNS = "id, spec_id, spec_name, birthday, start_date, end_date, function_id"
+_ORDER_COLUMNS = "id, order_id, order_date, true_reason, spec_id, reas_id"
+_DISMISSED = "SELECT id FROM Specialist WHERE end_date IS NOT NULL AND end_date<%s"
+
+
+def archive_cutoff(years: int = ARCHIVE_AFTER_YEARS, today: date | None = None) -> str:
+    """
+    Возвращает дату, уволенные до которой сотрудники переносятся в архив: years лет назад от today.
+    :param years: int = ARCHIVE_AFTER_YEARS
+    :param today: date | None = None
+    :return: str
+    """
+    today = today or date.today()
+    if today.month == 2 and today.day == 29:
+        today = today.replace(day=28)
+    return today.replace(year=today.year - years).isoformat()
+
+
+def archive_dismissed(dismissed_before: str) -> tuple[int, int]:
+    """
+    Переносит в архив сотрудников, уволенных до даты dismissed_before, и их приказы об увольнении одной
+    транзакцией. Удаление из рабочих таблиц записывается триггерами в журнал изменений, поэтому другие
+    клиенты убирают эти строки из таблиц. Возвращает количество перенесённых сотрудников и приказов.
+    :param dismissed_before: str
+    :return: tuple[int, int]
+    """
+    params = (dismissed_before,)
+    db = OlimpDatabase(prepared=False)
+    try:
+        # Подсчёт выполняется в той же транзакции, что и перенос.
+        db.begin()
+        specialists = db.query(f"SELECT COUNT(*) FROM ({_DISMISSED}) as sp;", params)[0][0]
+        orders = db.query(f"SELECT COUNT(*) FROM Order_of_dismissal WHERE spec_id IN ({_DISMISSED});",
+                          params)[0][0]
+        if specialists:
+            db.execute(f"""
+                INSERT INTO Specialist_history({_SPEC_COLUMNS})
+                SELECT {_SPEC_COLUMNS} FROM Specialist WHERE end_date IS NOT NULL AND end_date<%s;
+                """, params)
+            db.execute(f"""
+                INSERT INTO Order_of_dismissal_history({_ORDER_COLUMNS})
+                SELECT {_ORDER_COLUMNS} FROM Order_of_dismissal WHERE spec_id IN ({_DISMISSED});
+                """, params)
+            db.execute(f"DELETE FROM Order_of_dismissal WHERE spec_id IN ({_DISMISSED});", params)
+            db.execute("DELETE FROM Specialist WHERE end_date IS NOT NULL AND end_date<%s;", params)
+    except BaseException:
+        db.close(commit=False)
+        raise
+    db.close()
+    if specialists:
+        RESULT_CACHE.clear()
+    return specialists, orders
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    cutoff = archive_cutoff(*(int(arg) for arg in sys.argv[1:]))
+    spec_count, order_count = archive_dismissed(cutoff)
+    print(f"Уволенные до {cutoff}: перенесено в архив сотрудников {spec_count}, приказов {order_count}")
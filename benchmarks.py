@@ -0,0 +1,246 @@
+"""
+Замеры производительности работы с базой данных Olimp. Запускаются на базе, настроенной в config.py.
+
+Использование: python benchmarks.py <замер> [количество повторов]
+"""
+from datetime import date, timedelta
+from db_backends import get_backend
+from documents import OlimpDatabase, year_start
+import random
+import sys
+import time
+
+
+def _timed(func, repeat: int) -> float:
+    """
+    Возвращает среднее время выполнения функции в миллисекундах.
+    :param func: Callable
+    :param repeat: int
+    :return: float
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_prepared(repeat: int = 2000) -> None:
+    """
+    Сравнивает выполнение частых запросов (поиск внешнего ключа и запрос show()) в виде обычного текстового
+    запроса и подготовленного на сервере.
+    :param repeat: int
+    :return: None
+    """
+    statements = {
+        "Поиск id должности": ("SELECT id FROM Func WHERE function_name=%s;", ("Главный технолог",)),
+        "Поиск id причины": ("SELECT id FROM Dismissal_info WHERE short_reason=%s;", ("пт. 3 ст.77 ТК РФ",)),
+        "Documents.show()": ("""
+                SELECT d.doc_id, d.doc_name, f.function_name, d.time, d.number, d.period
+                FROM Func as f
+                JOIN Document as d ON f.id=d.function_id
+                ORDER BY f.function_name;
+                """, None),
+    }
+    print(f"{'Запрос':<30}{'Текстовый, мс':>16}{'Подготовленный, мс':>22}")
+    for name, (sql, params) in statements.items():
+        results = []
+        for prepared in (False, True):
+            with OlimpDatabase(prepared=prepared) as db:
+                db.query(sql, params)
+                results.append(_timed(lambda: db.query(sql, params), repeat))
+        print(f"{name:<30}{results[0]:>16.3f}{results[1]:>22.3f}")
+
+
+_BENCH_ORDERS = """
+    CREATE TABLE {name} (
+      id int NOT NULL,
+      order_id int NOT NULL,
+      order_date date NOT NULL,
+      true_reason varchar(200) DEFAULT NULL,
+      spec_id int NOT NULL,
+      reas_id int NOT NULL,
+      PRIMARY KEY ({key}){extra}
+    ){options};
+    """
+
+
+def _bench_orders_tables(first_year: int, last_year: int) -> dict[str, list[str]]:
+    """
+    Возвращает запросы создания таблиц для замера bench_partitions: "before" - как Order_of_dismissal
+    в исходной схеме, "after" - секционированная по годам (MySQL) или с индексом по дате (SQLite).
+    :param first_year: int
+    :param last_year: int
+    :return: dict[str, list[str]]
+    """
+    before = [_BENCH_ORDERS.format(name="Bench_orders_before", key="id", extra="", options="")]
+    if get_backend().name != "mysql":
+        return {"before": before,
+                "after": [_BENCH_ORDERS.format(name="Bench_orders_after", key="id", extra="", options=""),
+                          "CREATE INDEX bench_orders_after_date ON Bench_orders_after (order_date);"]}
+    partitions = ", ".join(f"PARTITION p{year} VALUES LESS THAN ({year + 1})"
+                           for year in range(first_year, last_year + 1))
+    options = f" PARTITION BY RANGE (YEAR(order_date)) ({partitions}, PARTITION p_future VALUES LESS THAN MAXVALUE)"
+    return {"before": before,
+            "after": [_BENCH_ORDERS.format(name="Bench_orders_after", key="id, order_date",
+                                           extra=",\n      KEY order_date (order_date)", options=options)]}
+
+
+def bench_partitions(repeat: int = 10, rows: int = 2000000) -> None:
+    """
+    Сравнивает выборки приказов об увольнении с фильтром по году на сгенерированных данных: до изменения -
+    таблица исходной схемы и условие YEAR(order_date), после - таблица, секционированная по годам
+    (в SQLite - с индексом по дате), и условие на диапазон дат. Отдельно сравнивается удаление приказов
+    одного года: DELETE и удаление секции. Таблицы Bench_orders_* удаляются после замера.
+    :param repeat: int
+    :param rows: int
+    :return: None
+    """
+    first_year, last_year = 2000, 2024
+    first_day = date(first_year, 1, 1)
+    days = (date(last_year, 12, 31) - first_day).days + 1
+    tables = _bench_orders_tables(first_year, last_year)
+    insert = "INSERT INTO {name} VALUES (%s, %s, %s, %s, %s, %s)"
+    year = str(last_year - 2)
+    queries = {
+        "Анкета (с года)": (
+            ("SELECT COUNT(*), COUNT(true_reason) FROM Bench_orders_before WHERE YEAR(order_date)>=%s;", (year,)),
+            ("SELECT COUNT(*), COUNT(true_reason) FROM Bench_orders_after WHERE order_date>=%s;",
+             (year_start(year),))),
+        "Приказы за год": (
+            ("SELECT COUNT(*), MAX(order_id) FROM Bench_orders_before WHERE YEAR(order_date)=%s;", (year,)),
+            ("SELECT COUNT(*), MAX(order_id) FROM Bench_orders_after WHERE order_date>=%s AND order_date<%s;",
+             (year_start(year), year_start(str(int(year) + 1))))),
+    }
+    with OlimpDatabase(prepared=False) as db:
+        try:
+            cursor = db.connection.cursor()
+            for name, statements in tables.items():
+                db.execute(f"DROP TABLE IF EXISTS Bench_orders_{name};")
+                for statement in statements:
+                    db.execute(statement)
+                sql = get_backend().translate(insert.format(name=f"Bench_orders_{name}"), ())[0][0]
+                generator = random.Random(42)
+                for chunk in range(0, rows, 10000):
+                    cursor.executemany(sql, [
+                        (i, i, (first_day + timedelta(days=generator.randrange(days))).isoformat(),
+                         "Маленькая зарплата" if i % 3 else None, generator.randrange(1, 5000), i % 4 + 1)
+                        for i in range(chunk + 1, min(chunk + 10000, rows) + 1)])
+                db.commit()
+            print(f"Строк: {rows}, годы {first_year}-{last_year}, движок {get_backend().name}")
+            print(f"{'Запрос':<30}{'До, мс':>12}{'После, мс':>12}{'Ускорение':>12}")
+            for title, variants in queries.items():
+                results = []
+                for sql, params in variants:
+                    db.query(sql, params)
+                    results.append(_timed(lambda: db.query(sql, params), repeat))
+                print(f"{title:<30}{results[0]:>12.2f}{results[1]:>12.2f}{results[0] / results[1]:>11.1f}x")
+
+            deletes = [("DELETE FROM Bench_orders_before WHERE YEAR(order_date)=%s;", (str(first_year),))]
+            if get_backend().name == "mysql":
+                deletes.append((f"ALTER TABLE Bench_orders_after DROP PARTITION p{first_year};", None))
+            else:
+                deletes.append(("DELETE FROM Bench_orders_after WHERE order_date>=%s AND order_date<%s;",
+                                (year_start(str(first_year)), year_start(str(first_year + 1)))))
+            results = []
+            for sql, params in deletes:
+                results.append(_timed(lambda: (db.execute(sql, params), db.commit()), 1))
+            print(f"{f'Удаление приказов {first_year} г.':<30}{results[0]:>12.2f}{results[1]:>12.2f}"
+                  f"{results[0] / results[1]:>11.1f}x")
+        finally:
+            for name in tables:
+                db.execute(f"DROP TABLE IF EXISTS Bench_orders_{name};")
+
+
+def bench_pdf(rows: int = 50000) -> None:
+    """
+    Сравнивает экспорт таблицы из rows строк в PDF одним процессом и по частям в нескольких процессах
+    (по количеству ядер процессора). Данные таблицы создаются без обращения к базе.
+    :param rows: int
+    :return: None
+    """
+    from pdf_export import export_pdf
+    from records import SpecialistRecord
+    import os
+    import tempfile
+
+    generator = random.Random(42)
+    data = [SpecialistRecord((i, f"Сотрудник {i}", date(1960, 1, 1) + timedelta(days=generator.randrange(15000)),
+                              "Инженер", date(2000, 1, 1) + timedelta(days=generator.randrange(8000)), None))
+            for i in range(rows)]
+    workers = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "bench.pdf")
+        export_pdf(file_name, "Сотрудники", list(SpecialistRecord.headers), data[:10], workers=1)
+        print(f"Строк: {rows}, ядер: {workers}")
+        print(f"{'Процессов':<12}{'Страниц':>10}{'Время, с':>12}")
+        for count in sorted({1, workers}):
+            start = time.perf_counter()
+            pages = export_pdf(file_name, "Сотрудники", list(SpecialistRecord.headers), data, workers=count)
+            print(f"{count:<12}{pages:>10}{time.perf_counter() - start:>12.2f}")
+
+
+def bench_round_trips() -> None:
+    """
+    Подсчитывает обращения к серверу базы данных при типичных действиях пользователя (без кэша результатов):
+    запросы и команды управления транзакциями (BEGIN/COMMIT/ROLLBACK и транзакции согласованного чтения,
+    см. QUERY_STATS). До перехода на autocommit
+    каждое подключение завершалось COMMIT, поэтому прежнее количество - запросы и по одному COMMIT на подключение.
+    Редактирование строки записывает в таблицу Func её же значения.
+    :return: None
+    """
+    from db_stats import QUERY_STATS
+    from documents import RESULT_CACHE, ChangeLog, DocumentHandler, Subdivision, Units
+
+    backend = get_backend()
+    release = backend.release
+    sessions = 0
+
+    def counting_release(conn) -> None:
+        nonlocal sessions
+        sessions += 1
+        release(conn)
+
+    version = ChangeLog.current_version()
+    # Первый опрос сокращает журнал изменений (не чаще раза в час) и в замер не входит.
+    ChangeLog.pull(version)
+    row = Subdivision.show()[1][0]
+    actions = {
+        "Открыть таблицу \"Сотрудники\"": Units.show,
+        "Открыть \"Штатное расписание\"": DocumentHandler.staff_list,
+        "Справка о недостающих кадрах": DocumentHandler.missing_unit_info,
+        "Опрос журнала изменений": lambda: ChangeLog.pull(version),
+        "Редактировать строку": lambda: Subdivision.edit_data(*map(str, row), str(row.function_id)),
+        "Выгрузка всех документов": lambda: list(DocumentHandler.all_reports()),
+    }
+    print(f"{'Действие':<34}{'Запросов':>10}{'До':>6}{'После':>8}{'Сэкономлено':>14}")
+    backend.release = counting_release
+    try:
+        for title, action in actions.items():
+            RESULT_CACHE.clear()
+            QUERY_STATS.reset()
+            sessions = 0
+            action()
+            counts = {site: count for site, count, *_ in QUERY_STATS.summary() if site != "connect"}
+            transactions = sum(counts.pop(site, 0) for site in ("begin", "commit", "rollback"))
+            snapshot = counts.pop("snapshot", 0)
+            statements = sum(counts.values())
+            before, after = statements + snapshot + sessions, statements + snapshot + transactions
+            print(f"{title:<34}{statements:>10}{before:>6}{after:>8}{before - after:>14}")
+    finally:
+        backend.release = release
+
+
+BENCHMARKS = {
+    "prepared": bench_prepared,
+    "partitions": bench_partitions,
+    "pdf": bench_pdf,
+    "round_trips": bench_round_trips,
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print("Доступные замеры:", ", ".join(BENCHMARKS))
+        sys.exit(1)
+    args = [int(arg) for arg in sys.argv[2:]]
+    BENCHMARKS[sys.argv[1]](*args)
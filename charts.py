@@ -0,0 +1,169 @@
+"""
+Построение графических изображений документов. Используется объектный API matplotlib с холстом Agg без pyplot,
+поэтому изображения можно строить в фоновых потоках. Готовые изображения кэшируются по хэшу данных.
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import multiprocessing
+import textwrap
+import threading
+
+CHART_CACHE_SIZE = 32
+
+
+class ChartCache:
+    """
+    Класс описывает кэш готовых изображений. Ключом является хэш данных и параметров построения,
+    при переполнении удаляются давно не использовавшиеся изображения.
+    """
+
+    def __init__(self, size: int = CHART_CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._images: OrderedDict[str, bytes] = OrderedDict()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """
+        Возвращает хэш переданных данных. Массивы NumPy хэшируются по содержимому.
+        :param parts: Any
+        :return: str
+        """
+        digest = hashlib.sha1()
+        for part in parts:
+            digest.update(part.tobytes() if hasattr(part, "tobytes") and part.dtype != object else repr(part).encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def put(self, key: str, image: bytes) -> None:
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.size:
+                self._images.popitem(last=False)
+
+
+CHART_CACHE = ChartCache()
+
+
+def pareto_figure(reasons, counts):
+    """
+    Создаёт фигуру matplotlib с диаграммой Парето.
+    :param reasons: np.ndarray
+    :param counts: np.ndarray
+    :return: matplotlib.figure.Figure
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import PercentFormatter
+    import numpy as np
+
+    total = counts.sum() or 1
+    perc = np.round(counts / total * 100, 2)
+    cumperc = np.round(counts.cumsum() / total * 100, 2)
+
+    color1 = "steelblue"
+    color2 = "red"
+    line_size = 4
+
+    fig = Figure(figsize=(8, 4.5))
+    ax = fig.subplots()
+    ax.bar(reasons, perc, color=color1)
+    ax.set_ylim(bottom=0, top=100)
+    ax.yaxis.set_major_formatter(PercentFormatter())
+    ax2 = ax.twinx()
+    ax2.plot(reasons, cumperc, color=color2, marker="D", ms=line_size)
+    ax2.set_ylim(bottom=0)
+    ax2.yaxis.set_major_formatter(PercentFormatter())
+    ax.tick_params(axis="y", color=color1)
+    ax2.tick_params(axis="y", color=color2)
+    ax.tick_params(axis="x", labelsize=6)
+    ax.set_xticks(range(len(reasons)))
+    ax.set_xticklabels([textwrap.fill(str(reason), width=10, break_long_words=False) for reason in reasons],
+                       rotation=45)
+    ax.set_title("Диаграмма Парето")
+    fig.set_tight_layout(True)
+    return fig
+
+
+def render_figure(fig, fmt: str = "png", dpi: int = 100) -> bytes:
+    """
+    Отрисовывает фигуру с помощью холста Agg и возвращает изображение в заданном формате (png, svg, pdf).
+    :param fig: matplotlib.figure.Figure
+    :param fmt: str = "png"
+    :param dpi: int = 100
+    :return: bytes
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import io
+
+    buffer = io.BytesIO()
+    FigureCanvasAgg(fig).print_figure(buffer, format=fmt, dpi=dpi)
+    return buffer.getvalue()
+
+
+def _pareto_key(reasons, counts, year: str, fmt: str, dpi: int) -> str:
+    return CHART_CACHE.make_key("pareto", year, fmt, dpi, reasons.tolist(), counts)
+
+
+def pareto_chart(reasons, counts, year: str, fmt: str = "png", dpi: int = 100) -> bytes:
+    """
+    Возвращает изображение диаграммы Парето из кэша или строит его.
+    :param reasons: np.ndarray
+    :param counts: np.ndarray
+    :param year: str
+    :param fmt: str = "png"
+    :param dpi: int = 100
+    :return: bytes
+    """
+    key = _pareto_key(reasons, counts, year, fmt, dpi)
+    image = CHART_CACHE.get(key)
+    if image is None:
+        image = render_figure(pareto_figure(reasons, counts), fmt, dpi)
+        CHART_CACHE.put(key, image)
+    return image
+
+
+def _render_pareto(reasons, counts, fmt: str, dpi: int) -> bytes:
+    return render_figure(pareto_figure(reasons, counts), fmt, dpi)
+
+
+def pareto_charts(datasets: dict[str, tuple], fmt: str = "png", dpi: int = 100,
+                  workers: int | None = None) -> dict[str, bytes]:
+    """
+    Возвращает изображения диаграмм Парето для нескольких годов. Изображения, которых нет в кэше, строятся
+    параллельно в отдельных процессах.
+    :param datasets: dict[str, tuple] - год: (причины, количество)
+    :param fmt: str = "png"
+    :param dpi: int = 100
+    :param workers: int | None = None
+    :return: dict[str, bytes]
+    """
+    images = {}
+    missing = {}
+    for year, (reasons, counts) in datasets.items():
+        key = _pareto_key(reasons, counts, year, fmt, dpi)
+        image = CHART_CACHE.get(key)
+        if image is None:
+            missing[year] = (key, reasons, counts)
+        else:
+            images[year] = image
+    if len(missing) == 1:
+        year, (key, reasons, counts) = missing.popitem()
+        images[year] = pareto_chart(reasons, counts, year, fmt, dpi)
+    if missing:
+        # Процессы запускаются методом spawn: fork процесса с запущенными потоками Qt небезопасен.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {year: pool.submit(_render_pareto, reasons, counts, fmt, dpi)
+                       for year, (_, reasons, counts) in missing.items()}
+        for year, future in futures.items():
+            images[year] = future.result()
+            CHART_CACHE.put(missing[year][0], images[year])
+    return {year: images[year] for year in datasets}
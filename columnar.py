@@ -0,0 +1,122 @@
+"""
+Построение столбцовых массивов NumPy (или таблиц Arrow) из результатов запросов без создания объекта Python
+на каждую ячейку.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+import numpy as np
+
+from records import DATE, DATETIME, FLOAT, INT, TEXT
+
+_ARROW_TYPES = {INT: "int64", FLOAT: "float64", DATE: "date32", DATETIME: "timestamp[us]", TEXT: "string"}
+
+
+def _raw_column(values: tuple, kind: str) -> np.ndarray:
+    """
+    Преобразует столбец необработанных значений (bytes из C-расширения MySQL) в типизированный массив.
+    Пустые значения становятся NaN для чисел и NaT для дат.
+    :param values: tuple
+    :param kind: str
+    :return: np.ndarray
+    """
+    if kind == TEXT:
+        return np.array([None if value is None else bytes(value).decode() for value in values], dtype=object)
+    if kind == INT and None not in values:
+        return np.array(values, dtype="S").astype(np.int64)
+    if kind in (INT, FLOAT):
+        return np.array([b"nan" if value is None else value for value in values], dtype="S").astype(np.float64)
+    unit = "datetime64[D]" if kind == DATE else "datetime64[us]"
+    return np.array([b"NaT" if value is None else value for value in values], dtype="S").astype(unit)
+
+
+def _infer_kind(values: tuple) -> str | None:
+    """
+    Определяет тип столбца по первому непустому значению. Для столбца без непустых значений возвращает None.
+    :param values: tuple
+    :return: str | None
+    """
+    sample = next((value for value in values if value is not None), None)
+    if sample is None:
+        return None
+    if isinstance(sample, bool):
+        return TEXT
+    if isinstance(sample, int):
+        return INT
+    if isinstance(sample, (float, Decimal)):
+        return FLOAT
+    if isinstance(sample, datetime):
+        return DATETIME
+    if isinstance(sample, date):
+        return DATE
+    return TEXT
+
+
+def _typed_column(values: tuple, kind: str) -> np.ndarray:
+    """
+    Преобразует столбец значений Python в типизированный массив.
+    :param values: tuple
+    :param kind: str
+    :return: np.ndarray
+    """
+    if kind == TEXT:
+        return np.array(values, dtype=object)
+    if kind == INT and None not in values:
+        return np.fromiter(values, dtype=np.int64, count=len(values))
+    if kind in (INT, FLOAT):
+        return np.fromiter((np.nan if value is None else float(value) for value in values),
+                           dtype=np.float64, count=len(values))
+    unit = "datetime64[D]" if kind == DATE else "datetime64[us]"
+    return np.array([np.datetime64("NaT") if value is None else value for value in values], dtype=unit)
+
+
+def infer_kinds(rows: list, count: int, kinds: list[str | None] | None = None) -> list[str | None]:
+    """
+    Определяет типы столбцов по значениям строк. Используется, чтобы при выборке частями все части
+    имели одинаковые типы столбцов: типы, уже известные по предыдущим частям (kinds), сохраняются,
+    для столбцов без непустых значений возвращается None.
+    :param rows: list
+    :param count: int - количество столбцов
+    :param kinds: list[str | None] | None = None
+    :return: list[str | None]
+    """
+    columns = list(zip(*rows)) if rows else [()] * count
+    kinds = kinds or [None] * count
+    return [kind or _infer_kind(values) for kind, values in zip(kinds, columns)]
+
+
+def rows_to_columns(rows: list, names: list[str], kinds: list[str | None] | None = None,
+                    raw: bool = False) -> dict[str, np.ndarray]:
+    """
+    Возвращает словарь, где ключами являются имена столбцов, а значениями - массивы NumPy.
+    Для необработанных строк (raw=True) типы столбцов должны быть переданы в kinds, иначе определяются по значениям.
+    :param rows: list
+    :param names: list[str]
+    :param kinds: list[str | None] | None = None
+    :param raw: bool = False
+    :return: dict[str, np.ndarray]
+    """
+    kinds = kinds or [None] * len(names)
+    columns = list(zip(*rows)) if rows else [()] * len(names)
+    result = {}
+    for name, kind, values in zip(names, kinds, columns):
+        if raw:
+            result[name] = _raw_column(values, kind or TEXT)
+        else:
+            result[name] = _typed_column(values, kind or _infer_kind(values) or TEXT)
+    return result
+
+
+def to_arrow(columns: dict[str, np.ndarray], kinds: list[str | None] | None = None):
+    """
+    Преобразует словарь массивов в pyarrow.Table. Если переданы типы столбцов kinds, столбцы получают
+    соответствующие им типы Arrow (целые числа - int64 и при наличии пустых значений), иначе тип определяется
+    по массиву, и столбец из одних пустых значений получает тип null. Требует установленного пакета pyarrow.
+    :param columns: dict[str, np.ndarray]
+    :param kinds: list[str | None] | None = None
+    :return: pyarrow.Table
+    """
+    import pyarrow as pa
+    if kinds is None:
+        return pa.table({name: pa.array(values, from_pandas=True) for name, values in columns.items()})
+    return pa.table({name: pa.array(values, type=pa.type_for_alias(_ARROW_TYPES[kind or TEXT]), from_pandas=True)
+                     for (name, values), kind in zip(columns.items(), kinds)})
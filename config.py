@@ -1,6 +1,70 @@
 import os
 
 HOST = 'localhost'
+# Порт сервера MySQL.
+PORT = int(os.getenv("OLIMP_PORT", "3306"))
 USER = os.getenv("MySQL_USER")
 PASSWORD = os.getenv("MySQL_PASSWORD")
 DATABASE = 'olimp'
+
+# Сервер-реплика MySQL, к которому направляются запросы документов и просмотра таблиц; пустая строка - все запросы
+# выполняются на основном сервере HOST.
+REPLICA_HOST = os.getenv("OLIMP_REPLICA_HOST", "")
+REPLICA_PORT = int(os.getenv("OLIMP_REPLICA_PORT", "3306"))
+# Интервал (в секундах) проверки отставания реплики: реплика используется, только если содержит все записи журнала
+# изменений основного сервера на момент последней проверки.
+REPLICA_CHECK_INTERVAL = float(os.getenv("OLIMP_REPLICA_CHECK_INTERVAL", "5"))
+# Время (в секундах), в течение которого реплика не используется после ошибки подключения к ней.
+REPLICA_RETRY_TIME = float(os.getenv("OLIMP_REPLICA_RETRY_TIME", "30"))
+
+# Движок базы данных: "mysql" или встроенный "sqlite" для однопользовательской установки.
+DB_BACKEND = os.getenv("OLIMP_DB_BACKEND", "mysql")
+# Файл базы SQLite; ":memory:" - база в памяти.
+SQLITE_PATH = os.getenv("OLIMP_SQLITE_PATH", "olimp.sqlite3")
+
+# Порог (в секундах), начиная с которого запрос записывается в журнал медленных запросов.
+SLOW_QUERY_TIME = float(os.getenv("OLIMP_SLOW_QUERY_TIME", "0.5"))
+# Выполнять EXPLAIN для медленных SELECT-запросов.
+EXPLAIN_SLOW_QUERIES = os.getenv("OLIMP_EXPLAIN_SLOW_QUERIES", "0") == "1"
+# Выводить сводку статистики запросов при завершении программы.
+QUERY_STATS_ON_EXIT = os.getenv("OLIMP_QUERY_STATS", "0") == "1"
+
+# Количество простаивающих подключений, которые сохраняются для повторного использования.
+POOL_SIZE = int(os.getenv("OLIMP_POOL_SIZE", "4"))
+# Время (в секундах), в течение которого результаты запросов на чтение берутся из кэша.
+CACHE_TTL = float(os.getenv("OLIMP_CACHE_TTL", "60"))
+
+# Выполнять запросы SELECT/INSERT/UPDATE/DELETE как подготовленные на сервере (только MySQL).
+PREPARED_STATEMENTS = os.getenv("OLIMP_PREPARED_STATEMENTS", "1") == "1"
+# Максимальное количество подготовленных запросов, хранимых для одного подключения.
+PREPARED_CACHE_SIZE = int(os.getenv("OLIMP_PREPARED_CACHE_SIZE", "64"))
+
+# Интервал (в секундах) опроса журнала изменений, сделанных другими пользователями; 0 - не опрашивать.
+SYNC_INTERVAL = float(os.getenv("OLIMP_SYNC_INTERVAL", "5"))
+# Количество дней, в течение которых хранятся записи журнала изменений; 0 - не удалять записи.
+CHANGE_LOG_RETENTION = float(os.getenv("OLIMP_CHANGE_LOG_RETENTION", "7"))
+# Интервал (в секундах) между удалениями устаревших записей журнала изменений одной программой.
+CHANGE_LOG_PRUNE_INTERVAL = float(os.getenv("OLIMP_CHANGE_LOG_PRUNE_INTERVAL", "3600"))
+# Время (в секундах), в течение которого пропущенные номера журнала изменений запрашиваются повторно: запись
+# транзакции, начатой раньше, может быть зафиксирована после записей с большими номерами.
+CHANGE_LOG_GAP_TIMEOUT = float(os.getenv("OLIMP_CHANGE_LOG_GAP_TIMEOUT", "120"))
+
+# Каталог постоянного кэша результатов документов и таблиц; пустая строка - не сохранять результаты на диск.
+REPORT_CACHE_DIR = os.getenv("OLIMP_REPORT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "olimp"))
+# Максимальный размер постоянного кэша в мегабайтах.
+REPORT_CACHE_SIZE = float(os.getenv("OLIMP_REPORT_CACHE_SIZE", "50"))
+# Количество лет после увольнения, по истечении которых сотрудник переносится в архив (см. archive.py).
+ARCHIVE_AFTER_YEARS = int(os.getenv("OLIMP_ARCHIVE_AFTER_YEARS", "3"))
+
+# Количество страниц PDF, которые формируются одним процессом при экспорте больших документов (см. pdf_export.py).
+PDF_CHUNK_PAGES = int(os.getenv("OLIMP_PDF_CHUNK_PAGES", "100"))
+# Количество процессов формирования PDF; 0 - по количеству ядер процессора.
+PDF_WORKERS = int(os.getenv("OLIMP_PDF_WORKERS", "0"))
+
+# Ограничение времени выполнения одного запроса документа в секундах; 0 - без ограничения.
+REPORT_TIMEOUT = float(os.getenv("OLIMP_REPORT_TIMEOUT", "30"))
+# Ограничения для отдельных документов по имени метода DocumentHandler: "pareto_data=10,staff_matrix=120".
+REPORT_TIMEOUTS = {name.strip(): float(seconds) for name, seconds in
+                   (item.split("=") for item in os.getenv("OLIMP_REPORT_TIMEOUTS", "").split(",") if item.strip())}
+# Время ожидания (в секундах) подключения, через которое прерывается запрос отменённого документа.
+INTERRUPT_CONNECT_TIMEOUT = int(os.getenv("OLIMP_INTERRUPT_CONNECT_TIMEOUT", "2"))
@@ -0,0 +1,623 @@
+from collections import OrderedDict
+from config import *
+from datetime import date
+from db_stats import QUERY_STATS
+from functools import lru_cache
+from typing import Any, Callable
+import math
+import re
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+
+
+class DatabaseBackend:
+    """
+    Базовый класс движка базы данных. Отвечает за создание подключения и перевод SQL-запросов программы,
+    написанных для MySQL, в диалект конкретного движка.
+    """
+
+    name = ""
+    explain_prefix = "EXPLAIN "
+
+    def __init__(self):
+        self._pool_lock = threading.Lock()
+        self._idle = []
+
+    def acquire(self):
+        """
+        Возвращает подключение из пула простаивающих подключений или создаёт новое.
+        :return: DB-API подключение
+        """
+        with self._pool_lock:
+            while self._idle:
+                conn = self._idle.pop()
+                if self.is_alive(conn):
+                    return conn
+        start = time.perf_counter()
+        conn = self.connect()
+        QUERY_STATS.record("connect", time.perf_counter() - start)
+        return conn
+
+    def release(self, conn) -> None:
+        """
+        Возвращает подключение в пул. Если пул заполнен, подключение закрывается.
+        :param conn: DB-API подключение
+        :return: None
+        """
+        with self._pool_lock:
+            if len(self._idle) < POOL_SIZE:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def is_alive(self, conn) -> bool:
+        """
+        Проверяет, что подключение из пула можно использовать.
+        :param conn: DB-API подключение
+        :return: bool
+        """
+        return True
+
+    def connect(self):
+        """
+        Создаёт новое подключение к базе данных.
+        :return: DB-API подключение
+        """
+        raise NotImplementedError
+
+    def prepared_cursor(self, conn, sql: str):
+        """
+        Возвращает курсор с подготовленным на сервере запросом sql или None, если движок их не поддерживает.
+        :param conn: DB-API подключение
+        :param sql: str
+        :return: курсор | None
+        """
+        return None
+
+    def normalize_prepared(self, rows: list, description: list) -> list:
+        """
+        Приводит строки, полученные подготовленным запросом, к виду, который возвращает обычный курсор.
+        :param rows: list
+        :param description: list - описание столбцов курсора
+        :return: list
+        """
+        return rows
+
+    def raw_cursor(self, conn):
+        """
+        Возвращает курсор для столбцовой выборки. Если движок умеет возвращать необработанные значения,
+        курсор возвращает bytes без преобразования в объекты Python.
+        :param conn: DB-API подключение
+        :return: курсор
+        """
+        return conn.cursor()
+
+    def column_kinds(self, description: list) -> list[str] | None:
+        """
+        Возвращает типы столбцов (см. columnar) для курсора из raw_cursor или None, если курсор возвращает
+        обычные значения Python и типы определяются по ним.
+        :param description: list
+        :return: list[str] | None
+        """
+        return None
+
+    def table_kinds(self, conn, table: str) -> list[str] | None:
+        """
+        Возвращает типы столбцов таблицы (см. columnar) по её схеме или None, если движок сообщает типы
+        столбцов результата запроса (column_kinds).
+        :param conn: DB-API подключение
+        :param table: str
+        :return: list[str] | None
+        """
+        return None
+
+    def begin(self, conn) -> None:
+        """
+        Начинает транзакцию на подключении, работающем в режиме autocommit.
+        :param conn: DB-API подключение
+        :return: None
+        """
+        raise NotImplementedError
+
+    def begin_snapshot(self, conn) -> None:
+        """
+        Начинает транзакцию только для чтения, все запросы которой видят один снимок данных.
+        :param conn: DB-API подключение
+        :return: None
+        """
+        raise NotImplementedError
+
+    def limit_time(self, sql: str, timeout: float) -> str:
+        """
+        Возвращает запрос sql с ограничением времени выполнения timeout секунд, если движок задаёт его в тексте
+        запроса. Иначе время ограничивается проверкой из watch.
+        :param sql: str
+        :param timeout: float
+        :return: str
+        """
+        return sql
+
+    def watch(self, conn, should_stop: Callable[[], bool] | None) -> None:
+        """
+        Устанавливает для подключения проверку, при срабатывании которой выполняемый запрос прерывается
+        (None - снимает её). Движки, прерывающие запросы на сервере, проверку не используют.
+        :param conn: DB-API подключение
+        :param should_stop: Callable[[], bool] | None
+        :return: None
+        """
+
+    def interrupt(self, conn) -> None:
+        """
+        Прерывает запрос, выполняемый на подключении conn в другом потоке. Подключение остаётся открытым.
+        :param conn: DB-API подключение
+        :return: None
+        """
+
+    def is_interrupted(self, error: Exception) -> bool:
+        """
+        Проверяет, что ошибка вызвана прерыванием запроса (по ограничению времени или из interrupt).
+        :param error: Exception
+        :return: bool
+        """
+        return False
+
+    def is_missing_table(self, error: Exception) -> bool:
+        """
+        Проверяет, что ошибка вызвана обращением к несуществующей таблице.
+        :param error: Exception
+        :return: bool
+        """
+        return False
+
+    def translate(self, sql: str, params: tuple) -> list[tuple[str, tuple]]:
+        """
+        Возвращает список пар (запрос, параметры), которые необходимо выполнить вместо переданного запроса.
+        :param sql: str
+        :param params: tuple
+        :return: list[tuple[str, tuple]]
+        """
+        return [(sql, params)]
+
+
+class MySQLBackend(DatabaseBackend):
+    """
+    Движок MySQL, параметры подключения берутся из config.py. Сервер (основной или реплика) задаётся
+    адресом host и портом port, у каждого сервера свой пул подключений.
+    """
+
+    name = "mysql"
+
+    def __init__(self, host: str = HOST, port: int = PORT):
+        super().__init__()
+        self.host = host
+        self.port = port
+        # Для каждого подключения хранятся курсоры с подготовленными запросами, ключ - текст запроса.
+        self._prepared = weakref.WeakKeyDictionary()
+
+    def connect(self, **options):
+        from mysql import connector
+        return connector.connect(
+                host=self.host,
+                port=self.port,
+                user=USER,
+                password=PASSWORD,
+                database=DATABASE,
+                # Запросы на чтение выполняются без транзакции, изменения - в явной (см. OlimpDatabase.begin).
+                autocommit=True,
+                **options
+                )
+
+    def is_alive(self, conn) -> bool:
+        return conn.is_connected()
+
+    def prepared_cursor(self, conn, sql: str):
+        with self._pool_lock:
+            statements = self._prepared.setdefault(conn, OrderedDict())
+        cursor = statements.get(sql)
+        if cursor is not None:
+            statements.move_to_end(sql)
+            return cursor
+        cursor = conn.cursor(prepared=True)
+        statements[sql] = cursor
+        if len(statements) > PREPARED_CACHE_SIZE:
+            _, oldest = statements.popitem(last=False)
+            oldest.close()
+        return cursor
+
+    def normalize_prepared(self, rows: list, description: list) -> list:
+        # Бинарный протокол передаёт столбцы FLOAT как 4-байтовые числа (0.2 -> 0.20000000298023224),
+        # поэтому они округляются до точности FLOAT, как при обычном текстовом протоколе. Столбцы DOUBLE
+        # и DECIMAL (в том числе результаты SUM/AVG) передаются точно и не изменяются.
+        from mysql.connector import FieldType
+        floats = [index for index, column in enumerate(description) if column[1] == FieldType.FLOAT]
+        if not floats:
+            return rows
+        normalized = []
+        for row in rows:
+            row = list(row)
+            for index in floats:
+                if row[index] is not None:
+                    row[index] = float(f"{row[index]:.7g}")
+            normalized.append(tuple(row))
+        return normalized
+
+    def raw_cursor(self, conn):
+        return conn.cursor(raw=True)
+
+    def begin(self, conn) -> None:
+        conn.start_transaction()
+
+    def begin_snapshot(self, conn) -> None:
+        conn.start_transaction(consistent_snapshot=True, isolation_level="REPEATABLE READ", readonly=True)
+
+    def limit_time(self, sql: str, timeout: float) -> str:
+        # Подсказка MAX_EXECUTION_TIME действует только на запрос, в котором указана, и не меняет настройки сеанса.
+        return _SELECT_RE.sub(f"SELECT /*+ MAX_EXECUTION_TIME({max(1, round(timeout * 1000))}) */", sql, count=1)
+
+    def interrupt(self, conn) -> None:
+        # KILL QUERY выполняется через отдельное подключение: прерывается только запрос, подключение остаётся в пуле.
+        # Короткое время ожидания не даёт отмене зависнуть, если сервер недоступен.
+        killer = self.connect(connection_timeout=INTERRUPT_CONNECT_TIMEOUT)
+        try:
+            cursor = killer.cursor()
+            cursor.execute(f"KILL QUERY {int(conn.connection_id)}")
+            cursor.close()
+        finally:
+            killer.close()
+
+    def is_interrupted(self, error: Exception) -> bool:
+        from mysql.connector import errorcode
+        return getattr(error, "errno", None) in (errorcode.ER_QUERY_TIMEOUT, errorcode.ER_QUERY_INTERRUPTED)
+
+    def is_missing_table(self, error: Exception) -> bool:
+        from mysql.connector import errorcode
+        return getattr(error, "errno", None) == errorcode.ER_NO_SUCH_TABLE
+
+    def column_kinds(self, description: list) -> list[str]:
+        from mysql.connector import FieldType
+        kinds = {
+            "int": ("TINY", "SHORT", "LONG", "LONGLONG", "INT24", "YEAR"),
+            "float": ("FLOAT", "DOUBLE", "DECIMAL", "NEWDECIMAL"),
+            "date": ("DATE", "NEWDATE"),
+            "datetime": ("DATETIME", "TIMESTAMP"),
+        }
+        by_code = {getattr(FieldType, name): kind for kind, names in kinds.items() for name in names}
+        return [by_code.get(column[1], "text") for column in description]
+
+
+_SELECT_RE = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+# Количество инструкций SQLite между проверками отмены и ограничения времени запроса.
+SQLITE_PROGRESS_STEPS = 1000
+_VIEW_RE = re.compile(r"^\s*CREATE\s+OR\s+REPLACE\s+VIEW\s+(\w+)\s+AS\b", re.IGNORECASE)
+_INT_RE = re.compile(r"^-?(0|[1-9]\d*)$")
+
+
+@lru_cache(maxsize=256)
+def _sqlite_dialect(sql: str) -> str:
+    """
+    Переводит запрос из диалекта MySQL в диалект SQLite.
+    :param sql: str
+    :return: str
+    """
+    sql = sql.replace("%s", "?")
+    sql = re.sub(r"\bIF\s*\(", "IIF(", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"\bAS\s+SIGNED\b", "AS INTEGER", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"\bNOW\(\)\s*-\s*INTERVAL\s+\?\s+DAY\b", "datetime('now', -? || ' days')", sql,
+                 flags=re.IGNORECASE)
+    return sql
+
+
+def _sqlite_param(value):
+    """
+    MySQL сравнивает числовые строки как числа, поэтому целые числа, переданные строкой из интерфейса,
+    передаются в SQLite как int.
+    :param value: Any
+    :return: Any
+    """
+    if isinstance(value, str) and _INT_RE.match(value):
+        return int(value)
+    return value
+
+
+def _sqlite_literal(value) -> str:
+    """
+    Возвращает SQL-литерал для значения. Используется для представлений, в которых SQLite не допускает параметров.
+    :param value: Any
+    :return: str
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _sqlite_year(value) -> int | None:
+    """
+    Аналог функции YEAR из MySQL.
+    :param value: date | str | None
+    :return: int | None
+    """
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value.year
+    return int(str(value)[:4])
+
+
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("date", lambda value: date.fromisoformat(value.decode()))
+
+
+class SQLiteBackend(DatabaseBackend):
+    """
+    Встроенный движок SQLite для однопользовательской установки. База хранится в файле SQLITE_PATH (в режиме WAL)
+    или в памяти, если указано ":memory:". Схема создаётся из OlimpDBsqlite.sql при первом подключении.
+    """
+
+    name = "sqlite"
+    explain_prefix = "EXPLAIN QUERY PLAN "
+    schema_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "OlimpDBsqlite.sql")
+
+    def __init__(self, path: str = SQLITE_PATH):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        self._initialized = False
+        # Общая база в памяти существует, пока открыто хотя бы одно подключение к ней.
+        self._keeper = None
+
+    @property
+    def in_memory(self) -> bool:
+        return self.path == ":memory:"
+
+    def connect(self) -> sqlite3.Connection:
+        with self._lock:
+            if not self._initialized:
+                conn = self._open()
+                self._create_schema(conn)
+                if self.in_memory:
+                    self._keeper = conn
+                else:
+                    conn.close()
+                self._initialized = True
+        return self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        """
+        Открывает подключение и регистрирует функции MySQL, отсутствующие в SQLite.
+        :return: sqlite3.Connection
+        """
+        if self.in_memory:
+            conn = sqlite3.connect("file:olimp?mode=memory&cache=shared", uri=True,
+                                   detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.create_function("ceil", 1, lambda x: None if x is None else math.ceil(x), deterministic=True)
+        conn.create_function("floor", 1, lambda x: None if x is None else math.floor(x), deterministic=True)
+        conn.create_function("YEAR", 1, _sqlite_year, deterministic=True)
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        """
+        Создаёт таблицы и представления, если база пустая, и применяет миграции из каталога migrations,
+        номер которых больше записанного в PRAGMA user_version.
+        :param conn: sqlite3.Connection
+        :return: None
+        """
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='Func'").fetchone()
+        if not exists:
+            with open(self.schema_file, encoding="utf-8") as schema:
+                conn.executescript(schema.read())
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, path in self.migrations():
+            if number > version:
+                with open(path, encoding="utf-8") as migration:
+                    conn.executescript(migration.read())
+                conn.execute(f"PRAGMA user_version = {number}")
+
+    @classmethod
+    def migrations(cls) -> list[tuple[int, str]]:
+        """
+        Возвращает отсортированный список миграций SQLite: номер и путь к файлу.
+        :return: list[tuple[int, str]]
+        """
+        directory = os.path.join(os.path.dirname(cls.schema_file), "migrations")
+        if not os.path.isdir(directory):
+            return []
+        return sorted((int(name.split("_", 1)[0]), os.path.join(directory, name))
+                      for name in os.listdir(directory) if name.endswith(".sqlite.sql"))
+
+    def table_kinds(self, conn: sqlite3.Connection, table: str) -> list[str]:
+        # Тип определяется по объявленному типу столбца по правилам приведения типов SQLite.
+        kinds = []
+        for column in conn.execute(f"PRAGMA table_info({table})"):
+            declared = column[2].upper()
+            if declared.startswith(("DATETIME", "TIMESTAMP")):
+                kinds.append("datetime")
+            elif declared.startswith("DATE"):
+                kinds.append("date")
+            elif "INT" in declared:
+                kinds.append("int")
+            elif any(name in declared for name in ("REAL", "FLOA", "DOUB", "DEC", "NUMERIC")):
+                kinds.append("float")
+            else:
+                kinds.append("text")
+        return kinds
+
+    def begin(self, conn: sqlite3.Connection) -> None:
+        conn.execute("BEGIN")
+
+    def begin_snapshot(self, conn: sqlite3.Connection) -> None:
+        # Снимок данных в режиме WAL фиксируется первым чтением после BEGIN.
+        conn.execute("BEGIN")
+        conn.execute("SELECT count(*) FROM sqlite_master").fetchone()
+
+    def watch(self, conn: sqlite3.Connection, should_stop: Callable[[], bool] | None) -> None:
+        # Обработчик вызывается каждые SQLITE_PROGRESS_STEPS инструкций и прерывает запрос, вернув True.
+        conn.set_progress_handler(should_stop, SQLITE_PROGRESS_STEPS)
+
+    def is_interrupted(self, error: Exception) -> bool:
+        return isinstance(error, sqlite3.OperationalError) and str(error) == "interrupted"
+
+    def is_missing_table(self, error: Exception) -> bool:
+        return isinstance(error, sqlite3.OperationalError) and str(error).startswith("no such table")
+
+    def translate(self, sql: str, params: tuple) -> list[tuple[str, tuple]]:
+        params = tuple(_sqlite_param(param) for param in params)
+        view = _VIEW_RE.match(sql)
+        if not view:
+            return [(_sqlite_dialect(sql), params)]
+        body = sql[view.end():]
+        for param in params:
+            body = body.replace("%s", _sqlite_literal(param), 1)
+        return [(f"DROP VIEW IF EXISTS {view.group(1)}", ()),
+                (_sqlite_dialect(f"CREATE VIEW {view.group(1)} AS{body}"), ())]
+
+
+_backends: dict[str, DatabaseBackend] = {}
+
+
+def get_backend(name: str = DB_BACKEND) -> DatabaseBackend:
+    """
+    Возвращает движок базы данных по его имени ("mysql" или "sqlite").
+    :param name: str
+    :return: DatabaseBackend
+    """
+    if name not in _backends:
+        backend_classes = {cls.name: cls for cls in (MySQLBackend, SQLiteBackend)}
+        try:
+            _backends[name] = backend_classes[name]()
+        except KeyError:
+            raise ValueError(f"Неизвестный движок базы данных: {name}") from None
+    return _backends[name]
+
+
+class ReplicaRouter:
+    """
+    Класс выбирает сервер для запросов на чтение: реплику, если она содержит все изменения, о которых известно
+    программе, иначе основной сервер. Отставание реплики определяется по журналу изменений Change_log: номер его
+    последней записи на реплике сравнивается с номером на основном сервере, который запрашивается не реже раза
+    в check_interval секунд, а также после каждой записи данных программой (чтение собственных изменений).
+    Если подключиться к реплике не удалось, retry_time секунд все запросы выполняются на основном сервере.
+    """
+
+    def __init__(self, primary: DatabaseBackend, replica: DatabaseBackend,
+                 check_interval: float = REPLICA_CHECK_INTERVAL, retry_time: float = REPLICA_RETRY_TIME):
+        self.primary = primary
+        self.replica = replica
+        self.check_interval = check_interval
+        self.retry_time = retry_time
+        self._lock = threading.Lock()
+        # Номер записи журнала, которую должна содержать реплика, и время, когда он получен с основного сервера.
+        self._required = 0
+        self._required_at = -math.inf
+        self._replica_version = -1
+        self._failed_at = -math.inf
+        # Реплика не используется, если на одном из серверов нет журнала изменений.
+        self.disabled = False
+
+    def seen(self, version: int) -> None:
+        """
+        Сообщает номер последней записи журнала изменений, полученный с основного сервера.
+        :param version: int
+        :return: None
+        """
+        with self._lock:
+            self._required = max(self._required, version)
+            self._required_at = time.monotonic()
+
+    def written(self) -> None:
+        """
+        Сообщает о записи данных на основной сервер: до того как реплика получит эти изменения, чтение
+        выполняется на основном сервере.
+        :return: None
+        """
+        with self._lock:
+            self._required_at = -math.inf
+
+    def failed(self) -> None:
+        """
+        Сообщает об ошибке подключения к реплике.
+        :return: None
+        """
+        with self._lock:
+            self._failed_at = time.monotonic()
+
+    def acquire(self) -> tuple[DatabaseBackend, Any]:
+        """
+        Возвращает сервер для запроса на чтение и подключение к нему из пула.
+        :return: tuple[DatabaseBackend, DB-API подключение]
+        """
+        if self.use_replica():
+            try:
+                return self.replica, self.replica.acquire()
+            except Exception:
+                self.failed()
+        return self.primary, self.primary.acquire()
+
+    def use_replica(self) -> bool:
+        """
+        Проверяет, что реплика доступна и не отстаёт от основного сервера. Если номер записи журнала не удалось
+        получить, чтение retry_time секунд выполняется на основном сервере; если на одном из серверов нет
+        таблицы Change_log, отставание определить нельзя и реплика больше не используется.
+        :return: bool
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.disabled or now - self._failed_at < self.retry_time:
+                return False
+            check_primary = now - self._required_at > self.check_interval
+        try:
+            if check_primary:
+                self.seen(self._version(self.primary))
+            if self._replica_version < self._required:
+                version = self._version(self.replica)
+                with self._lock:
+                    self._replica_version = max(self._replica_version, version)
+        except Exception as error:
+            if self.primary.is_missing_table(error) or self.replica.is_missing_table(error):
+                self.disabled = True
+                print("Чтение с реплики отключено: нет журнала изменений Change_log:", error, file=sys.stderr)
+            self.failed()
+            return False
+        return self._replica_version >= self._required
+
+    @staticmethod
+    def _version(backend: DatabaseBackend) -> int:
+        """
+        Возвращает номер последней записи журнала изменений на сервере.
+        :param backend: DatabaseBackend
+        :return: int
+        """
+        conn = backend.acquire()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(version), 0) FROM Change_log")
+            version = cursor.fetchone()[0]
+            cursor.close()
+        except Exception:
+            conn.close()
+            raise
+        backend.release(conn)
+        return version
+
+
+_router: ReplicaRouter | None = None
+
+
+def get_router() -> ReplicaRouter | None:
+    """
+    Возвращает ReplicaRouter, если в config.py задана реплика MySQL, иначе None.
+    :return: ReplicaRouter | None
+    """
+    global _router
+    if _router is None and DB_BACKEND == "mysql" and REPLICA_HOST:
+        _router = ReplicaRouter(get_backend(), MySQLBackend(REPLICA_HOST, REPLICA_PORT))
+    return _router
@@ -0,0 +1,93 @@
+import logging
+import re
+import sys
+import threading
+from typing import TextIO
+
+logger = logging.getLogger("olimp.sql")
+
+
+class QueryStatistics:
+    """
+    Класс собирает статистику выполнения SQL-запросов: время выполнения и количество строк, сгруппированные по месту
+    вызова в коде программы.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: dict[str, list] = {}
+
+    def record(self, site: str, elapsed: float, rows: int = 0) -> None:
+        """
+        Добавляет сведения об одном выполненном запросе.
+        :param site: str
+        :param elapsed: float
+        :param rows: int = 0
+        :return: None
+        """
+        with self._lock:
+            stat = self._sites.setdefault(site, [0, 0.0, 0.0, 0])
+            stat[0] += 1
+            stat[1] += elapsed
+            stat[2] = max(stat[2], elapsed)
+            stat[3] += max(rows, 0)
+
+    def summary(self) -> list[tuple[str, int, float, float, int]]:
+        """
+        Возвращает сводку по местам вызова, отсортированную по суммарному времени: место вызова, количество запросов,
+        суммарное время, максимальное время, количество строк.
+        :return: list[tuple[str, int, float, float, int]]
+        """
+        with self._lock:
+            rows = [(site, *stat) for site, stat in self._sites.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def reset(self) -> None:
+        """
+        Очищает накопленную статистику.
+        :return: None
+        """
+        with self._lock:
+            self._sites.clear()
+
+    def dump(self, stream: TextIO | None = None) -> None:
+        """
+        Выводит сводку статистики в виде таблицы.
+        :param stream: TextIO | None = None
+        :return: None
+        """
+        stream = stream or sys.stderr
+        summary = self.summary()
+        if not summary:
+            return
+        stream.write(f"{'Место вызова':<60}{'Кол-во':>8}{'Всего, мс':>12}{'Макс, мс':>12}{'Строк':>10}\n")
+        for site, count, total, longest, rows in summary:
+            stream.write(f"{site:<60}{count:>8}{total * 1000:>12.2f}{longest * 1000:>12.2f}{rows:>10}\n")
+
+
+QUERY_STATS = QueryStatistics()
+
+
+def compact_sql(sql: str) -> str:
+    """
+    Убирает из текста запроса лишние пробелы и переводы строк для записи в журнал.
+    :param sql: str
+    :return: str
+    """
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def log_slow_query(site: str, sql: str, params: tuple | None, elapsed: float, plan: list | None = None) -> None:
+    """
+    Записывает медленный запрос в журнал. Значения параметров не записываются, указывается только их количество.
+    :param site: str
+    :param sql: str
+    :param params: tuple | None
+    :param elapsed: float
+    :param plan: list | None = None
+    :return: None
+    """
+    logger.warning("Медленный запрос (%.1f мс) в %s: %s [параметров скрыто: %d]",
+                   elapsed * 1000, site, compact_sql(sql), len(params or ()))
+    for row in plan or ():
+        logger.warning("    EXPLAIN: %s", row)
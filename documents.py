@@ -1,99 +1,680 @@
 from config import *
 from datetime import date
-from matplotlib.ticker import PercentFormatter
-from mysql import connector
-from mysql.connector.cursor import MySQLCursor
-from typing import Callable, Any
-import matplotlib.pyplot as plt
-import pandas as pd
-import textwrap
+from db_backends import DatabaseBackend, get_backend, get_router
+from db_stats import QUERY_STATS, log_slow_query
+from records import (DismissalInfoRecord, DismissalOrderRecord, DocumentRecord, FuncRecord, Record,
+                     SpecialistRecord, WorkTimeRecord)
+from report_cache import DiskCache
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, Any, Iterator
+import atexit
+import os
+import re
+import sys
+import threading
+import time
+
+
+_PREPARABLE_RE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+# Запросы, изменяющие данные: перед ними начинается транзакция (изменение схемы в MySQL завершает её само).
+_WRITE_RE = re.compile(r"^\s*(INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+# Подключение транзакции согласованного чтения текущего потока (см. OlimpDatabase.snapshot).
+_snapshot = threading.local()
+# Стек QueryControl текущего потока.
+_control = threading.local()
+# Признак чтения с реплики в текущем потоке (см. OlimpDatabase.replica_reads).
+_route = threading.local()
+
+
+def in_snapshot() -> bool:
+    """
+    Возвращает True, если текущий поток выполняется внутри транзакции согласованного чтения.
+    :return: bool
+    """
+    return getattr(_snapshot, "connection", None) is not None
+
+
+def in_replica_reads() -> bool:
+    """
+    Возвращает True, если запросы текущего потока по умолчанию направляются на реплику.
+    :return: bool
+    """
+    return getattr(_route, "replica", False)
+
+
+def _acquire(replica: bool) -> tuple[DatabaseBackend, Any]:
+    """
+    Возвращает движок и подключение из пула: для чтения с реплики - сервер, выбранный ReplicaRouter,
+    иначе основной сервер.
+    :param replica: bool
+    :return: tuple[DatabaseBackend, MySQLConnection | sqlite3.Connection]
+    """
+    router = get_router() if replica else None
+    if router is not None:
+        return router.acquire()
+    backend = get_backend()
+    return backend, backend.acquire()
+
+
+class QueryCancelled(RuntimeError):
+    """
+    Запрос прерван пользователем (QueryControl.cancel).
+    """
+
+
+class QueryTimeout(QueryCancelled):
+    """
+    Запрос прерван по истечении ограничения времени QueryControl.timeout.
+    """
+
+
+class QueryControl:
+    """
+    Класс описывает ограничение времени и отмену запросов документа. Внутри блока with запросы OlimpDatabase
+    текущего потока выполняются не дольше timeout секунд каждый (0 - без ограничения). Метод cancel, вызванный
+    из другого потока, прерывает выполняемые запросы и все последующие; подключения после прерывания
+    возвращаются в пул.
+    """
+
+    def __init__(self, timeout: float = 0.0):
+        self.timeout = timeout
+        self.cancelled = False
+        self.timed_out = False
+        self._lock = threading.Lock()
+        self._running = []
+        # Подключения, запросы на которых прерываются, и события завершения прерывания.
+        self._interrupts = {}
+
+    @staticmethod
+    def current() -> "QueryControl | None":
+        """
+        Возвращает QueryControl, действующий в текущем потоке, или None.
+        :return: QueryControl | None
+        """
+        stack = getattr(_control, "stack", None)
+        return stack[-1] if stack else None
+
+    def __enter__(self):
+        if getattr(_control, "stack", None) is None:
+            _control.stack = []
+        _control.stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _control.stack.pop()
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Вызывает func с ограничением времени и возможностью отмены её запросов. Используется для выполнения
+        документа в фоновом потоке.
+        :param func: Callable
+        :return: Any
+        """
+        with self:
+            return func(*args, **kwargs)
+
+    def cancel(self) -> None:
+        """
+        Прерывает выполняемые запросы. Следующие запросы завершаются ошибкой QueryCancelled без обращения к базе.
+        Запросы прерываются в отдельных потоках, поэтому метод не ожидает сервер и может вызываться из потока
+        интерфейса.
+        :return: None
+        """
+        with self._lock:
+            self.cancelled = True
+            interrupts = [(entry, threading.Event()) for entry in self._running if entry not in self._interrupts]
+            self._interrupts.update(interrupts)
+        for (backend, conn), done in interrupts:
+            threading.Thread(target=self._interrupt, args=(backend, conn, done), daemon=True).start()
+
+    @staticmethod
+    def _interrupt(backend: Any, conn: Any, done: threading.Event) -> None:
+        """
+        Прерывает запрос на подключении conn и отмечает done по завершении (в том числе с ошибкой).
+        :param backend: DatabaseBackend
+        :param conn: MySQLConnection | sqlite3.Connection
+        :param done: threading.Event
+        :return: None
+        """
+        try:
+            backend.interrupt(conn)
+        except Exception as error:
+            print("Ошибка прерывания запроса:", error, file=sys.stderr)
+        finally:
+            done.set()
+
+    @contextmanager
+    def running(self, backend: Any, conn: Any) -> Iterator[None]:
+        """
+        Контекстный менеджер выполнения запроса на подключении conn: запрос можно прервать методом cancel,
+        а ошибка прерывания запроса переводится в QueryCancelled или QueryTimeout.
+        :param backend: DatabaseBackend
+        :param conn: MySQLConnection | sqlite3.Connection
+        :return: Iterator[None]
+        """
+        entry = (backend, conn)
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelled("Формирование документа отменено")
+            self._running.append(entry)
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        backend.watch(conn, lambda: self.cancelled or deadline is not None and time.monotonic() > deadline)
+        try:
+            yield
+        except Exception as e:
+            if not backend.is_interrupted(e):
+                raise
+            if self.cancelled:
+                raise QueryCancelled("Формирование документа отменено") from e
+            self.timed_out = True
+            raise QueryTimeout(f"Запрос выполнялся дольше {self.timeout:g} с и был остановлен") from e
+        finally:
+            backend.watch(conn, None)
+            with self._lock:
+                self._running.remove(entry)
+                interrupted = self._interrupts.pop(entry, None)
+            # Если cancel уже прерывает запрос, подключение вернётся в пул только после этого
+            # и прерывание не затронет чужой запрос.
+            if interrupted is not None:
+                interrupted.wait()
 
 
 class OlimpDatabase:
     """
-    Класс содержит методы по подсоединению и работе с базой данных Olimp.
+    Класс содержит методы по подсоединению и работе с базой данных Olimp. Движок базы (MySQL или SQLite)
+    выбирается параметром DB_BACKEND в config.py. Запросы SELECT/INSERT/UPDATE/DELETE выполняются как подготовленные
+    на сервере, если движок это поддерживает и prepared=True. При replica=True (по умолчанию - внутри replica_reads)
+    запросы выполняются на реплике MySQL, если она задана в config.py и не отстаёт от основного сервера.
     """
 
-    def __init__(self):
-        self._conn = connector.connect(
-                host=HOST,
-                user=USER,
-                password=PASSWORD,
-                database=DATABASE
-                )
+    def __init__(self, prepared: bool = PREPARED_STATEMENTS, replica: bool | None = None):
+        self.prepared = prepared
+        self._pinned = getattr(_snapshot, "connection", None)
+        if self._pinned is not None:
+            self._backend, self._conn = _snapshot.backend, self._pinned
+        else:
+            self._backend, self._conn = _acquire(in_replica_reads() if replica is None else replica)
         self._cursor = self._conn.cursor()
+        self._active_cursor = self._cursor
+        self._wrote = False
+
+    @classmethod
+    @contextmanager
+    def replica_reads(cls) -> Iterator[None]:
+        """
+        Контекстный менеджер: OlimpDatabase, созданные в этом потоке внутри блока без параметра replica,
+        выполняют запросы на реплике. Используется для документов и просмотра таблиц (см. cached).
+        :return: Iterator[None]
+        """
+        previous = in_replica_reads()
+        _route.replica = True
+        try:
+            yield
+        finally:
+            _route.replica = previous
+
+    @classmethod
+    @contextmanager
+    def snapshot(cls, replica: bool = False) -> Iterator[Any]:
+        """
+        Контекстный менеджер согласованного чтения: все OlimpDatabase, созданные в этом потоке внутри блока,
+        используют одно подключение, транзакция которого видит один снимок данных. При replica=True транзакция
+        выполняется на реплике.
+        :param replica: bool = False
+        :return: Iterator[MySQLConnection | sqlite3.Connection]
+        """
+        if getattr(_snapshot, "connection", None) is not None:
+            yield _snapshot.connection
+            return
+        backend, conn = _acquire(replica)
+        try:
+            start = time.perf_counter()
+            backend.begin_snapshot(conn)
+            QUERY_STATS.record("snapshot", time.perf_counter() - start)
+            _snapshot.connection, _snapshot.backend = conn, backend
+            yield conn
+        finally:
+            _snapshot.connection = _snapshot.backend = None
+            try:
+                start = time.perf_counter()
+                conn.rollback()
+                QUERY_STATS.record("snapshot", time.perf_counter() - start)
+            except Exception:
+                conn.close()
+                raise
+            backend.release(conn)
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
+        # Изменения фиксируются, только если блок with завершился без ошибки: иначе все запросы блока отменяются.
+        self.close(commit=exc_type is None)
 
     @property
-    def connection(self) -> connector.MySQLConnection:
+    def connection(self) -> Any:
         """
-        Возвращает объект подсоединения к MySQL.
-        :return: MySQLConnection
+        Возвращает объект подсоединения к базе данных.
+        :return: MySQLConnection | sqlite3.Connection
         """
         return self._conn
 
     @property
-    def cursor(self) -> MySQLCursor:
+    def cursor(self) -> Any:
         """
         Возвращает курсор.
-        :return: MySQLCursor
+        :return: MySQLCursor | sqlite3.Cursor
         """
         return self._cursor
 
+    def begin(self) -> None:
+        """
+        Начинает транзакцию, если она ещё не начата. Подключения работают в режиме autocommit, поэтому запросы
+        на чтение вне транзакции не требуют commit. Изменяющий данные execute начинает транзакцию сам, и все
+        изменения одного OlimpDatabase фиксируются вместе при close().
+        :return: None
+        """
+        if self._pinned is None and not self.connection.in_transaction:
+            start = time.perf_counter()
+            self._backend.begin(self.connection)
+            QUERY_STATS.record("begin", time.perf_counter() - start)
+
     def commit(self) -> None:
         """
-        Производит commit.
+        Производит commit, если начата транзакция.
         :return: None
         """
-        self.connection.commit()
+        if self.connection.in_transaction:
+            start = time.perf_counter()
+            self.connection.commit()
+            QUERY_STATS.record("commit", time.perf_counter() - start)
+
+    def rollback(self) -> None:
+        """
+        Производит rollback, если начата транзакция.
+        :return: None
+        """
+        if self.connection.in_transaction:
+            start = time.perf_counter()
+            self.connection.rollback()
+            QUERY_STATS.record("rollback", time.perf_counter() - start)
 
     def execute(self, sql: str, params: tuple | None = None) -> None:
         """
-        Выполняет SQL-запрос.
+        Выполняет SQL-запрос. Перед запросом, изменяющим данные, начинается транзакция (см. begin).
         :param sql: str
         :param params: tuple | None = None
         :return: None
         """
-        self.cursor.execute(sql, params or ())
+        if _WRITE_RE.match(sql):
+            self.begin()
+            # После записи чтение переходит на основной сервер, пока реплика не получит изменения.
+            self._wrote = True
+        start = time.perf_counter()
+        with self._running():
+            self._execute(sql, params)
+        self._record(sql, params, time.perf_counter() - start, self._active_cursor.rowcount)
+
+    def _statements(self, sql: str, params: tuple | None) -> list[tuple[str, tuple]]:
+        """
+        Переводит запрос в диалект текущего движка. Внутри QueryControl с ограничением времени в запросы
+        добавляется это ограничение, если движок задаёт его в тексте запроса.
+        :param sql: str
+        :param params: tuple | None
+        :return: list[tuple[str, tuple]]
+        """
+        statements = self._backend.translate(sql, params or ())
+        control = QueryControl.current()
+        if control is None or not control.timeout:
+            return statements
+        return [(self._backend.limit_time(statement, control.timeout), args) for statement, args in statements]
+
+    def _running(self) -> Any:
+        """
+        Возвращает контекстный менеджер выполнения запроса для QueryControl текущего потока.
+        :return: ContextManager[None]
+        """
+        control = QueryControl.current()
+        return control.running(self._backend, self.connection) if control is not None else nullcontext()
+
+    def _execute(self, sql: str, params: tuple | None) -> None:
+        """
+        Переводит запрос в диалект текущего движка и выполняет его.
+        :param sql: str
+        :param params: tuple | None
+        :return: None
+        """
+        for statement, args in self._statements(sql, params):
+            cursor = None
+            if self.prepared and _PREPARABLE_RE.match(statement):
+                cursor = self._backend.prepared_cursor(self.connection, statement)
+            self._active_cursor = cursor or self.cursor
+            self._active_cursor.execute(statement, args)
 
     def fetchall(self) -> list:
         """
         Возвращает список полученных после запроса значений
         :return: list
         """
-        return self.cursor.fetchall()
+        rows = self._active_cursor.fetchall()
+        if self._active_cursor is not self.cursor:
+            rows = self._backend.normalize_prepared(rows, self._active_cursor.description)
+        return rows
 
     def fetchone(self) -> Any | None:
         """
         Возвращает одно значение из запрошенных.
         :return: Any | None
         """
-        return self.cursor.fetchone()
+        row = self._active_cursor.fetchone()
+        if row is not None and self._active_cursor is not self.cursor:
+            row = self._backend.normalize_prepared([row], self._active_cursor.description)[0]
+        return row
 
-    def query(self, sql: str, params: tuple | None = None) -> list:
+    def query(self, sql: str, params: tuple | None = None, record: type[Record] | None = None) -> list:
         """
-        Выполняет запрос и возвращает список полученных значений.
+        Выполняет запрос и возвращает список полученных значений. При переданном record строки
+        возвращаются записями этого типа.
         :param sql: str
         :param params: tuple | None = None
+        :param record: type[Record] | None = None
         :return: list
         """
-        self.execute(sql, params or ())
-        return self.fetchall()
+        start = time.perf_counter()
+        with self._running():
+            self._execute(sql, params)
+            result = self.fetchall()
+        self._record(sql, params, time.perf_counter() - start, len(result))
+        return record.from_rows(result) if record is not None else result
+
+    def query_columns(self, sql: str, params: tuple | None = None, arrow: bool = False) -> Any:
+        """
+        Выполняет запрос и возвращает результат по столбцам: словарь {имя столбца: массив NumPy} или pyarrow.Table
+        при arrow=True. Числа возвращаются в массивах int64/float64 (пустые значения - NaN), даты в datetime64
+        (пустые - NaT), строки в массивах object. Для MySQL массивы строятся из необработанных значений
+        C-расширения без создания объекта Python на каждую ячейку.
+        :param sql: str
+        :param params: tuple | None = None
+        :param arrow: bool = False
+        :return: dict[str, np.ndarray] | pyarrow.Table
+        """
+        from columnar import rows_to_columns, to_arrow
+
+        start = time.perf_counter()
+        cursor = self._backend.raw_cursor(self.connection)
+        try:
+            with self._running():
+                for statement, args in self._statements(sql, params):
+                    cursor.execute(statement, args)
+                rows = cursor.fetchall()
+            names = [column[0] for column in cursor.description]
+            kinds = self._backend.column_kinds(cursor.description)
+        finally:
+            cursor.close()
+        self._record(sql, params, time.perf_counter() - start, len(rows))
+        columns = rows_to_columns(rows, names, kinds, raw=kinds is not None)
+        return to_arrow(columns) if arrow else columns
+
+    def table_kinds(self, table: str) -> list[str] | None:
+        """
+        Возвращает типы столбцов таблицы по схеме базы или None, если их сообщает результат запроса
+        (см. DatabaseBackend.table_kinds).
+        :param table: str
+        :return: list[str] | None
+        """
+        return self._backend.table_kinds(self.connection, table)
+
+    def iter_rows(self, sql: str, params: tuple | None = None, batch_size: int = 10000,
+                  raw: bool = False) -> Iterator[tuple[list[str], list[str] | None, list]]:
+        """
+        Выполняет запрос и возвращает результат частями по batch_size строк, не загружая его в память целиком:
+        курсор MySQL не буферизуется и строки читаются с сервера по мере обработки. Каждая часть возвращается
+        вместе с именами столбцов и их типами (при raw=True, если движок их сообщает, см. raw_cursor).
+        :param sql: str
+        :param params: tuple | None = None
+        :param batch_size: int = 10000
+        :param raw: bool = False
+        :return: Iterator[tuple[list[str], list[str] | None, list]]
+        """
+        start = time.perf_counter()
+        cursor = self._backend.raw_cursor(self.connection) if raw else self.connection.cursor()
+        count = 0
+        try:
+            with self._running():
+                for statement, args in self._statements(sql, params):
+                    cursor.execute(statement, args)
+            names = [column[0] for column in cursor.description]
+            kinds = self._backend.column_kinds(cursor.description) if raw else None
+            # Первая часть возвращается, даже если она пустая, чтобы были известны имена столбцов.
+            rows = cursor.fetchmany(batch_size)
+            while True:
+                count += len(rows)
+                yield names, kinds, rows
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+        except GeneratorExit:
+            # Непрочитанные строки небуферизованного курсора не позволят использовать подключение повторно.
+            cursor.fetchall()
+            raise
+        finally:
+            cursor.close()
+        self._record(sql, params, time.perf_counter() - start, count)
+
+    def _record(self, sql: str, params: tuple | None, elapsed: float, rows: int) -> None:
+        """
+        Сохраняет статистику выполненного запроса и записывает его в журнал, если он выполнялся дольше
+        SLOW_QUERY_TIME. При включённом EXPLAIN_SLOW_QUERIES добавляет в журнал план выполнения SELECT-запроса.
+        :param sql: str
+        :param params: tuple | None
+        :param elapsed: float
+        :param rows: int
+        :return: None
+        """
+        site = self._call_site()
+        QUERY_STATS.record(site, elapsed, rows)
+        if elapsed < SLOW_QUERY_TIME:
+            return
+        plan = None
+        if EXPLAIN_SLOW_QUERIES and sql.lstrip().upper().startswith("SELECT"):
+            explain_cursor = self.connection.cursor()
+            try:
+                for statement, args in self._backend.translate(sql, params or ()):
+                    explain_cursor.execute(self._backend.explain_prefix + statement, args)
+                plan = explain_cursor.fetchall()
+            finally:
+                explain_cursor.close()
+        log_slow_query(site, sql, params, elapsed, plan)
+
+    @classmethod
+    def _call_site(cls) -> str:
+        """
+        Возвращает место в коде программы, откуда был вызван запрос, пропуская методы самого OlimpDatabase.
+        :return: str
+        """
+        frame = sys._getframe(2)
+        while frame.f_back is not None and isinstance(frame.f_locals.get("self"), cls):
+            frame = frame.f_back
+        return f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})"
 
     def close(self, commit: bool = True) -> None:
         """
-        Производит commit перед прерыванием соединения с базой данных Olimp.
+        Производит commit (или rollback) начатой транзакции и возвращает подключение в пул. После запросов
+        только на чтение транзакции нет, и подключение возвращается без обращения к серверу. Если завершить
+        транзакцию не удалось, подключение закрывается. После записи данных чтение с реплики откладывается,
+        пока она не получит эти изменения.
         :param commit: bool = True
         :return: None
         """
-        if commit:
-            self.commit()
-        self.connection.close()
+        if self._pinned is not None:
+            self.cursor.close()
+            return
+        try:
+            if commit:
+                self.commit()
+            else:
+                self.rollback()
+            self.cursor.close()
+        except Exception:
+            self.connection.close()
+            raise
+        finally:
+            router = get_router()
+            if self._wrote and router is not None:
+                router.written()
+        self._backend.release(self.connection)
+
+
+class ResultCache:
+    """
+    Класс описывает кэш результатов запросов на чтение. Записи устаревают через CACHE_TTL секунд
+    и сбрасываются при любом изменении данных через программу.
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: dict[tuple, tuple[float, Any]] = {}
+
+    def get(self, key: tuple) -> Any | None:
+        """
+        Возвращает сохранённое значение или None, если его нет или оно устарело.
+        :param key: tuple
+        :return: Any | None
+        """
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def put(self, key: tuple, value: Any) -> None:
+        """
+        Сохраняет значение в кэше.
+        :param key: tuple
+        :param value: Any
+        :return: None
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+
+    def clear(self) -> None:
+        """
+        Очищает кэш.
+        :return: None
+        """
+        with self._lock:
+            self._data.clear()
+
+    def invalidate(self, predicate: Callable[[tuple], bool]) -> None:
+        """
+        Удаляет из кэша записи, ключи которых удовлетворяют условию.
+        :param predicate: Callable[[tuple], bool]
+        :return: None
+        """
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+
+RESULT_CACHE = ResultCache()
+
+
+# База в памяти создаётся заново при каждом запуске, поэтому её результаты на диске не сохраняются.
+DISK_CACHE = DiskCache("" if DB_BACKEND == "sqlite" and SQLITE_PATH == ":memory:" else REPORT_CACHE_DIR,
+                       int(REPORT_CACHE_SIZE * 1024 * 1024),
+                       f"{DB_BACKEND}:{HOST}/{DATABASE}" if DB_BACKEND == "mysql"
+                       else f"{DB_BACKEND}:{os.path.abspath(SQLITE_PATH)}")
+
+
+def database_stamp() -> tuple[int, str] | None:
+    """
+    Возвращает отметку состояния базы для постоянного кэша: номер последней записи журнала изменений и текущую
+    дату (от неё зависят значения по умолчанию и отчёты о текучести кадров). Если в базе нет журнала изменений,
+    возвращает None, и результаты с диска используются только для показа до их проверки.
+    :return: tuple[int, str] | None
+    """
+    try:
+        return ChangeLog.current_version(), date.today().isoformat()
+    except Exception:
+        return None
+
+
+def cached(method: Callable) -> Callable:
+    """
+    Декоратор для методов чтения данных: результат сохраняется в RESULT_CACHE с ключом из имени метода и аргументов
+    и в постоянном кэше DISK_CACHE. Результат с диска используется без запроса к базе, если отметка состояния базы
+    не изменилась с момента его сохранения. Запросы метода выполняются на реплике (OlimpDatabase.replica_reads).
+    :param method: Callable
+    :return: Callable
+    """
+    def make_key(*args, **kwargs) -> tuple:
+        return method.__qualname__, args, tuple(sorted(kwargs.items()))
+
+    @wraps(method)
+    def wrapper(cls, *args, **kwargs):
+        # В транзакции согласованного чтения данные берутся только из её снимка и не сохраняются в кэше,
+        # так как снимок может быть старше данных в базе.
+        if in_snapshot():
+            return method(cls, *args, **kwargs)
+        key = make_key(*args, **kwargs)
+        result = RESULT_CACHE.get(key)
+        if result is None:
+            # Отметка берётся до запроса: изменения, сделанные во время его выполнения, сделают результат устаревшим.
+            stamp = database_stamp() if DISK_CACHE.enabled else None
+            stored = DISK_CACHE.get(key) if stamp is not None else None
+            if stored is not None and stored[0] == stamp:
+                result = stored[1]
+            else:
+                # Отметка получена с основного сервера, реплика используется, только если содержит эту версию.
+                with OlimpDatabase.replica_reads():
+                    result = method(cls, *args, **kwargs)
+                DISK_CACHE.put(key, stamp, result)
+            RESULT_CACHE.put(key, result)
+        return result
+    wrapper.cache_key = make_key
+    return wrapper
+
+
+def peek_cached(func: Callable, *args, **kwargs) -> Any | None:
+    """
+    Возвращает результат метода, декорированного cached, из кэша в памяти или с диска без обращения к базе.
+    Результат с диска может быть устаревшим, его необходимо проверить вызовом самого метода.
+    :param func: Callable
+    :return: Any | None
+    """
+    key = func.cache_key(*args, **kwargs)
+    result = RESULT_CACHE.get(key)
+    if result is None:
+        stored = DISK_CACHE.get(key)
+        result = stored[1] if stored is not None else None
+    return result
+
+
+def invalidates_cache(method: Callable) -> Callable:
+    """
+    Декоратор для методов изменения данных: после выполнения метода RESULT_CACHE очищается.
+    :param method: Callable
+    :return: Callable
+    """
+    @wraps(method)
+    def wrapper(cls, *args, **kwargs):
+        try:
+            return method(cls, *args, **kwargs)
+        finally:
+            RESULT_CACHE.clear()
+    return wrapper
+
+
+def year_start(year: str) -> str:
+    """
+    Возвращает дату начала года для условий вида "дата >= начало года". В отличие от условия на YEAR(столбец)
+    такое условие использует индекс по дате и отсечение секций таблицы Order_of_dismissal.
+    :param year: str
+    :return: str
+    """
+    return f"{int(year):04d}-01-01"
 
 
 class DocumentHandler:
@@ -122,6 +703,37 @@ class DocumentHandler:
 
     ]
 
+    pareto_headers = ("Наименование причины", "Количество, шт.")
+    pareto_sql = """
+                SELECT q.reason, COUNT(q.reason) as reason_count FROM 
+                (SELECT IF(di.reason_id=3, ood.true_reason, di.full_reason) as reason
+                FROM Func as f
+                JOIN Specialist_all as sp ON f.id=sp.function_id
+                JOIN Order_of_dismissal_all as ood ON sp.id=ood.spec_id
+                JOIN Dismissal_info as di ON ood.reas_id=di.id
+                WHERE ood.order_date>=%s) as q
+                GROUP BY q.reason
+                ORDER BY reason_count DESC; 
+                """
+
+    staff_list_sql = """
+                SELECT f.struct_subdivision, f.function_name, floor(ceil(sum(d.number * d.period * d.time) 
+                / wti.hour_year)) as number_of_spec, f.salary
+                FROM Func as f
+                JOIN Document as d ON f.id=d.function_id
+                JOIN Work_time_info as wti ON wti.current_year=%s
+                GROUP BY f.function_name
+                ORDER BY f.function_name;
+                """
+
+    exist_spec_sql = """
+                SELECT f.struct_subdivision, f.function_name, count(sp.id) as number_of_exist_spec
+                FROM Func as f 
+                JOIN Specialist as sp ON f.id=sp.function_id
+                WHERE sp.end_date IS NULL
+                GROUP BY f.function_name;
+                """
+
     @property
     def doc_func_dict(self) -> dict[str, Callable]:
         """
@@ -135,10 +747,25 @@ class DocumentHandler:
                      ]
         doc_func_dict = dict(zip(self.staff_list_docs+self.missing_unit_docs+self.pareto_docs, func_list))
         doc_func_dict.update({"Форма справки о недостающих кадрах": self.missing_unit_info,
-                              "Диаграмма Парето": self.pareto_data})
+                              "Диаграмма Парето": self.pareto_data,
+                              "Штатное расписание по годам": self.staff_matrix,
+                              "Текучесть кадров": self.turnover_report,
+                              "Средний стаж работы": self.tenure_report,
+                              "Удержание сотрудников": self.retention_report})
         return doc_func_dict
 
+    @staticmethod
+    def report_timeout(func: Callable) -> float:
+        """
+        Возвращает ограничение времени выполнения запросов документа, получаемого методом func
+        (REPORT_TIMEOUTS по имени метода или REPORT_TIMEOUT).
+        :param func: Callable
+        :return: float
+        """
+        return REPORT_TIMEOUTS.get(func.__name__, REPORT_TIMEOUT)
+
     @classmethod
+    @cached
     def docs_in_struct_subdiv(cls) -> tuple[tuple[str, ...], list[tuple[str, str, str, int, int]]]:
         """
         Возвращает данные для составления документа "Перечень документов, разработанных по отделам".
@@ -153,6 +780,7 @@ class DocumentHandler:
             return headers, result
 
     @classmethod
+    @cached
     def time_norms_to_create_docs(cls) -> tuple[tuple[str, ...], list[tuple[str, str, str, str, float]]]:
         """
         Возвращает данные для составления документа "Нормы времени составления документов".
@@ -161,7 +789,7 @@ class DocumentHandler:
         headers = ("Наименование документа", "Отдел", "Исполнитель", "Единица измерения", "Норма врем, ч")
         with OlimpDatabase() as db:
             result = db.query("""
-                            SELECT doc_name, struct_subdivision, function_name, "1 документ" as units, time
+                            SELECT doc_name, struct_subdivision, function_name, '1 документ' as units, time
                             FROM Func 
                             JOIN Document ON Func.id=Document.function_id
                             ORDER BY doc_name;
@@ -169,6 +797,7 @@ class DocumentHandler:
             return headers, result
 
     @classmethod
+    @cached
     def salary_info(cls) -> tuple[tuple[str, str], list[tuple[str, float]]]:
         """
         Возвращает данные для составления документа "Справка о заработной плате".
@@ -183,6 +812,7 @@ class DocumentHandler:
             return headers, result
 
     @classmethod
+    @cached
     def work_time_info(cls, year: str = str(date.today().year+1)) -> tuple[tuple[str, ...], list[tuple[int, int, int, int]]]:
         """
         Возвращает данные для составления документа "Справка о рабочем времени". Даёт возможность фильтровать по году.
@@ -200,6 +830,7 @@ class DocumentHandler:
             return headers, result
 
     @classmethod
+    @cached
     def staff_list(cls, year: str = str(date.today().year+1)) -> tuple[tuple[str, ...], list[tuple[str, str, int, float]]]:
         """
         Возвращает данные для составления документа "Штатное расписание". Даёт возможность фильтровать по году.
@@ -208,21 +839,55 @@ class DocumentHandler:
         """
         headers = ("Структурное подразделение", "Должность", "Количество штатных единиц", "Тарифная ставка, руб")
         with OlimpDatabase() as db:
-            db.execute(""" 
-                            CREATE OR REPLACE VIEW Stuff_list AS
-                            SELECT f.struct_subdivision, f.function_name, floor(ceil(sum(d.number * d.period * d.time) 
-                            / wti.hour_year)) as number_of_spec, f.salary
+            result = db.query(cls.staff_list_sql, (year,))
+        return headers, [(subdivision, function, int(number), salary)
+                         for subdivision, function, number, salary in result]
+
+    @classmethod
+    @cached
+    def staff_matrix(cls, first_year: str | None = None, last_year: str | None = None) -> tuple[tuple[str, ...], list[tuple]]:
+        """
+        Возвращает данные для составления документа "Штатное расписание по годам": количество штатных единиц
+        по каждой должности за все годы из Work_time_info или за годы с first_year по last_year.
+        Трудоёмкость документов суммируется одним запросом и делится на годовой фонд рабочего времени
+        всех годов сразу.
+        :param first_year: str | None = None
+        :param last_year: str | None = None
+        :return: tuple[tuple[str, ...], list[tuple[str, str, int, ...]]]
+        """
+        import numpy as np
+
+        with OlimpDatabase() as db:
+            workload = db.query_columns("""
+                            SELECT f.struct_subdivision, f.function_name, sum(d.number * d.period * d.time) as workload
                             FROM Func as f
                             JOIN Document as d ON f.id=d.function_id
-                            JOIN Work_time_info as wti ON wti.current_year=%s
-                            GROUP BY f.function_name
+                            GROUP BY f.struct_subdivision, f.function_name
                             ORDER BY f.function_name;
-                            """, (year,))
-            result = db.query("""SELECT struct_subdivision, function_name, cast(number_of_spec AS SIGNED) as number_of_spec, 
-                            salary FROM Stuff_list;""")
-            return headers, result
+                            """)
+            years = db.query_columns("""
+                            SELECT current_year, hour_year
+                            FROM Work_time_info
+                            WHERE current_year>=%s AND current_year<=%s
+                            ORDER BY current_year;
+                            """, (first_year or 0, last_year or 9999))
+        hours = np.asarray(workload["workload"], dtype=np.float64)
+        hour_year = np.asarray(years["hour_year"], dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            number_of_spec = np.ceil(hours[:, np.newaxis] / hour_year[np.newaxis, :])
+        # Как и в staff_list, при пустом или нулевом фонде рабочего времени и пустой трудоёмкости
+        # количество не определено (NULL в SQL).
+        defined = np.isfinite(number_of_spec)
+        number_of_spec = np.where(defined, number_of_spec, 0).astype(np.int64)
+        headers = ("Структурное подразделение", "Должность", *(str(year) for year in years["current_year"].tolist()))
+        result = [(subdivision, function_name, *(number if ok else None for number, ok in zip(numbers, mask)))
+                  for subdivision, function_name, numbers, mask in zip(workload["struct_subdivision"].tolist(),
+                                                                       workload["function_name"].tolist(),
+                                                                       number_of_spec.tolist(), defined.tolist())]
+        return headers, result
 
     @classmethod
+    @cached
     def exist_spec(cls) -> tuple[tuple[str, ...], list[tuple[str, str, int]]]:
         """
         Возвращает данные для составления документа "Справка о специалистах".
@@ -230,34 +895,37 @@ class DocumentHandler:
         """
         headers = ("Структурное подразделение", "Должность", "Количество")
         with OlimpDatabase() as db:
-            db.execute("""CREATE OR REPLACE VIEW Exist_spec AS
-                            SELECT f.struct_subdivision, f.function_name, count(sp.id) as number_of_exist_spec
-                            FROM Func as f 
-                            JOIN Specialist as sp ON f.id=sp.function_id
-                            WHERE sp.end_date IS NULL
-                            GROUP BY f.function_name;""")
-            result = db.query("""SELECT * FROM Exist_spec;""")
+            result = db.query(cls.exist_spec_sql)
             return headers, result
 
     @classmethod
-    def missing_unit_info(cls) -> tuple[tuple[str, ...], list[tuple[str, str, int, int, int]]]:
+    @cached
+    def missing_unit_info(cls, year: str = str(date.today().year+1)) -> tuple[tuple[str, ...], list[tuple[str, str, int, int, int]]]:
         """
-        Возвращает данные для составления документа "Форма справки о недостающих кадрах".
+        Возвращает данные для составления документа "Форма справки о недостающих кадрах". Штатное расписание
+        и количество действующих специалистов выбираются одновременно двумя запросами и объединяются по должности.
+        :param year: str
         :return: tuple[tuple[str, str, str, str, str], list[tuple[str, str, int, int, int]]]
         """
+        from query_graph import QueryGraph
+
         headers = ("Структурное подразделение",	"Должность", "Плановое количество", "Фактическое количество",
                    "Отклонение")
-        with OlimpDatabase() as db:
-            db.execute("""CREATE OR REPLACE VIEW Missing_unit_info AS
-                            SELECT sl.struct_subdivision, sl.function_name, sl.number_of_spec, es.number_of_exist_spec, 
-                            (sl.number_of_spec - es.number_of_exist_spec) AS deviation
-                            FROM Stuff_list as sl
-                            JOIN Exist_spec as es ON sl.function_name=es.function_name""")
-            result = db.query("""SELECT struct_subdivision, function_name, cast(number_of_spec as signed), 
-                            number_of_exist_spec, cast(deviation as signed) FROM Missing_unit_info""")
-            return headers, result
+
+        def join(staff: list[tuple], exist: list[tuple]) -> list[tuple[str, str, int, int, int]]:
+            exist_count = {function: count for _, function, count in exist}
+            return [(subdivision, function, int(number), exist_count[function],
+                     int(number) - exist_count[function])
+                    for subdivision, function, number, _ in staff if function in exist_count]
+
+        graph = (QueryGraph()
+                 .query("staff", cls.staff_list_sql, (year,))
+                 .query("exist", cls.exist_spec_sql)
+                 .join("missing", join, "staff", "exist"))
+        return headers, graph.run("missing")
 
     @classmethod
+    @cached
     def order_of_dismissal(cls) -> tuple[tuple[str, ...], list[tuple[int, date, str, str]]]:
         """
         Возвращает данные для составления документа "Приказ об увольнении".
@@ -267,14 +935,15 @@ class DocumentHandler:
         with OlimpDatabase() as db:
             result = db.query("""
                             SELECT ood.order_id, ood.order_date, sp.spec_name, di.short_reason as reason
-                            FROM Order_of_dismissal as ood
-                            JOIN Specialist as sp ON sp.id=ood.spec_id
+                            FROM Order_of_dismissal_all as ood
+                            JOIN Specialist_all as sp ON sp.id=ood.spec_id
                             JOIN Dismissal_info as di ON ood.reas_id=di.id
                             ORDER BY ood.order_date; 
                             """)
             return headers, result
 
     @classmethod
+    @cached
     def dismissal_info(cls) -> tuple[tuple[str, ...], list[tuple[int, str, str]]]:
         """
         Возвращает данные для составления документ "Справка о причинах увольнения".
@@ -289,6 +958,7 @@ class DocumentHandler:
             return headers, result
 
     @classmethod
+    @cached
     def questionnaire_form(cls, year: str = "2000") -> tuple[tuple[str, ...], list[tuple[str, ...]]]:
         """
         Возвращает данные для составления документа "Анкета".
@@ -300,73 +970,121 @@ class DocumentHandler:
             result = db.query("""
                             SELECT f.struct_subdivision, f.function_name, sp.spec_name, ood.true_reason
                             FROM Func as f
-                            JOIN Specialist as sp ON f.id=sp.function_id
-                            JOIN Order_of_dismissal as ood ON sp.id=ood.spec_id
+                            JOIN Specialist_all as sp ON f.id=sp.function_id
+                            JOIN Order_of_dismissal_all as ood ON sp.id=ood.spec_id
                             JOIN Dismissal_info as di ON ood.reas_id=di.id
-                            WHERE ood.true_reason!='' AND YEAR(ood.order_date)>=%s;
-                            """, (year,))
+                            WHERE ood.true_reason!='' AND ood.order_date>=%s;
+                            """, (year_start(year),))
             return headers, result
 
     @classmethod
+    @cached
     def pareto_data(cls, year: str = "2015") -> tuple[tuple[str, ...], list[tuple[str, int]]]:
         """
-        Возвращает данные для составления диаграммы Парето. Есть возможность фильтровать по году.
+        Возвращает данные для составления диаграммы Парето. Есть возможность фильтровать по году приказа
+        об увольнении (начиная с которого учитываются приказы).
         :param year: str
         :return: tuple[tuple[str, ...], list[str]]
         """
-        headers = ("Наименование причины", "Количество, шт.")
         with OlimpDatabase() as db:
-            result = db.query("""
-                            SELECT q.reason, COUNT(q.reason) as reason_count FROM 
-                            (SELECT IF(di.reason_id=3, ood.true_reason, di.full_reason) as reason
-                            FROM Func as f
-                            JOIN Specialist as sp ON f.id=sp.function_id
-                            JOIN Order_of_dismissal as ood ON sp.id=ood.spec_id
-                            JOIN Dismissal_info as di ON ood.reas_id=di.id
-                            WHERE YEAR(sp.end_date)>=%s) as q
-                            GROUP BY q.reason
-                            ORDER BY reason_count DESC; 
-                            """, (year,))
-            return headers, result
+            result = db.query(cls.pareto_sql, (year_start(year),))
+            return cls.pareto_headers, result
+
+    @classmethod
+    @cached
+    def turnover_report(cls, year: str | None = None) -> tuple[tuple[str, ...], list[tuple]]:
+        """
+        Возвращает данные для составления документа "Текучесть кадров": коэффициент текучести по должностям
+        за каждый год. Есть возможность фильтровать по году, начиная с которого выводятся данные.
+        :param year: str | None = None
+        :return: tuple[tuple[str, ...], list[tuple[str, str, float, int, int, float]]]
+        """
+        from turnover import TurnoverAnalytics
+        return TurnoverAnalytics.load().turnover("function_name", "Y", first=year)
+
+    @classmethod
+    @cached
+    def tenure_report(cls) -> tuple[tuple[str, ...], list[tuple]]:
+        """
+        Возвращает данные для составления документа "Средний стаж работы" по структурным подразделениям.
+        :return: tuple[tuple[str, ...], list[tuple[str, int, float, int, float]]]
+        """
+        from turnover import TurnoverAnalytics
+        return TurnoverAnalytics.load().average_tenure("struct_subdivision")
+
+    @classmethod
+    @cached
+    def retention_report(cls) -> tuple[tuple[str, ...], list[tuple]]:
+        """
+        Возвращает данные для составления документа "Удержание сотрудников" по годам приёма на работу.
+        :return: tuple[tuple[str, ...], list[tuple[str, str, int, float, ...]]]
+        """
+        from turnover import TurnoverAnalytics
+        return TurnoverAnalytics.load().retention()
+
+    @classmethod
+    def all_reports(cls) -> Iterator[tuple[str, tuple[str, ...], list[tuple]]]:
+        """
+        Возвращает данные всех документов из doc_func_dict (с параметрами по умолчанию), полученные через одно
+        подключение в одной транзакции согласованного чтения, поэтому документы не расходятся между собой,
+        даже если данные изменяются во время выгрузки.
+        :return: Iterator[tuple[str, tuple[str, ...], list[tuple]]] - наименование документа, заголовки, строки
+        """
+        with OlimpDatabase.snapshot(replica=True):
+            for title, func in cls().doc_func_dict.items():
+                headers, rows = func()
+                yield title, headers, rows
 
     @classmethod
-    def create_pareto_diagram(cls, year: str = "2015") -> None:
+    def create_pareto_diagram(cls, year: str = "2015", fmt: str = "png", dpi: int = 100) -> bytes:
         """
-        Создаёт графическое изображение диаграммы Парето с помощью Matplotlib. Есть возможность фильтровать по году.
+        Создаёт графическое изображение диаграммы Парето с помощью Matplotlib (холст Agg) и возвращает его
+        в заданном формате. Есть возможность фильтровать по году. Может вызываться из фонового потока,
+        готовые изображения кэшируются по хэшу данных и году.
         :param year: str
-        :return: None
+        :param fmt: str = "png"
+        :param dpi: int = 100
+        :return: bytes
+        """
+        from charts import pareto_chart
+
+        with OlimpDatabase() as db:
+            columns = db.query_columns(cls.pareto_sql, (year_start(year),))
+        return pareto_chart(columns["reason"], columns["reason_count"], year, fmt, dpi)
+
+    @classmethod
+    def create_pareto_diagrams(cls, years: list[str], fmt: str = "png", dpi: int = 100) -> dict[str, bytes]:
         """
-        _, pareto_data = cls.pareto_data(year)
-        pd_data = pd.DataFrame(pareto_data)
-        pd_data.set_axis(["index", "count"], axis='columns', inplace=True)
-        pd_data["perc"] = round(pd_data["count"]/pd_data["count"].sum()*100, 2)
-        pd_data["cumperc"] = round(pd_data["count"].cumsum()/pd_data["count"].sum()*100, 2)
-
-        color1 = "steelblue"
-        color2 = "red"
-        line_size = 4
-
-        fig, ax = plt.subplots()
-        ax.bar(pd_data["index"], pd_data["perc"], color=color1)
-        ax.set_ylim(bottom=0, top=100)
-        ax.yaxis.set_major_formatter(PercentFormatter())
-        ax2 = ax.twinx()
-        ax2.plot(pd_data["index"], pd_data["cumperc"], color=color2, marker="D", ms=line_size)
-        ax2.set_ylim(bottom=0)
-        ax2.yaxis.set_major_formatter(PercentFormatter())
-        ax.tick_params(axis="y", color=color1)
-        ax2.tick_params(axis="y", color=color2)
-        ax.tick_params(axis="x", labelsize=6)
-        labels = []
-        for label in ax.get_xticklabels():
-            text = label.get_text()
-            labels.append(textwrap.fill(text, width=10,
-                                        break_long_words=False))
-        ax.set_xticklabels(labels, rotation=45)
-        plt.title("Диаграмма Парето")
-        fig.set_tight_layout(True)
-        plt.show()
-        return
+        Создаёт изображения диаграмм Парето для нескольких годов. Данные выбираются через одно подключение,
+        изображения строятся параллельно.
+        :param years: list[str]
+        :param fmt: str = "png"
+        :param dpi: int = 100
+        :return: dict[str, bytes]
+        """
+        return {year: image for year, (image, _) in cls.pareto_export(years, fmt, dpi).items()}
+
+    @classmethod
+    def pareto_export(cls, years: list[str], fmt: str = "png",
+                      dpi: int = 100) -> dict[str, tuple[bytes, tuple[tuple[str, ...], list[tuple[str, int]]]]]:
+        """
+        Возвращает для каждого года изображение диаграммы Парето и данные, по которым она построена (в формате
+        pareto_data), чтобы при экспорте данные не запрашивались повторно.
+        :param years: list[str]
+        :param fmt: str = "png"
+        :param dpi: int = 100
+        :return: dict[str, tuple[bytes, tuple[tuple[str, ...], list[tuple[str, int]]]]]
+        """
+        from charts import pareto_charts
+
+        datasets = {}
+        with OlimpDatabase() as db:
+            for year in years:
+                columns = db.query_columns(cls.pareto_sql, (year_start(year),))
+                datasets[year] = (columns["reason"], columns["reason_count"])
+        images = pareto_charts(datasets, fmt, dpi)
+        return {year: (images[year], (cls.pareto_headers, list(zip(reasons.tolist(), counts.tolist()))))
+                for year, (reasons, counts) in datasets.items()}
 
 
 class DataHandler:
@@ -394,46 +1112,59 @@ class Subdivision:
     Класс, содержащий данные и методы по работе с таблицей "Структурные подразделения".
     """
 
-    headers = ("Код должности", "Наименование должности", "Отдел", "Заработная плата, руб")
+    # Тип записей строк таблицы, его схема столбцов задаёт заголовки, форматы и сортировку (records.py).
+    record = FuncRecord
+    headers = FuncRecord.headers
+    table = "Func"
+    # Запрос одной строки таблицы по ключу, используется для обновления строк в интерфейсе после изменений.
+    row_sql = """
+            SELECT function_id, function_name, struct_subdivision, salary FROM Func WHERE function_id=%s;
+            """
 
     @classmethod
-    def show(cls) -> tuple[tuple[str, ...], list[tuple[int, str, str, float, int, float]]]:
+    @cached
+    def show(cls) -> tuple[tuple[str, ...], list[FuncRecord]]:
         """
         Возвращает данные для заполнения таблицы "Структурные подразделения".
-        :return: tuple[tuple[str, str, str, str, str, str], list[tuple[int, str, str, float, int, float]]]]
+        :return: tuple[tuple[str, ...], list[FuncRecord]]
         """
         with OlimpDatabase() as db:
             result = db.query("""
             SELECT function_id, function_name, struct_subdivision, salary FROM Func;
-            """)
+            """, record=cls.record)
             return cls.headers, result
 
     @classmethod
-    def add_data(cls, f_id: str, f_name: str, st_sub: str, sal: str) -> None:
+    @invalidates_cache
+    def add_data(cls, f_id: str, f_name: str, st_sub: str, sal: str) -> list[FuncRecord]:
         """
         Добавляет переданные из диалогового окна значения в таблицу Func базы данных.
+        Возвращает добавленную строку в формате show().
         :param f_id: str
         :param f_name: str
         :param st_sub: str
         :param sal: str
-        :return: None
+        :return: list[FuncRecord]
         """
         with OlimpDatabase() as db:
             db.execute("""
             INSERT INTO Func(function_id, function_name, struct_subdivision, salary)
             VALUES(%s, %s, %s, %s);
             """, (f_id, f_name, st_sub, sal))
+            return db.query(cls.row_sql, (f_id,), cls.record)
 
     @classmethod
-    def edit_data(cls, f_id: str, f_name: str, st_sub: str, sal: str, old_f_id: str) -> None:
+    @invalidates_cache
+    def edit_data(cls, f_id: str, f_name: str, st_sub: str, sal: str, old_f_id: str) -> list[FuncRecord]:
         """
         Обновляет выделенную строку в таблице Func базы данных с помощью переданных из диалогового окна значений.
+        Возвращает обновлённую строку в формате show().
         :param f_id: str
         :param f_name: str
         :param st_sub: str
         :param sal: str
         :param old_f_id: str
-        :return: None
+        :return: list[FuncRecord]
         """
         with OlimpDatabase() as db:
             db.execute("""
@@ -441,18 +1172,23 @@ class Subdivision:
             SET function_id=%s, function_name=%s, struct_subdivision=%s, salary=%s
             WHERE function_id=%s
             """, (f_id, f_name, st_sub, sal, old_f_id))
+            return db.query(cls.row_sql, (f_id,), cls.record)
 
     @classmethod
-    def del_data(cls, f_id: str) -> None:
+    @invalidates_cache
+    def del_data(cls, f_id: str) -> list[FuncRecord]:
         """
         Удаляет выделенную строку из таблицы Func базы данных.
+        Возвращает удалённую строку в формате show().
         :param f_id: str
-        :return: None
+        :return: list[FuncRecord]
         """
         with OlimpDatabase() as db:
+            rows = db.query(cls.row_sql, (f_id,), cls.record)
             db.execute("""
             DELETE FROM Func WHERE function_id=%s;
             """, (f_id,))
+            return rows
 
 
 class Documents:
@@ -460,14 +1196,24 @@ class Documents:
     Класс, содержащий данные и методы по работе с таблицей "Документы".
     """
 
-    headers = ("Код документа", "Наименование документа", "Должность", "Время, ч", "Количество, шт.",
-               "Периодичность шт./год")
+    record = DocumentRecord
+    headers = DocumentRecord.headers
+    table = "Document"
+    depends_on = ('Func',)
+    order_by = "function_name"
+    row_sql = """
+                SELECT d.doc_id, d.doc_name, f.function_name, d.time, d.number, d.period 
+                FROM Func as f
+                JOIN Document as d ON f.id=d.function_id
+                WHERE d.doc_id=%s;
+                """
 
     @classmethod
-    def show(cls) -> tuple[tuple[str, ...], list[tuple[int, str, str, float, int]]]:
+    @cached
+    def show(cls) -> tuple[tuple[str, ...], list[DocumentRecord]]:
         """
         Возвращает данные для заполнения таблицы "Документы".
-        :return: tuple[tuple[str, str, str, str, str], list[tuple[int, str, str, float, int]]]
+        :return: tuple[tuple[str, ...], list[DocumentRecord]]
         """
         with OlimpDatabase() as db:
             result = db.query("""
@@ -475,20 +1221,22 @@ class Documents:
                 FROM Func as f
                 JOIN Document as d ON f.id=d.function_id
                 ORDER BY f.function_name;
-                """)
+                """, record=cls.record)
             return cls.headers, result
 
     @classmethod
-    def add_data(cls, doc_id: str, doc_name: str, func_name: str, num: str, period: str, time: str) -> None:
+    @invalidates_cache
+    def add_data(cls, doc_id: str, doc_name: str, func_name: str, num: str, period: str, time: str) -> list[DocumentRecord]:
         """
         Добавляет переданные из диалогового окна значения в таблицу Document базы данных.
+        Возвращает добавленную строку в формате show().
         :param doc_id: str
         :param doc_name: str
         :param func_name: str
         :param num: str
         :param period: str
         :param time: str
-        :return: None
+        :return: list[DocumentRecord]
         """
         with OlimpDatabase() as db:
             db.execute("""
@@ -498,11 +1246,14 @@ class Documents:
                 WHERE f.function_name=%s
                 GROUP BY f.id;
             """, (doc_id, doc_name, num, period, time, func_name))
+            return db.query(cls.row_sql, (doc_id,), cls.record)
 
     @classmethod
-    def edit_data(cls, doc_id: str, doc_name: str, func_name: str, num: str, period: str, time: str, old_doc_id: str) -> None:
+    @invalidates_cache
+    def edit_data(cls, doc_id: str, doc_name: str, func_name: str, num: str, period: str, time: str, old_doc_id: str) -> list[DocumentRecord]:
         """
         Обновляет выделенную строку в таблице Document базы данных с помощью переданных из диалогового окна значений.
+        Возвращает обновлённую строку в формате show().
         :param doc_id: str
         :param doc_name: str
         :param func_name: str
@@ -510,7 +1261,7 @@ class Documents:
         :param period: str
         :param time: str
         :param old_doc_id: str
-        :return: None
+        :return: list[DocumentRecord]
         """
         with OlimpDatabase() as db:
             print(func_name)
@@ -523,18 +1274,23 @@ class Documents:
                 SET doc_id=%s, doc_name=%s, number=%s, period=%s, time=%s, function_id=%s
                 WHERE doc_id=%s
             """, (doc_id, doc_name, num, period, time, f_id, old_doc_id))
+            return db.query(cls.row_sql, (doc_id,), cls.record)
 
     @classmethod
-    def del_data(cls, doc_id: str) -> None:
+    @invalidates_cache
+    def del_data(cls, doc_id: str) -> list[DocumentRecord]:
         """
         Удаляет выделенную строку из таблицы Document базы данных.
+        Возвращает удалённую строку в формате show().
         :param doc_id: str
-        :return: None
+        :return: list[DocumentRecord]
         """
         with OlimpDatabase() as db:
+            rows = db.query(cls.row_sql, (doc_id,), cls.record)
             db.execute("""
                 DELETE FROM Document WHERE doc_id=%s;
             """, (doc_id,))
+            return rows
 
 
 class Units:
@@ -542,13 +1298,24 @@ class Units:
     Класс, содержащий данные и методы по работе с таблицей "Сотрудники".
     """
 
-    headers = ("Код специалиста", "ФИО", "Дата рождения", "Должность", "Дата вступления в должность", "Дата увольнения")
+    record = SpecialistRecord
+    headers = SpecialistRecord.headers
+    table = "Specialist"
+    depends_on = ('Func',)
+    order_by = "start_date"
+    row_sql = """
+                SELECT sp.spec_id, sp.spec_name, sp.birthday, f.function_name, sp.start_date, sp.end_date
+                FROM Func as f
+                JOIN Specialist as sp ON f.id=sp.function_id
+                WHERE sp.spec_id=%s;
+                """
 
     @classmethod
-    def show(cls) -> tuple[tuple[str, ...], list[tuple[int, str, date, str, date, date]]]:
+    @cached
+    def show(cls) -> tuple[tuple[str, ...], list[SpecialistRecord]]:
         """
         Возвращает данные для заполнения таблицы "Сотрудники".
-        :return: tuple[tuple[str, str, str, str, str, str], list[tuple[int, str, date, str, date, date]]]
+        :return: tuple[tuple[str, ...], list[SpecialistRecord]]
         """
         with OlimpDatabase() as db:
             result = db.query("""
@@ -556,19 +1323,21 @@ class Units:
                 FROM Func as f
                 JOIN Specialist as sp ON f.id=sp.function_id
                 ORDER BY sp.start_date;
-                """)
+                """, record=cls.record)
             return cls.headers, result
 
     @classmethod
-    def add_data(cls, spec_id: str, spec_name: str, birthday: str, function_name: str, start_date: str) -> None:
+    @invalidates_cache
+    def add_data(cls, spec_id: str, spec_name: str, birthday: date, function_name: str, start_date: date) -> list[SpecialistRecord]:
         """
         Добавляет переданные из диалогового окна значения в таблицу Specialist базы данных.
+        Возвращает добавленную строку в формате show().
         :param spec_id: str
         :param spec_name: str
-        :param birthday: str
+        :param birthday: date
         :param function_name: str
-        :param start_date: str
-        :return: None
+        :param start_date: date
+        :return: list[SpecialistRecord]
         """
         with OlimpDatabase() as db:
             f_id = db.query("""SELECT id FROM Func WHERE function_name=%s;""", (function_name,))[0][0]
@@ -576,19 +1345,22 @@ class Units:
             INSERT INTO Specialist(spec_id, spec_name, birthday, start_date, function_id)
             VALUES(%s, %s, %s, %s, %s)
             """, (spec_id, spec_name, birthday, start_date, f_id))
+            return db.query(cls.row_sql, (spec_id,), cls.record)
 
     @classmethod
-    def edit_data(cls, spec_id: str, spec_name: str, birthday: str, function_name: str, start_date: str, end_date: str, old_spec_id: str) -> None:
+    @invalidates_cache
+    def edit_data(cls, spec_id: str, spec_name: str, birthday: date, function_name: str, start_date: date, end_date: date | None, old_spec_id: str) -> list[SpecialistRecord]:
         """
         Обновляет выделенную строку в таблице Specialist базы данных с помощью переданных из диалогового окна значений.
+        Возвращает обновлённую строку в формате show().
         :param spec_id: str
         :param spec_name: str
-        :param birthday: str
+        :param birthday: date
         :param function_name: str
-        :param start_date: str
-        :param end_date: str
+        :param start_date: date
+        :param end_date: date | None
         :param old_spec_id: str
-        :return: None
+        :return: list[SpecialistRecord]
         """
         if end_date == '':
             end_date = None
@@ -599,19 +1371,24 @@ class Units:
             SET spec_id=%s, spec_name=%s, birthday=%s, start_date=%s, end_date=%s, function_id=%s
             WHERE spec_id=%s
             """, (spec_id, spec_name, birthday, start_date, end_date, f_id, old_spec_id))
+            return db.query(cls.row_sql, (spec_id,), cls.record)
 
     @classmethod
-    def del_data(cls, spec_id: str) -> None:
+    @invalidates_cache
+    def del_data(cls, spec_id: str) -> list[SpecialistRecord]:
         """
         Удаляет выделенную строку из таблицы Specialist базы данных.
+        Возвращает удалённую строку в формате show().
         :param spec_id: str
-        :return: None
+        :return: list[SpecialistRecord]
         """
         with OlimpDatabase() as db:
+            rows = db.query(cls.row_sql, (spec_id,), cls.record)
             db.execute("""
             DELETE FROM Specialist
             WHERE spec_id=%s;
             """, (spec_id,))
+            return rows
 
 
 class DismissalOrder:
@@ -619,14 +1396,25 @@ class DismissalOrder:
     Класс, содержащий данные и методы по работе с таблицей "Приказ об увольнении".
     """
 
-    headers = ("Номер приказа", "Дата приказа", "ФИО специалиста", "Причина увольнения",
-               "Настоящая причина увольнения")
+    record = DismissalOrderRecord
+    headers = DismissalOrderRecord.headers
+    table = "Order_of_dismissal"
+    depends_on = ('Specialist', 'Dismissal_info')
+    order_by = "order_date"
+    row_sql = """
+                SELECT ood.order_id, ood.order_date, sp.spec_name, di.short_reason, ood.true_reason 
+                FROM Order_of_dismissal as ood
+                JOIN Specialist as sp ON ood.spec_id=sp.id
+                JOIN Dismissal_info as di ON ood.reas_id=di.id
+                WHERE ood.order_id=%s;
+                """
 
     @classmethod
-    def show(cls) -> tuple[tuple[str, ...], list[int, date, str, str, str]]:
+    @cached
+    def show(cls) -> tuple[tuple[str, ...], list[DismissalOrderRecord]]:
         """
         Возвращает данные для заполнения таблицы "Приказ об увольнении".
-        :return: tuple[tuple[str, str, str, str, str], list[int, date, str, str, str]]
+        :return: tuple[tuple[str, ...], list[DismissalOrderRecord]]
         """
         with OlimpDatabase() as db:
             result = db.query("""
@@ -635,19 +1423,21 @@ class DismissalOrder:
                 JOIN Specialist as sp ON ood.spec_id=sp.id
                 JOIN Dismissal_info as di ON ood.reas_id=di.id
                 ORDER BY ood.order_date;
-                """)
+                """, record=cls.record)
             return cls.headers, result
 
     @classmethod
-    def add_data(cls, order_id: str, order_date: str, spec_name: str, short_reason: str, true_reason: str) -> None:
+    @invalidates_cache
+    def add_data(cls, order_id: str, order_date: date, spec_name: str, short_reason: str, true_reason: str) -> list[DismissalOrderRecord]:
         """
         Добавляет переданные из диалогового окна значения в таблицу Order_of_dismissal базы данных.
+        Возвращает добавленную строку в формате show().
         :param order_id: str
-        :param order_date: str
+        :param order_date: date
         :param spec_name: str
         :param short_reason: str
         :param true_reason: str
-        :return: None
+        :return: list[DismissalOrderRecord]
         """
         with OlimpDatabase() as db:
             r_id = db.query("""
@@ -660,18 +1450,21 @@ class DismissalOrder:
             INSERT INTO Order_of_dismissal(order_id, order_date, true_reason, reas_id, spec_id)
             VALUES(%s, %s, %s, %s, %s)
             """, (order_id, order_date, true_reason, r_id, sp_id))
+            return db.query(cls.row_sql, (order_id,), cls.record)
 
     @classmethod
-    def edit_data(cls, order_id: str, order_date: str, spec_name: str, short_reason: str, true_reason: str, old_order_id: str) -> None:
+    @invalidates_cache
+    def edit_data(cls, order_id: str, order_date: date, spec_name: str, short_reason: str, true_reason: str, old_order_id: str) -> list[DismissalOrderRecord]:
         """
         Обновляет выделенную строку в таблице Order_of_dismissal базы данных с помощью переданных из диалогового окна значений.
+        Возвращает обновлённую строку в формате show().
         :param order_id: str
-        :param order_date: str
+        :param order_date: date
         :param spec_name: str
         :param short_reason: str
         :param true_reason: str
         :param old_order_id: str
-        :return: None
+        :return: list[DismissalOrderRecord]
         """
         with OlimpDatabase() as db:
             r_id = db.query("""
@@ -685,19 +1478,24 @@ class DismissalOrder:
             SET order_id=%s, order_date=%s, true_reason=%s, reas_id=%s, spec_id=%s
             WHERE order_id=%s;
             """, (order_id, order_date, true_reason, r_id, sp_id, old_order_id))
+            return db.query(cls.row_sql, (order_id,), cls.record)
 
     @classmethod
-    def del_data(cls, order_id: str) -> None:
+    @invalidates_cache
+    def del_data(cls, order_id: str) -> list[DismissalOrderRecord]:
         """
         Удаляет выделенную строку из таблицы Order_of_dismissal базы данных.
+        Возвращает удалённую строку в формате show().
         :param order_id: str
-        :return: None
+        :return: list[DismissalOrderRecord]
         """
         with OlimpDatabase() as db:
+            rows = db.query(cls.row_sql, (order_id,), cls.record)
             db.execute("""
             DELETE FROM Order_of_dismissal
             WHERE order_id=%s
             """, (order_id,))
+            return rows
 
 
 class DismissalInfo:
@@ -705,44 +1503,55 @@ class DismissalInfo:
     Класс, содержащий данные и методы по работе с таблицей "Расшифровка причин увольнения".
     """
 
-    headers = ("Код причины", "Причина", "Полная запись")
+    record = DismissalInfoRecord
+    headers = DismissalInfoRecord.headers
+    table = "Dismissal_info"
+    row_sql = """
+                SELECT reason_id, short_reason, full_reason FROM Dismissal_info WHERE reason_id=%s;
+                """
 
     @classmethod
-    def show(cls) -> tuple[tuple[str, ...], list[tuple[int, str, str]]]:
+    @cached
+    def show(cls) -> tuple[tuple[str, ...], list[DismissalInfoRecord]]:
         """
         Возвращает данные для заполнения таблицы "Расшифровка причин увольнения".
-        :return: tuple[tuple[str, str, str], list[tuple[int, str, str]]]
+        :return: tuple[tuple[str, ...], list[DismissalInfoRecord]]
         """
         with OlimpDatabase() as db:
             result = db.query("""
                 SELECT reason_id, short_reason, full_reason FROM Dismissal_info;
-                """)
+                """, record=cls.record)
             return cls.headers, result
 
     @classmethod
-    def add_data(cls, reas_id: str, sh_reas: str, full_reas: str) -> None:
+    @invalidates_cache
+    def add_data(cls, reas_id: str, sh_reas: str, full_reas: str) -> list[DismissalInfoRecord]:
         """
         Добавляет переданные из диалогового окна значения в таблицу Dismissal_info базы данных.
+        Возвращает добавленную строку в формате show().
         :param reas_id: str
         :param sh_reas: str
         :param full_reas: str
-        :return: None
+        :return: list[DismissalInfoRecord]
         """
         with OlimpDatabase() as db:
             db.execute("""
             INSERT INTO Dismissal_info(reason_id, short_reason, full_reason)
             VALUES(%s, %s, %s)
             """, (reas_id, sh_reas, full_reas))
+            return db.query(cls.row_sql, (reas_id,), cls.record)
 
     @classmethod
-    def edit_data(cls, reas_id: str, sh_reas: str, full_reas: str, old_reas_id: str) -> None:
+    @invalidates_cache
+    def edit_data(cls, reas_id: str, sh_reas: str, full_reas: str, old_reas_id: str) -> list[DismissalInfoRecord]:
         """
         Обновляет выделенную строку в таблице Dismissal_info базы данных с помощью переданных из диалогового окна значений.
+        Возвращает обновлённую строку в формате show().
         :param reas_id: str
         :param sh_reas: str
         :param full_reas: str
         :param old_reas_id: str
-        :return: None
+        :return: list[DismissalInfoRecord]
         """
         with OlimpDatabase() as db:
             db.execute("""
@@ -750,19 +1559,24 @@ class DismissalInfo:
             SET reason_id=%s, short_reason=%s, full_reason=%s
             WHERE reason_id=%s
             """, (reas_id, sh_reas, full_reas, old_reas_id))
+            return db.query(cls.row_sql, (reas_id,), cls.record)
 
     @classmethod
-    def del_data(cls, reas_id: str) -> None:
+    @invalidates_cache
+    def del_data(cls, reas_id: str) -> list[DismissalInfoRecord]:
         """
         Удаляет выделенную строку из таблицы Dismissal_info базы данных.
+        Возвращает удалённую строку в формате show().
         :param reas_id: str
-        :return: None
+        :return: list[DismissalInfoRecord]
         """
         with OlimpDatabase() as db:
+            rows = db.query(cls.row_sql, (reas_id,), cls.record)
             db.execute("""
             DELETE FROM Dismissal_info
             WHERE reason_id=%s
             """, (reas_id,))
+            return rows
 
 
 class TimeInfo:
@@ -770,47 +1584,57 @@ class TimeInfo:
     Класс, содержащий данные и методы по работе с таблицей "Данные о рабочем времени".
     """
 
-    headers = ("Год", "Количество рабочих часов в году", "Количество рабочих часов в сутки",
-               "Количество рабочих дней в году")
+    record = WorkTimeRecord
+    headers = WorkTimeRecord.headers
+    table = "Work_time_info"
+    row_sql = """
+                SELECT current_year, hour_year, hour_day, day_year FROM Work_time_info WHERE current_year=%s;
+                """
 
     @classmethod
-    def show(cls) -> tuple[tuple[str, ...], list[tuple[int, int, int, int]]]:
+    @cached
+    def show(cls) -> tuple[tuple[str, ...], list[WorkTimeRecord]]:
         """
         Возвращает данные для заполнения таблицы "Данные о рабочем времени".
-        :return: tuple[tuple[str, str, str, str], list[tuple[int, int, int, int]]]
+        :return: tuple[tuple[str, ...], list[WorkTimeRecord]]
         """
         with OlimpDatabase() as db:
             result = db.query("""
                 SELECT current_year, hour_year, hour_day, day_year FROM Work_time_info;
-                """)
+                """, record=cls.record)
             return cls.headers, result
 
     @classmethod
-    def add_data(cls, cur_year: str, hy: str, hd: str, dy: str) -> None:
+    @invalidates_cache
+    def add_data(cls, cur_year: str, hy: str, hd: str, dy: str) -> list[WorkTimeRecord]:
         """
         Добавляет переданные из диалогового окна значения в таблицу Work_time_info базы данных.
+        Возвращает добавленную строку в формате show().
         :param cur_year: str
         :param hy: str
         :param hd: str
         :param dy: str
-        :return: None
+        :return: list[WorkTimeRecord]
         """
         with OlimpDatabase() as db:
             db.execute("""
                 INSERT INTO Work_time_info(current_year, hour_year, hour_day, day_year)
                 VALUES(%s, %s, %s, %s);
             """, (cur_year, hy, hd, dy))
+            return db.query(cls.row_sql, (cur_year,), cls.record)
 
     @classmethod
-    def edit_data(cls, cur_year: str, hy: str, hd: str, dy: str, old_cur_year: str) -> None:
+    @invalidates_cache
+    def edit_data(cls, cur_year: str, hy: str, hd: str, dy: str, old_cur_year: str) -> list[WorkTimeRecord]:
         """
         Обновляет выделенную строку в таблице Work_time_info базы данных с помощью переданных из диалогового окна значений.
+        Возвращает обновлённую строку в формате show().
         :param cur_year: str
         :param hy: str
         :param hd: str
         :param dy: str
         :param old_cur_year: str
-        :return: None
+        :return: list[WorkTimeRecord]
         """
         with OlimpDatabase() as db:
             db.execute("""
@@ -818,18 +1642,260 @@ class TimeInfo:
                 SET current_year=%s, hour_year=%s, hour_day=%s, day_year=%s
                 WHERE current_year=%s;
             """, (cur_year, hy, hd, dy, old_cur_year))
+            return db.query(cls.row_sql, (cur_year,), cls.record)
 
     @classmethod
-    def del_data(cls, cur_year: str) -> None:
+    @invalidates_cache
+    def del_data(cls, cur_year: str) -> list[WorkTimeRecord]:
         """
         Удаляет выделенную строку из таблицы Work_time_info базы данных.
+        Возвращает удалённую строку в формате show().
         :param cur_year: str
-        :return: None
+        :return: list[WorkTimeRecord]
         """
         with OlimpDatabase() as db:
+            rows = db.query(cls.row_sql, (cur_year,), cls.record)
             db.execute("""
                 DELETE FROM Work_time_info WHERE current_year=%s;
             """, (cur_year,))
+            return rows
+
+
+class ChangeLog:
+    """
+    Класс содержит методы по получению изменений, сделанных другими пользователями, из таблицы Change_log,
+    которую заполняют триггеры (migrations/001_change_log.*.sql).
+    """
+
+    @classmethod
+    def current_version(cls) -> int:
+        """
+        Возвращает номер последней записи журнала изменений на основном сервере.
+        :return: int
+        """
+        with OlimpDatabase(replica=False) as db:
+            version = db.query("""SELECT COALESCE(MAX(version), 0) FROM Change_log;""")[0][0]
+        cls._seen(version)
+        return version
+
+    @staticmethod
+    def _seen(version: int) -> None:
+        """
+        Сообщает ReplicaRouter номер записи журнала, полученный с основного сервера: данные, уже известные
+        программе, не читаются с отстающей реплики.
+        :param version: int
+        :return: None
+        """
+        router = get_router()
+        if router is not None:
+            router.seen(version)
+
+    @classmethod
+    def pull(cls, version: int | None) -> tuple[int, dict[str, list[tuple[str, list[tuple]]]] | None]:
+        """
+        Возвращает номер последней записи журнала и изменённые после version строки: словарь, где ключами являются
+        наименования таблиц из DataHandler.names, а значениями - списки пар (ключ строки, строки в формате show()).
+        Пустой список строк означает, что строка удалена. Кэшированные результаты show() изменённых таблиц
+        обновляются этими строками, остальные зависящие от них результаты удаляются из кэша.
+        Если запись version уже удалена из журнала (программа не опрашивала журнал дольше CHANGE_LOG_RETENTION
+        дней), кэш очищается и вместо словаря возвращается None - все таблицы нужно загрузить заново.
+        Номера журнала выдаются при вставке записи, а видны записи после фиксации транзакции, поэтому запись
+        с меньшим номером может появиться позже записей с большими. Пропущенные номера запоминаются
+        и запрашиваются при следующих опросах, пока запись не появится или не пройдёт CHANGE_LOG_GAP_TIMEOUT
+        секунд (номер отменённой транзакции не будет занят никогда).
+        :param version: int | None
+        :return: tuple[int, dict[str, list[tuple[str, list[tuple]]]] | None]
+        """
+        if version is None:
+            cls._gaps.clear()
+            return cls.current_version(), {}
+        cls._prune_if_due()
+        now = time.monotonic()
+        for gap in [gap for gap, noticed_at in cls._gaps.items() if now - noticed_at >= CHANGE_LOG_GAP_TIMEOUT]:
+            del cls._gaps[gap]
+        objects = {obj.table: (name, obj) for name, obj in DataHandler().data_list.items()}
+        # Журнал и изменённые строки читаются с основного сервера, чтобы версия совпадала с данными.
+        # Запись version запрашивается вместе с новыми: если её нет, журнал был сокращён после прошлого опроса.
+        with OlimpDatabase(replica=False) as db:
+            log = db.query("""
+            SELECT version, table_name, row_key FROM Change_log WHERE version>=%s ORDER BY version;
+            """, (min([version, *cls._gaps]),))
+            versions = {entry[0] for entry in log}
+            if version and version not in versions:
+                latest_version = log[-1][0] if log else cls.current_version()
+                RESULT_CACHE.clear()
+                cls._gaps.clear()
+                cls._seen(latest_version)
+                return latest_version, None
+            log = [entry for entry in log if entry[0] > version or entry[0] in cls._gaps]
+            if not log:
+                return version, {}
+            latest_version = max(version, log[-1][0])
+            for gap in versions & cls._gaps.keys():
+                del cls._gaps[gap]
+            for gap in range(version + 1, latest_version):
+                if gap not in versions:
+                    cls._gaps[gap] = now
+            # Для каждой строки важно только её текущее состояние, поэтому повторные записи объединяются.
+            latest = {}
+            for _, table_name, row_key in log:
+                latest.pop((table_name, row_key), None)
+                latest[(table_name, row_key)] = None
+            changes = {}
+            for table_name, row_key in latest:
+                if table_name in objects:
+                    name, obj = objects[table_name]
+                    changes.setdefault(name, []).append((row_key, db.query(obj.row_sql, (row_key,), obj.record)))
+        cls._seen(latest_version)
+        cls._update_cache(changes, {table_name for table_name, _ in latest})
+        return latest_version, changes
+
+    _pruned_at = 0.0
+    # Пропущенные номера журнала и время, когда они были замечены.
+    _gaps: dict[int, float] = {}
+
+    @classmethod
+    def _prune_if_due(cls) -> None:
+        """
+        Не чаще раза в CHANGE_LOG_PRUNE_INTERVAL секунд удаляет из журнала записи старше CHANGE_LOG_RETENTION
+        дней. Ошибка удаления (например, нет прав на DELETE) не мешает получению изменений.
+        :return: None
+        """
+        if CHANGE_LOG_RETENTION <= 0 or time.monotonic() - cls._pruned_at < CHANGE_LOG_PRUNE_INTERVAL:
+            return
+        cls._pruned_at = time.monotonic()
+        try:
+            cls.prune(CHANGE_LOG_RETENTION)
+        except Exception as error:
+            print("Ошибка очистки журнала изменений:", error, file=sys.stderr)
+
+    @staticmethod
+    def prune(days: float) -> None:
+        """
+        Удаляет из журнала изменений записи старше days дней, кроме последней: по ней программы определяют
+        текущую версию данных.
+        :param days: float
+        :return: None
+        """
+        with OlimpDatabase(replica=False) as db:
+            last, outdated = db.query("""
+            SELECT COALESCE(MAX(version), 0), COALESCE(MAX(IF(changed_at<NOW() - INTERVAL %s DAY, version, 0)), 0)
+            FROM Change_log;
+            """, (days,))[0]
+            outdated = min(outdated, last - 1)
+            if outdated > 0:
+                db.execute("""DELETE FROM Change_log WHERE version<=%s;""", (outdated,))
+
+    @classmethod
+    def _update_cache(cls, changes: dict[str, list[tuple[str, list[tuple]]]], tables: set[str]) -> None:
+        """
+        Обновляет кэшированные результаты show() изменённых таблиц и удаляет из кэша отчёты и таблицы,
+        зависящие от изменённых.
+        :param changes: dict[str, list[tuple[str, list[tuple]]]]
+        :param tables: set[str]
+        :return: None
+        """
+        data_list = DataHandler().data_list
+        patched = set()
+        for name, rows_by_key in changes.items():
+            obj = data_list[name]
+            if tables & set(getattr(obj, "depends_on", ())):
+                continue
+            cache_key = (obj.show.__qualname__, (), ())
+            cached_result = RESULT_CACHE.get(cache_key)
+            if cached_result is not None:
+                headers, data = cached_result
+                RESULT_CACHE.put(cache_key, (headers, cls._patch_rows(obj, data, rows_by_key)))
+            patched.add(cache_key[0])
+        stale = {obj.show.__qualname__ for obj in data_list.values()
+                 if tables & {obj.table, *getattr(obj, "depends_on", ())}} - patched
+        RESULT_CACHE.invalidate(lambda key: key[0] in stale or key[0].startswith(DocumentHandler.__name__))
+
+    @staticmethod
+    def _patch_rows(obj: type, data: list[Record], rows_by_key: list[tuple[str, list[tuple]]]) -> list[Record]:
+        """
+        Возвращает строки data с заменёнными, добавленными и удалёнными строками из rows_by_key в том порядке,
+        в котором их вернул бы show(): по столбцу obj.order_by (ORDER BY запроса, см. row_position), а для таблиц
+        без сортировки - изменённые строки на прежних местах, новые в конце.
+        :param obj: type
+        :param data: list[Record]
+        :param rows_by_key: list[tuple[str, list[tuple]]]
+        :return: list[Record]
+        """
+        new_rows = dict(rows_by_key)
+        order_by = getattr(obj, "order_by", None)
+        if order_by is None:
+            result = []
+            for row in data:
+                row_key = str(row[0])
+                if row_key in new_rows:
+                    result.extend(new_rows.pop(row_key))
+                else:
+                    result.append(row)
+            for rows in new_rows.values():
+                result.extend(rows)
+            return result
+        result = [row for row in data if str(row[0]) not in new_rows]
+        for rows in new_rows.values():
+            for row in rows:
+                result.insert(ChangeLog.row_position(obj, result, row), row)
+        return result
+
+    @staticmethod
+    def row_position(obj: type, rows: list[Record], row: Record, sort: tuple[int, bool] | None = None) -> int | None:
+        """
+        Возвращает место записи row среди записей rows, упорядоченных так, как их вернул бы show() (по столбцу
+        obj.order_by), или по столбцу sort = (номер столбца, по убыванию), если таблица отсортирована
+        пользователем. Запись ставится после записей с тем же значением. Для таблиц без сортировки
+        возвращается None.
+        :param obj: type
+        :param rows: list[Record]
+        :param row: Record
+        :param sort: tuple[int, bool] | None = None
+        :return: int | None
+        """
+        if sort is None:
+            order_by = getattr(obj, "order_by", None)
+            if order_by is None:
+                return None
+            sort = next(i for i, column in enumerate(row.columns) if column.name == order_by), False
+        index, descending = sort
+        sort_key = row.columns[index].sort_key
+        key = sort_key(row[index])
+        low, high = 0, len(rows)
+        while low < high:
+            middle = (low + high) // 2
+            middle_key = sort_key(rows[middle][index])
+            if (middle_key < key) if descending else (key < middle_key):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+
+def prefetch(names: tuple[str, ...] = ()) -> None:
+    """
+    Открывает подключение к базе и заполняет кэш справочниками, данными о рабочем времени и документами
+    с переданными наименованиями. Предназначена для выполнения в фоновом потоке при запуске программы.
+    :param names: tuple[str, ...] = ()
+    :return: None
+    """
+    with OlimpDatabase():
+        pass
+    for obj in (Subdivision, DismissalInfo, Units, TimeInfo):
+        obj.show()
+    DocumentHandler.work_time_info()
+    data_list = DataHandler().data_list
+    doc_func_dict = DocumentHandler().doc_func_dict
+    for name in names:
+        if name in data_list:
+            data_list[name].show()
+        elif name in doc_func_dict:
+            doc_func_dict[name]()
+
+
+if QUERY_STATS_ON_EXIT:
+    atexit.register(QUERY_STATS.dump)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+-- Журнал изменений редактируемых таблиц для синхронизации нескольких клиентов.
+-- Каждая вставка, изменение и удаление строки записывается триггером в Change_log с ключом строки,
+-- клиенты запрашивают записи с version больше последней полученной.
+
+CREATE TABLE IF NOT EXISTS `Change_log` (
+  `version` bigint NOT NULL AUTO_INCREMENT,
+  `table_name` varchar(50) NOT NULL,
+  `row_key` varchar(100) NOT NULL,
+  `operation` char(1) NOT NULL,
+  `changed_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`version`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+DELIMITER ;;
+
+DROP TRIGGER IF EXISTS `func_ai`;;
+CREATE TRIGGER `func_ai` AFTER INSERT ON `Func` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Func', NEW.function_id, 'I');;
+DROP TRIGGER IF EXISTS `func_au`;;
+CREATE TRIGGER `func_au` AFTER UPDATE ON `Func` FOR EACH ROW BEGIN
+  IF OLD.function_id <> NEW.function_id THEN
+    INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Func', OLD.function_id, 'D');
+  END IF;
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Func', NEW.function_id, 'U');
+END;;
+DROP TRIGGER IF EXISTS `func_ad`;;
+CREATE TRIGGER `func_ad` AFTER DELETE ON `Func` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Func', OLD.function_id, 'D');;
+
+DROP TRIGGER IF EXISTS `document_ai`;;
+CREATE TRIGGER `document_ai` AFTER INSERT ON `Document` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Document', NEW.doc_id, 'I');;
+DROP TRIGGER IF EXISTS `document_au`;;
+CREATE TRIGGER `document_au` AFTER UPDATE ON `Document` FOR EACH ROW BEGIN
+  IF OLD.doc_id <> NEW.doc_id THEN
+    INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Document', OLD.doc_id, 'D');
+  END IF;
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Document', NEW.doc_id, 'U');
+END;;
+DROP TRIGGER IF EXISTS `document_ad`;;
+CREATE TRIGGER `document_ad` AFTER DELETE ON `Document` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Document', OLD.doc_id, 'D');;
+
+DROP TRIGGER IF EXISTS `specialist_ai`;;
+CREATE TRIGGER `specialist_ai` AFTER INSERT ON `Specialist` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Specialist', NEW.spec_id, 'I');;
+DROP TRIGGER IF EXISTS `specialist_au`;;
+CREATE TRIGGER `specialist_au` AFTER UPDATE ON `Specialist` FOR EACH ROW BEGIN
+  IF OLD.spec_id <> NEW.spec_id THEN
+    INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Specialist', OLD.spec_id, 'D');
+  END IF;
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Specialist', NEW.spec_id, 'U');
+END;;
+DROP TRIGGER IF EXISTS `specialist_ad`;;
+CREATE TRIGGER `specialist_ad` AFTER DELETE ON `Specialist` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Specialist', OLD.spec_id, 'D');;
+
+DROP TRIGGER IF EXISTS `order_of_dismissal_ai`;;
+CREATE TRIGGER `order_of_dismissal_ai` AFTER INSERT ON `Order_of_dismissal` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Order_of_dismissal', NEW.order_id, 'I');;
+DROP TRIGGER IF EXISTS `order_of_dismissal_au`;;
+CREATE TRIGGER `order_of_dismissal_au` AFTER UPDATE ON `Order_of_dismissal` FOR EACH ROW BEGIN
+  IF OLD.order_id <> NEW.order_id THEN
+    INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Order_of_dismissal', OLD.order_id, 'D');
+  END IF;
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Order_of_dismissal', NEW.order_id, 'U');
+END;;
+DROP TRIGGER IF EXISTS `order_of_dismissal_ad`;;
+CREATE TRIGGER `order_of_dismissal_ad` AFTER DELETE ON `Order_of_dismissal` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Order_of_dismissal', OLD.order_id, 'D');;
+
+DROP TRIGGER IF EXISTS `dismissal_info_ai`;;
+CREATE TRIGGER `dismissal_info_ai` AFTER INSERT ON `Dismissal_info` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Dismissal_info', NEW.reason_id, 'I');;
+DROP TRIGGER IF EXISTS `dismissal_info_au`;;
+CREATE TRIGGER `dismissal_info_au` AFTER UPDATE ON `Dismissal_info` FOR EACH ROW BEGIN
+  IF OLD.reason_id <> NEW.reason_id THEN
+    INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Dismissal_info', OLD.reason_id, 'D');
+  END IF;
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Dismissal_info', NEW.reason_id, 'U');
+END;;
+DROP TRIGGER IF EXISTS `dismissal_info_ad`;;
+CREATE TRIGGER `dismissal_info_ad` AFTER DELETE ON `Dismissal_info` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Dismissal_info', OLD.reason_id, 'D');;
+
+DROP TRIGGER IF EXISTS `work_time_info_ai`;;
+CREATE TRIGGER `work_time_info_ai` AFTER INSERT ON `Work_time_info` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Work_time_info', NEW.current_year, 'I');;
+DROP TRIGGER IF EXISTS `work_time_info_au`;;
+CREATE TRIGGER `work_time_info_au` AFTER UPDATE ON `Work_time_info` FOR EACH ROW BEGIN
+  IF OLD.current_year <> NEW.current_year THEN
+    INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Work_time_info', OLD.current_year, 'D');
+  END IF;
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Work_time_info', NEW.current_year, 'U');
+END;;
+DROP TRIGGER IF EXISTS `work_time_info_ad`;;
+CREATE TRIGGER `work_time_info_ad` AFTER DELETE ON `Work_time_info` FOR EACH ROW
+  INSERT INTO `Change_log`(table_name, row_key, operation) VALUES ('Work_time_info', OLD.current_year, 'D');;
+
+DELIMITER ;
@@ -0,0 +1,75 @@
+-- Журнал изменений редактируемых таблиц (см. 001_change_log.mysql.sql).
+
+CREATE TABLE IF NOT EXISTS Change_log (
+  version INTEGER PRIMARY KEY AUTOINCREMENT,
+  table_name varchar(50) NOT NULL,
+  row_key varchar(100) NOT NULL,
+  operation char(1) NOT NULL,
+  changed_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER IF NOT EXISTS func_ai AFTER INSERT ON Func BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Func', NEW.function_id, 'I');
+END;
+CREATE TRIGGER IF NOT EXISTS func_au AFTER UPDATE ON Func BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) SELECT 'Func', OLD.function_id, 'D' WHERE OLD.function_id <> NEW.function_id;
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Func', NEW.function_id, 'U');
+END;
+CREATE TRIGGER IF NOT EXISTS func_ad AFTER DELETE ON Func BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Func', OLD.function_id, 'D');
+END;
+
+CREATE TRIGGER IF NOT EXISTS document_ai AFTER INSERT ON Document BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Document', NEW.doc_id, 'I');
+END;
+CREATE TRIGGER IF NOT EXISTS document_au AFTER UPDATE ON Document BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) SELECT 'Document', OLD.doc_id, 'D' WHERE OLD.doc_id <> NEW.doc_id;
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Document', NEW.doc_id, 'U');
+END;
+CREATE TRIGGER IF NOT EXISTS document_ad AFTER DELETE ON Document BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Document', OLD.doc_id, 'D');
+END;
+
+CREATE TRIGGER IF NOT EXISTS specialist_ai AFTER INSERT ON Specialist BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Specialist', NEW.spec_id, 'I');
+END;
+CREATE TRIGGER IF NOT EXISTS specialist_au AFTER UPDATE ON Specialist BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) SELECT 'Specialist', OLD.spec_id, 'D' WHERE OLD.spec_id <> NEW.spec_id;
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Specialist', NEW.spec_id, 'U');
+END;
+CREATE TRIGGER IF NOT EXISTS specialist_ad AFTER DELETE ON Specialist BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Specialist', OLD.spec_id, 'D');
+END;
+
+CREATE TRIGGER IF NOT EXISTS order_of_dismissal_ai AFTER INSERT ON Order_of_dismissal BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Order_of_dismissal', NEW.order_id, 'I');
+END;
+CREATE TRIGGER IF NOT EXISTS order_of_dismissal_au AFTER UPDATE ON Order_of_dismissal BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) SELECT 'Order_of_dismissal', OLD.order_id, 'D' WHERE OLD.order_id <> NEW.order_id;
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Order_of_dismissal', NEW.order_id, 'U');
+END;
+CREATE TRIGGER IF NOT EXISTS order_of_dismissal_ad AFTER DELETE ON Order_of_dismissal BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Order_of_dismissal', OLD.order_id, 'D');
+END;
+
+CREATE TRIGGER IF NOT EXISTS dismissal_info_ai AFTER INSERT ON Dismissal_info BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Dismissal_info', NEW.reason_id, 'I');
+END;
+CREATE TRIGGER IF NOT EXISTS dismissal_info_au AFTER UPDATE ON Dismissal_info BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) SELECT 'Dismissal_info', OLD.reason_id, 'D' WHERE OLD.reason_id <> NEW.reason_id;
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Dismissal_info', NEW.reason_id, 'U');
+END;
+CREATE TRIGGER IF NOT EXISTS dismissal_info_ad AFTER DELETE ON Dismissal_info BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Dismissal_info', OLD.reason_id, 'D');
+END;
+
+CREATE TRIGGER IF NOT EXISTS work_time_info_ai AFTER INSERT ON Work_time_info BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Work_time_info', NEW.current_year, 'I');
+END;
+CREATE TRIGGER IF NOT EXISTS work_time_info_au AFTER UPDATE ON Work_time_info BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) SELECT 'Work_time_info', OLD.current_year, 'D' WHERE OLD.current_year <> NEW.current_year;
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Work_time_info', NEW.current_year, 'U');
+END;
+CREATE TRIGGER IF NOT EXISTS work_time_info_ad AFTER DELETE ON Work_time_info BEGIN
+  INSERT INTO Change_log(table_name, row_key, operation) VALUES ('Work_time_info', OLD.current_year, 'D');
+END;
@@ -0,0 +1,4 @@
+-- Индекс по дате приказа об увольнении. В SQLite нет секционирования таблиц (см. 002_partition_dismissal_orders.mysql.sql),
+-- запросы с условием на диапазон order_date читают только нужный диапазон индекса.
+
+CREATE INDEX IF NOT EXISTS order_of_dismissal_order_date ON Order_of_dismissal (order_date);
@@ -0,0 +1,87 @@
+-- Секционирование таблицы приказов об увольнении по годам даты приказа (PARTITION BY RANGE).
+-- Запросы с условием на диапазон order_date читают только секции нужных лет, данные старых лет
+-- архивируются и удаляются целыми секциями (см. partitions.py) без построчного DELETE.
+--
+-- Ограничения InnoDB для секционированных таблиц: внешние ключи не поддерживаются, а каждый уникальный
+-- ключ должен содержать столбец секционирования. Поэтому номера приказов и ссылки на Specialist
+-- и Dismissal_info хранятся в несекционированной таблице Order_of_dismissal_ids с уникальным ключом
+-- и внешними ключами, которую заполняют триггеры. Проверки выполняет InnoDB с обычными блокировками,
+-- поэтому они верны и при одновременных транзакциях (проверка триггером через SELECT - нет).
+-- Новые секции на следующие годы добавляются командой python partitions.py add <год>.
+
+CREATE TABLE `Order_of_dismissal_ids` (
+  `order_id` int(11) NOT NULL,
+  `spec_id` int(11) NOT NULL,
+  `reas_id` int(11) NOT NULL,
+  PRIMARY KEY (`order_id`),
+  KEY `spec_id` (`spec_id`),
+  KEY `reas_id` (`reas_id`),
+  CONSTRAINT `order_of_dismissal_ids_ibfk_1` FOREIGN KEY (`spec_id`) REFERENCES `Specialist` (`id`) ON DELETE RESTRICT,
+  CONSTRAINT `order_of_dismissal_ids_ibfk_2` FOREIGN KEY (`reas_id`) REFERENCES `Dismissal_info` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+INSERT INTO `Order_of_dismissal_ids` (order_id, spec_id, reas_id)
+SELECT order_id, spec_id, reas_id FROM `Order_of_dismissal`;
+
+ALTER TABLE `Order_of_dismissal`
+  DROP FOREIGN KEY `order_of_dismissal_ibfk_1`,
+  DROP FOREIGN KEY `order_of_dismissal_ibfk_2`;
+
+ALTER TABLE `Order_of_dismissal`
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`id`, `order_date`),
+  DROP INDEX `order_id`,
+  ADD UNIQUE KEY `order_id` (`order_id`, `order_date`),
+  ADD KEY `order_date` (`order_date`);
+
+ALTER TABLE `Order_of_dismissal`
+  PARTITION BY RANGE (YEAR(`order_date`)) (
+    PARTITION p_old VALUES LESS THAN (2010),
+    PARTITION p2010 VALUES LESS THAN (2011),
+    PARTITION p2011 VALUES LESS THAN (2012),
+    PARTITION p2012 VALUES LESS THAN (2013),
+    PARTITION p2013 VALUES LESS THAN (2014),
+    PARTITION p2014 VALUES LESS THAN (2015),
+    PARTITION p2015 VALUES LESS THAN (2016),
+    PARTITION p2016 VALUES LESS THAN (2017),
+    PARTITION p2017 VALUES LESS THAN (2018),
+    PARTITION p2018 VALUES LESS THAN (2019),
+    PARTITION p2019 VALUES LESS THAN (2020),
+    PARTITION p2020 VALUES LESS THAN (2021),
+    PARTITION p2021 VALUES LESS THAN (2022),
+    PARTITION p2022 VALUES LESS THAN (2023),
+    PARTITION p2023 VALUES LESS THAN (2024),
+    PARTITION p2024 VALUES LESS THAN (2025),
+    PARTITION p2025 VALUES LESS THAN (2026),
+    PARTITION p2026 VALUES LESS THAN (2027),
+    PARTITION p2027 VALUES LESS THAN (2028),
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+  );
+
+DELIMITER ;;
+
+-- Ошибка в триггере отменяет всю инструкцию, поэтому строки Order_of_dismissal и Order_of_dismissal_ids
+-- изменяются вместе: повтор номера приказа и ссылка на несуществующую строку завершаются ошибками
+-- InnoDB 1062 и 1452, удаление сотрудника или причины увольнения, на которые ссылаются приказы, - 1451.
+DROP TRIGGER IF EXISTS `order_of_dismissal_bi`;;
+CREATE TRIGGER `order_of_dismissal_bi` BEFORE INSERT ON `Order_of_dismissal` FOR EACH ROW BEGIN
+  INSERT INTO `Order_of_dismissal_ids` (order_id, spec_id, reas_id) VALUES (NEW.order_id, NEW.spec_id, NEW.reas_id);
+END;;
+
+DROP TRIGGER IF EXISTS `order_of_dismissal_bu`;;
+CREATE TRIGGER `order_of_dismissal_bu` BEFORE UPDATE ON `Order_of_dismissal` FOR EACH ROW BEGIN
+  IF NEW.order_id <> OLD.order_id OR NEW.spec_id <> OLD.spec_id OR NEW.reas_id <> OLD.reas_id THEN
+    UPDATE `Order_of_dismissal_ids` SET order_id = NEW.order_id, spec_id = NEW.spec_id, reas_id = NEW.reas_id
+    WHERE order_id = OLD.order_id;
+  END IF;
+END;;
+
+DROP TRIGGER IF EXISTS `order_of_dismissal_bd`;;
+CREATE TRIGGER `order_of_dismissal_bd` BEFORE DELETE ON `Order_of_dismissal` FOR EACH ROW BEGIN
+  DELETE FROM `Order_of_dismissal_ids` WHERE order_id = OLD.order_id;
+END;;
+
+DROP TRIGGER IF EXISTS `specialist_bd`;;
+DROP TRIGGER IF EXISTS `dismissal_info_bd`;;
+
+DELIMITER ;
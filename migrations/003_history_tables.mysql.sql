@@ -0,0 +1,46 @@
+-- Архив уволенных сотрудников и их приказов об увольнении. Сотрудники, уволенные давно, переносятся
+-- из Specialist и Order_of_dismissal в таблицы *_history (см. archive.py), чтобы рабочие таблицы,
+-- с которыми работают редактирование и штатные документы, содержали в основном действующих сотрудников.
+-- Документы, которым нужна вся история, читают представления Specialist_all и Order_of_dismissal_all.
+-- Значения id сохраняются при переносе и не используются повторно (AUTO_INCREMENT), поэтому
+-- Order_of_dismissal_all.spec_id ссылается на Specialist_all.id.
+
+CREATE TABLE IF NOT EXISTS `Specialist_history` (
+  `id` int NOT NULL,
+  `spec_id` int NOT NULL,
+  `spec_name` varchar(200) NOT NULL,
+  `birthday` date NOT NULL,
+  `start_date` date NOT NULL,
+  `end_date` date NOT NULL,
+  `function_id` int DEFAULT NULL,
+  `archived_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  KEY `function_id` (`function_id`),
+  CONSTRAINT `specialist_history_ibfk_1` FOREIGN KEY (`function_id`) REFERENCES `Func` (`id`) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `Order_of_dismissal_history` (
+  `id` int NOT NULL,
+  `order_id` int NOT NULL,
+  `order_date` date NOT NULL,
+  `true_reason` varchar(200) DEFAULT NULL,
+  `spec_id` int NOT NULL,
+  `reas_id` int NOT NULL,
+  `archived_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  KEY `spec_id` (`spec_id`),
+  KEY `reas_id` (`reas_id`),
+  KEY `order_date` (`order_date`),
+  CONSTRAINT `order_of_dismissal_history_ibfk_1` FOREIGN KEY (`spec_id`) REFERENCES `Specialist_history` (`id`) ON DELETE RESTRICT,
+  CONSTRAINT `order_of_dismissal_history_ibfk_2` FOREIGN KEY (`reas_id`) REFERENCES `Dismissal_info` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE OR REPLACE VIEW `Specialist_all` AS
+SELECT id, spec_id, spec_name, birthday, start_date, end_date, function_id FROM `Specialist`
+UNION ALL
+SELECT id, spec_id, spec_name, birthday, start_date, end_date, function_id FROM `Specialist_history`;
+
+CREATE OR REPLACE VIEW `Order_of_dismissal_all` AS
+SELECT id, order_id, order_date, true_reason, spec_id, reas_id FROM `Order_of_dismissal`
+UNION ALL
+SELECT id, order_id, order_date, true_reason, spec_id, reas_id FROM `Order_of_dismissal_history`;
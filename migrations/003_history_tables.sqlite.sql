@@ -0,0 +1,36 @@
+-- Архив уволенных сотрудников и их приказов об увольнении (см. 003_history_tables.mysql.sql).
+
+CREATE TABLE IF NOT EXISTS Specialist_history (
+  id INTEGER PRIMARY KEY,
+  spec_id int NOT NULL,
+  spec_name varchar(200) NOT NULL,
+  birthday date NOT NULL,
+  start_date date NOT NULL,
+  end_date date NOT NULL,
+  function_id int DEFAULT NULL REFERENCES Func (id) ON DELETE SET NULL,
+  archived_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS specialist_history_function_id ON Specialist_history (function_id);
+
+CREATE TABLE IF NOT EXISTS Order_of_dismissal_history (
+  id INTEGER PRIMARY KEY,
+  order_id int NOT NULL,
+  order_date date NOT NULL,
+  true_reason varchar(200) DEFAULT NULL,
+  spec_id int NOT NULL REFERENCES Specialist_history (id) ON DELETE RESTRICT,
+  reas_id int NOT NULL REFERENCES Dismissal_info (id),
+  archived_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS order_of_dismissal_history_spec_id ON Order_of_dismissal_history (spec_id);
+CREATE INDEX IF NOT EXISTS order_of_dismissal_history_reas_id ON Order_of_dismissal_history (reas_id);
+CREATE INDEX IF NOT EXISTS order_of_dismissal_history_order_date ON Order_of_dismissal_history (order_date);
+
+CREATE VIEW IF NOT EXISTS Specialist_all AS
+SELECT id, spec_id, spec_name, birthday, start_date, end_date, function_id FROM Specialist
+UNION ALL
+SELECT id, spec_id, spec_name, birthday, start_date, end_date, function_id FROM Specialist_history;
+
+CREATE VIEW IF NOT EXISTS Order_of_dismissal_all AS
+SELECT id, order_id, order_date, true_reason, spec_id, reas_id FROM Order_of_dismissal
+UNION ALL
+SELECT id, order_id, order_date, true_reason, spec_id, reas_id FROM Order_of_dismissal_history;
@@ -0,0 +1,172 @@
+"""
+Обслуживание секций таблицы Order_of_dismissal, секционированной по годам даты приказа
+(migrations/002_partition_dismissal_orders.mysql.sql). Работает только с MySQL.
+Секции добавляются на следующие годы заранее, приказы старых лет переносятся в архивную таблицу
+обменом секции (EXCHANGE PARTITION) или удаляются вместе с секцией - обе операции изменяют только
+метаданные таблицы и не зависят от количества строк. Удалённые из таблицы приказы записываются
+в журнал изменений, чтобы другие клиенты обновили данные.
+
+Использование: python partitions.py list | add <год> | archive <год | секция> | drop <год | секция>
+"""
+from db_backends import get_backend
+from documents import OlimpDatabase
+import sys
+
+TABLE = "Order_of_dismissal"
+FUTURE_PARTITION = "p_future"
+
+
+def _check_backend() -> None:
+    """
+    Проверяет, что используется MySQL: в SQLite секционирования таблиц нет.
+    :return: None
+    """
+    if get_backend().name != "mysql":
+        raise ValueError("Секционирование таблиц поддерживается только для MySQL")
+
+
+def partition_name(value: str) -> str:
+    """
+    Возвращает имя секции по году ("2015" -> "p2015") или имени секции.
+    :param value: str
+    :return: str
+    """
+    return f"p{int(value)}" if value.isdigit() else value
+
+
+def list_partitions() -> list[tuple[str, int | None, int]]:
+    """
+    Возвращает секции таблицы: имя, верхнюю границу года (не включительно, None для MAXVALUE)
+    и оценку количества строк.
+    :return: list[tuple[str, int | None, int]]
+    """
+    _check_backend()
+    with OlimpDatabase(prepared=False) as db:
+        result = db.query("""
+                    SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+                    FROM information_schema.PARTITIONS
+                    WHERE TABLE_SCHEMA=DATABASE() AND TABLE_NAME=%s AND PARTITION_NAME IS NOT NULL
+                    ORDER BY PARTITION_ORDINAL_POSITION;
+                    """, (TABLE,))
+    return [(name, None if bound == "MAXVALUE" else int(bound), int(rows or 0)) for name, bound, rows in result]
+
+
+def _existing(name: str) -> list[tuple[str, int | None, int]]:
+    """
+    Проверяет, что секция name существует и может быть архивирована или удалена. Возвращает список секций.
+    :param name: str
+    :return: list[tuple[str, int | None, int]]
+    """
+    partitions = list_partitions()
+    if not partitions:
+        raise ValueError(f"Таблица {TABLE} не секционирована, выполните migrations/002_partition_dismissal_orders.mysql.sql")
+    if name == FUTURE_PARTITION:
+        raise ValueError(f"Секция {FUTURE_PARTITION} не может быть архивирована или удалена")
+    if name not in [partition for partition, _, _ in partitions]:
+        raise ValueError(f"Нет секции {name} в таблице {TABLE}")
+    return partitions
+
+
+def add_years(last_year: int) -> list[str]:
+    """
+    Добавляет секции для всех лет от последней существующей секции до last_year включительно, разделяя
+    секцию p_future. Если в p_future уже есть приказы этих лет, они переносятся в новые секции.
+    Возвращает имена добавленных секций.
+    :param last_year: int
+    :return: list[str]
+    """
+    partitions = list_partitions()
+    bounds = [bound for _, bound, _ in partitions if bound is not None]
+    if not bounds:
+        raise ValueError(f"Таблица {TABLE} не секционирована, выполните migrations/002_partition_dismissal_orders.mysql.sql")
+    years = range(max(bounds), int(last_year) + 1)
+    if not years:
+        return []
+    definitions = ", ".join(f"PARTITION p{year} VALUES LESS THAN ({year + 1})" for year in years)
+    with OlimpDatabase(prepared=False) as db:
+        db.execute(f"""
+            ALTER TABLE {TABLE} REORGANIZE PARTITION {FUTURE_PARTITION} INTO
+            ({definitions}, PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE);
+            """)
+    return [f"p{year}" for year in years]
+
+
+def _log_deleted(db: OlimpDatabase, source: str) -> None:
+    """
+    Записывает в журнал изменений удаление из Order_of_dismissal всех приказов, находящихся в source
+    (архивной таблице или секции): обмен и удаление секций не вызывают триггеры.
+    :param db: OlimpDatabase
+    :param source: str
+    :return: None
+    """
+    db.execute(f"""
+        INSERT INTO Change_log(table_name, row_key, operation)
+        SELECT %s, order_id, 'D' FROM {source};
+        """, (TABLE,))
+
+
+def _free_order_ids(db: OlimpDatabase, source: str) -> None:
+    """
+    Удаляет из Order_of_dismissal_ids номера приказов, находящихся в source (архивной таблице или секции):
+    без триггеров они остались бы занятыми, а сотрудников с этими приказами нельзя было бы удалить.
+    :param db: OlimpDatabase
+    :param source: str
+    :return: None
+    """
+    db.execute(f"DELETE FROM {TABLE}_ids WHERE order_id IN (SELECT order_id FROM {source});")
+
+
+def archive_partition(name: str) -> tuple[str, int]:
+    """
+    Переносит приказы секции name в архивную таблицу Order_of_dismissal_<секция> и удаляет опустевшую
+    секцию: приказы этих лет в дальнейшем попадают в следующую секцию. Возвращает имя архивной таблицы
+    и количество перенесённых приказов.
+    :param name: str
+    :return: tuple[str, int]
+    """
+    _existing(name)
+    archive = f"{TABLE}_{name}"
+    with OlimpDatabase(prepared=False) as db:
+        db.execute(f"CREATE TABLE {archive} LIKE {TABLE};")
+        db.execute(f"ALTER TABLE {archive} REMOVE PARTITIONING;")
+        db.execute(f"ALTER TABLE {TABLE} EXCHANGE PARTITION {name} WITH TABLE {archive};")
+        _log_deleted(db, archive)
+        _free_order_ids(db, archive)
+        db.execute(f"ALTER TABLE {TABLE} DROP PARTITION {name};")
+        count = db.query(f"SELECT COUNT(*) FROM {archive};")[0][0]
+    return archive, count
+
+
+def drop_partition(name: str) -> int:
+    """
+    Удаляет секцию name вместе со всеми её приказами без сохранения. Возвращает количество удалённых приказов.
+    :param name: str
+    :return: int
+    """
+    _existing(name)
+    source = f"{TABLE} PARTITION ({name})"
+    with OlimpDatabase(prepared=False) as db:
+        count = db.query(f"SELECT COUNT(*) FROM {source};")[0][0]
+        _log_deleted(db, source)
+        _free_order_ids(db, source)
+        db.commit()
+        db.execute(f"ALTER TABLE {TABLE} DROP PARTITION {name};")
+    return count
+
+
+if __name__ == "__main__":
+    commands = {"list": 1, "add": 2, "archive": 2, "drop": 2}
+    if len(sys.argv) < 2 or commands.get(sys.argv[1]) != len(sys.argv) - 1:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    command = sys.argv[1]
+    if command == "list":
+        for partition, bound, rows in list_partitions():
+            print(f"{partition:<12}{'MAXVALUE' if bound is None else bound:>10}{rows:>12}")
+    elif command == "add":
+        print("Добавлены секции:", ", ".join(add_years(int(sys.argv[2]))) or "нет")
+    elif command == "archive":
+        table, rows_count = archive_partition(partition_name(sys.argv[2]))
+        print(f"Перенесено в {table} приказов: {rows_count}")
+    else:
+        print(f"Удалено приказов: {drop_partition(partition_name(sys.argv[2]))}")
@@ -0,0 +1,269 @@
+"""
+Экспорт таблицы документа в PDF. Страницы раскладываются так же, как при печати (print_layout.py): заголовок
+таблицы повторяется на каждой странице, внизу выводится номер страницы и их общее количество. Большие документы
+формируются по частям: диапазоны страниц рисуются одновременно в отдельных процессах (каждый со своим Qt
+на платформе offscreen), после чего части объединяются в один PDF - объекты частей получают новые номера,
+а их страницы собираются в общее дерево страниц.
+"""
+from config import *
+from concurrent.futures import ProcessPoolExecutor
+from records import Record
+from typing import Any, Callable, TYPE_CHECKING
+import multiprocessing
+import os
+import re
+import tempfile
+
+if TYPE_CHECKING:
+    from PyQt5.QtPrintSupport import QPrinter
+    from print_layout import TablePageLayout
+
+_REF_RE = re.compile(rb"(\d+) 0 R\b")
+_STREAM_RE = re.compile(rb"stream\r?\n")
+_app = None
+
+
+def _ensure_app() -> None:
+    """
+    Создаёт QGuiApplication, если программа запущена без интерфейса (процесс формирования части, командная
+    строка): для измерения текста и QPrinter нужен запущенный Qt.
+    :return: None
+    """
+    global _app
+    from PyQt5 import QtGui as qtg
+
+    if qtg.QGuiApplication.instance() is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        _app = qtg.QGuiApplication([])
+
+
+def _pdf_printer(file_name: str) -> "QPrinter":
+    """
+    Возвращает QPrinter, сохраняющий страницы в PDF file_name. Размер листа и поля одинаковы во всех процессах.
+    :param file_name: str
+    :return: QPrinter
+    """
+    from PyQt5.QtPrintSupport import QPrinter
+
+    printer = QPrinter(QPrinter.HighResolution)
+    printer.setOutputFormat(QPrinter.PdfFormat)
+    printer.setOutputFileName(file_name)
+    return printer
+
+
+def _cell_getter(rows: list, offset: int = 0) -> Callable[[int, int], Any]:
+    """
+    Возвращает функцию значения ячейки для раскладки. rows - строки документа, начиная со строки offset.
+    Значения записей форматируются по схеме их столбцов, как в таблице интерфейса.
+    :param rows: list
+    :param offset: int = 0
+    :return: Callable[[int, int], Any]
+    """
+    def cell(row: int, col: int) -> Any:
+        data_row = rows[row - offset]
+        return data_row.text(col) if isinstance(data_row, Record) else data_row[col]
+    return cell
+
+
+def _part_rows(layout: "TablePageLayout", pages: range) -> range:
+    """
+    Возвращает номера строк таблицы, выводимых на страницах pages.
+    :param layout: TablePageLayout
+    :param pages: range
+    :return: range
+    """
+    table_pages = range(pages.start, min(pages.stop, layout.table_pages))
+    if not table_pages:
+        return range(0)
+    return range(layout.page_rows_range(table_pages.start).start, layout.page_rows_range(table_pages[-1]).stop)
+
+
+def _render_part(spec: tuple, rows: list, offset: int, pages: range) -> bytes:
+    """
+    Формирует PDF со страницами pages документа и возвращает его содержимое. Выполняется в отдельном процессе.
+    :param spec: tuple - заголовок, заголовки столбцов, количество строк, размер области печати, изображения,
+    ширина столбцов
+    :param rows: list - строки, выводимые на страницах pages
+    :param offset: int - номер первой из переданных строк
+    :param pages: range
+    :return: bytes
+    """
+    from PyQt5 import QtCore as qtc
+    from print_layout import TablePageLayout
+
+    _ensure_app()
+    title, headers, row_count, (width, height), images, column_widths = spec
+    layout = TablePageLayout(title, headers, row_count, _cell_getter(rows, offset), qtc.QSizeF(width, height),
+                             images, column_widths)
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    try:
+        layout.print_pages(_pdf_printer(path), pages)
+        with open(path, "rb") as file:
+            return file.read()
+    finally:
+        os.remove(path)
+
+
+def export_pdf(file_name: str, title: str, headers: list[str], rows: list,
+               images: list[tuple[str, bytes]] | None = None, workers: int = PDF_WORKERS,
+               chunk_pages: int = PDF_CHUNK_PAGES) -> int:
+    """
+    Сохраняет таблицу документа в PDF file_name и возвращает количество страниц. Если страниц больше chunk_pages,
+    части документа по chunk_pages страниц формируются в workers процессах (0 - по количеству ядер).
+    :param file_name: str
+    :param title: str
+    :param headers: list[str]
+    :param rows: list
+    :param images: list[tuple[str, bytes]] | None = None
+    :param workers: int = PDF_WORKERS
+    :param chunk_pages: int = PDF_CHUNK_PAGES
+    :return: int
+    """
+    from PyQt5.QtPrintSupport import QPrinter
+    from print_layout import TablePageLayout
+
+    _ensure_app()
+    printer = _pdf_printer(file_name)
+    page_size = printer.pageRect(QPrinter.Point).size()
+    layout = TablePageLayout(title, headers, len(rows), _cell_getter(rows), page_size, images)
+    chunk_pages = max(1, chunk_pages)
+    parts = [range(start, min(start + chunk_pages, layout.page_count))
+             for start in range(0, layout.page_count, chunk_pages)]
+    workers = workers or os.cpu_count() or 1
+    if len(parts) == 1 or workers == 1:
+        return layout.print_pages(printer, range(layout.page_count))
+    spec = (title, layout.headers, len(rows), (page_size.width(), page_size.height()), layout.images,
+            layout.column_widths)
+    # Процессы запускаются методом spawn: fork процесса с запущенными потоками Qt небезопасен.
+    with ProcessPoolExecutor(max_workers=min(workers, len(parts)), mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = []
+        for pages in parts:
+            part_rows = _part_rows(layout, pages)
+            futures.append(pool.submit(_render_part, spec, rows[part_rows.start:part_rows.stop], part_rows.start,
+                                       pages))
+        documents = [future.result() for future in futures]
+    with open(file_name, "wb") as file:
+        file.write(merge_pdfs(documents, title))
+    return layout.page_count
+
+
+def _ref(text: bytes, key: bytes) -> int | None:
+    """
+    Возвращает номер объекта, на который ссылается ключ key словаря text, или None.
+    :param text: bytes
+    :param key: bytes
+    :return: int | None
+    """
+    match = re.search(re.escape(key) + rb"\s+(\d+) 0 R", text)
+    return int(match.group(1)) if match else None
+
+
+def _read_pdf(data: bytes) -> tuple[dict[int, bytes], bytes]:
+    """
+    Разбирает PDF с таблицей перекрёстных ссылок (такие формирует Qt) и возвращает тела объектов по номерам
+    и словарь trailer.
+    :param data: bytes
+    :return: tuple[dict[int, bytes], bytes]
+    """
+    xref = int(data[data.rindex(b"startxref") + len(b"startxref"):].split()[0])
+    trailer = data.index(b"trailer", xref)
+    lines = data[xref:trailer].splitlines()[1:]
+    offsets = {}
+    i = 0
+    while i < len(lines):
+        if not lines[i].strip():
+            i += 1
+            continue
+        first, count = map(int, lines[i].split())
+        for number, entry in enumerate(lines[i + 1:i + 1 + count], first):
+            offset, _, kind = entry.split()
+            if kind == b"n":
+                offsets[number] = int(offset)
+        i += 1 + count
+    bounds = sorted(offsets.values()) + [xref]
+    ends = dict(zip(bounds, bounds[1:]))
+    objects = {}
+    for number, offset in offsets.items():
+        body = data[offset:ends[offset]]
+        objects[number] = body[body.index(b"obj") + 3:body.rindex(b"endobj")].strip()
+    return objects, data[trailer:]
+
+
+def _page_tree(objects: dict[int, bytes], number: int) -> tuple[list[int], list[int]]:
+    """
+    Возвращает номера страниц дерева страниц с корнем number в порядке вывода и номера его промежуточных узлов.
+    :param objects: dict[int, bytes]
+    :param number: int
+    :return: tuple[list[int], list[int]]
+    """
+    node = objects[number]
+    if not re.search(rb"/Type\s*/Pages\b", node):
+        return [number], []
+    kids_start = node.index(b"/Kids")
+    kids = node[kids_start:node.index(b"]", kids_start)]
+    pages, nodes = [], [number]
+    for kid in _REF_RE.findall(kids):
+        kid_pages, kid_nodes = _page_tree(objects, int(kid))
+        pages += kid_pages
+        nodes += kid_nodes
+    return pages, nodes
+
+
+def _pdf_string(text: str) -> bytes:
+    """
+    Возвращает строку PDF в кодировке UTF-16 (для текста на русском языке).
+    :param text: str
+    :return: bytes
+    """
+    return b"<" + ("\ufeff" + text).encode("utf-16-be").hex().upper().encode() + b">"
+
+
+def merge_pdfs(documents: list[bytes], title: str = "") -> bytes:
+    """
+    Объединяет PDF-документы, сформированные Qt, в один. Объекты каждого документа получают новые номера,
+    страницы всех документов собираются в одно дерево страниц в порядке документов. Каталог, дерево страниц
+    и сведения о документе создаются заново, остальные объекты (в том числе шрифты) копируются без изменений.
+    :param documents: list[bytes]
+    :param title: str = ""
+    :return: bytes
+    """
+    catalog, pages_root, info = 1, 2, 3
+    bodies = {}
+    kids = []
+    next_number = info + 1
+    for data in documents:
+        objects, trailer = _read_pdf(data)
+        root = _ref(trailer, b"/Root")
+        pages, nodes = _page_tree(objects, _ref(objects[root], b"/Pages"))
+        numbers = {root: catalog, _ref(trailer, b"/Info"): info, **dict.fromkeys(nodes, pages_root)}
+        for number in sorted(objects):
+            if number not in numbers:
+                numbers[number] = next_number
+                next_number += 1
+
+        def renumber(match: re.Match) -> bytes:
+            return b"%d 0 R" % numbers[int(match.group(1))]
+
+        for number, body in objects.items():
+            if numbers[number] in (catalog, pages_root, info):
+                continue
+            stream = _STREAM_RE.search(body) if body.endswith(b"endstream") else None
+            head, tail = (body[:stream.start()], body[stream.start():]) if stream else (body, b"")
+            bodies[numbers[number]] = _REF_RE.sub(renumber, head) + tail
+        kids += [numbers[page] for page in pages]
+    bodies[catalog] = b"<<\n/Type /Catalog\n/Pages %d 0 R\n>>" % pages_root
+    bodies[pages_root] = b"<<\n/Type /Pages\n/Kids [%s]\n/Count %d\n>>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+    bodies[info] = b"<<\n/Title %s\n>>" % _pdf_string(title)
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number in range(1, next_number):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, bodies[number])
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % next_number
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<<\n/Size %d\n/Root %d 0 R\n/Info %d 0 R\n>>\nstartxref\n%d\n%%%%EOF\n" % (
+        next_number, catalog, info, xref)
+    return bytes(output)
@@ -0,0 +1,211 @@
+"""
+Разбиение таблицы документа на печатные страницы и отрисовка отдельной страницы через QPainter.
+Все строки таблицы имеют одинаковую высоту (текст, не помещающийся в ячейку, сокращается), поэтому
+количество страниц и строки любой страницы вычисляются сразу, без раскладки всего документа: страница
+рисуется только тогда, когда её показывают в предварительном просмотре или отправляют на принтер.
+Размеры задаются в пунктах (1/72 дюйма) и переводятся в точки устройства при отрисовке.
+"""
+from PyQt5 import QtCore as qtc, QtGui as qtg
+from typing import Any, Callable
+import math
+
+FONT_SIZE = 9
+TITLE_FONT_SIZE = 14
+# Высота строки, отступ текста в ячейке, высота заголовка документа и нижнего колонтитула, пт.
+ROW_HEIGHT = FONT_SIZE * 1.8
+CELL_PADDING = 3
+TITLE_HEIGHT = TITLE_FONT_SIZE * 2.5
+FOOTER_HEIGHT = FONT_SIZE * 2.5
+# Количество строк, по которым определяется ширина столбцов.
+WIDTH_SAMPLE_ROWS = 200
+# Ширина текста измеряется при высоком разрешении; при низком (на экране) текст из-за хинтинга шире.
+TEXT_WIDTH_MARGIN = 1.1
+_MEASURE_DPI = 1200
+
+
+def _measure_device() -> qtg.QImage:
+    """
+    Возвращает изображение с высоким разрешением, по шрифтам которого измеряется ширина текста в пунктах.
+    :return: qtg.QImage
+    """
+    image = qtg.QImage(1, 1, qtg.QImage.Format_RGB32)
+    dots_per_meter = round(_MEASURE_DPI / 0.0254)
+    image.setDotsPerMeterX(dots_per_meter)
+    image.setDotsPerMeterY(dots_per_meter)
+    return image
+
+
+def _cell_text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+class TablePageLayout:
+    """
+    Класс описывает раскладку таблицы по страницам размером page_size (ширина и высота области печати, пт).
+    Значения ячеек запрашиваются функцией cell(строка, столбец) только при отрисовке страницы. Изображения
+    images (заголовок, PNG) выводятся после таблицы, по одному на страницу. Ширина столбцов column_widths
+    передаётся, когда страницы одного документа раскладываются по частям (см. pdf_export.py).
+    """
+
+    def __init__(self, title: str, headers: list[str], row_count: int, cell: Callable[[int, int], Any],
+                 page_size: qtc.QSizeF, images: list[tuple[str, bytes]] | None = None,
+                 column_widths: list[float] | None = None):
+        self.title = title
+        self.headers = [_cell_text(header) for header in headers]
+        self.row_count = row_count
+        self.cell = cell
+        self.page_size = page_size
+        self.images = list(images or ())
+        header_space = page_size.height() - ROW_HEIGHT - FOOTER_HEIGHT
+        self.first_page_rows = max(1, math.floor((header_space - TITLE_HEIGHT) / ROW_HEIGHT))
+        self.page_rows = max(1, math.floor(header_space / ROW_HEIGHT))
+        remaining = max(0, row_count - self.first_page_rows)
+        self.table_pages = 1 + math.ceil(remaining / self.page_rows)
+        self.column_widths = list(column_widths) if column_widths is not None else self._column_widths()
+
+    @property
+    def page_count(self) -> int:
+        return self.table_pages + len(self.images)
+
+    def _column_widths(self) -> list[float]:
+        """
+        Возвращает ширину столбцов в пунктах по ширине заголовка и значений первых и последних строк. Если таблица
+        уже страницы, столбцы растягиваются пропорционально, если шире - узкие столбцы сохраняют свою ширину,
+        а оставшееся место делится поровну между широкими.
+        :return: list[float]
+        """
+        if not self.headers:
+            return []
+        metrics = qtg.QFontMetricsF(self.font(bold=True), _measure_device())
+        scale = 72 / _MEASURE_DPI * TEXT_WIDTH_MARGIN
+        widths = [metrics.horizontalAdvance(header) * scale for header in self.headers]
+        metrics = qtg.QFontMetricsF(self.font(), _measure_device())
+        half = WIDTH_SAMPLE_ROWS // 2
+        sample = range(self.row_count) if self.row_count <= WIDTH_SAMPLE_ROWS else \
+            [*range(half), *range(self.row_count - half, self.row_count)]
+        for row in sample:
+            for col in range(len(widths)):
+                widths[col] = max(widths[col], metrics.horizontalAdvance(_cell_text(self.cell(row, col))) * scale)
+        widths = [width + 2 * CELL_PADDING for width in widths]
+        available = self.page_size.width()
+        if sum(widths) <= available:
+            return [width * available / sum(widths) for width in widths]
+        remaining, count = available, len(widths)
+        for width in sorted(widths):
+            if width * count > remaining:
+                break
+            remaining -= width
+            count -= 1
+        limit = remaining / count
+        return [min(width, limit) for width in widths]
+
+    @staticmethod
+    def font(size: float = FONT_SIZE, bold: bool = False) -> qtg.QFont:
+        font = qtg.QFont()
+        font.setPointSizeF(size)
+        font.setBold(bold)
+        return font
+
+    def page_rows_range(self, page: int) -> range:
+        """
+        Возвращает номера строк таблицы, выводимых на странице page (нумерация с нуля).
+        :param page: int
+        :return: range
+        """
+        if page >= self.table_pages:
+            return range(0)
+        if page == 0:
+            return range(0, min(self.row_count, self.first_page_rows))
+        start = self.first_page_rows + (page - 1) * self.page_rows
+        return range(start, min(self.row_count, start + self.page_rows))
+
+    def render_page(self, painter: qtg.QPainter, page: int, origin: qtc.QPointF = qtc.QPointF()) -> None:
+        """
+        Рисует страницу page на устройстве painter. origin - левый верхний угол области печати в пунктах.
+        :param painter: qtg.QPainter
+        :param page: int
+        :param origin: qtc.QPointF = QPointF()
+        :return: None
+        """
+        k = painter.device().logicalDpiX() / 72
+
+        def rect(x: float, y: float, width: float, height: float) -> qtc.QRectF:
+            return qtc.QRectF((origin.x() + x) * k, (origin.y() + y) * k, width * k, height * k)
+
+        painter.save()
+        pen = qtg.QPen(qtc.Qt.black)
+        pen.setWidthF(max(1.0, 0.5 * k))
+        painter.setPen(pen)
+        y = 0
+        if page >= self.table_pages:
+            caption, image = self.images[page - self.table_pages]
+            painter.setFont(self.font(TITLE_FONT_SIZE, bold=True))
+            painter.drawText(rect(0, 0, self.page_size.width(), TITLE_HEIGHT), qtc.Qt.AlignLeft | qtc.Qt.AlignVCenter,
+                             caption)
+            picture = qtg.QImage.fromData(image)
+            area = rect(0, TITLE_HEIGHT, self.page_size.width(),
+                        self.page_size.height() - TITLE_HEIGHT - FOOTER_HEIGHT)
+            size = qtc.QSizeF(picture.size()).scaled(area.size(), qtc.Qt.KeepAspectRatio)
+            painter.drawImage(qtc.QRectF(area.topLeft(), size), picture)
+        else:
+            if page == 0:
+                painter.setFont(self.font(TITLE_FONT_SIZE, bold=True))
+                painter.drawText(rect(0, 0, self.page_size.width(), TITLE_HEIGHT),
+                                 qtc.Qt.AlignLeft | qtc.Qt.AlignVCenter, self.title)
+                y = TITLE_HEIGHT
+            self._draw_row(painter, rect, y, self.headers, bold=True)
+            y += ROW_HEIGHT
+            for row in self.page_rows_range(page):
+                self._draw_row(painter, rect, y, [_cell_text(self.cell(row, col)) for col in range(len(self.headers))])
+                y += ROW_HEIGHT
+        painter.setFont(self.font(FONT_SIZE - 1))
+        painter.drawText(rect(0, self.page_size.height() - FOOTER_HEIGHT, self.page_size.width(), FOOTER_HEIGHT),
+                         qtc.Qt.AlignRight | qtc.Qt.AlignVCenter, f"Страница {page + 1} из {self.page_count}")
+        painter.restore()
+
+    def _draw_row(self, painter: qtg.QPainter, rect: Callable, y: float, values: list[str], bold: bool = False) -> None:
+        """
+        Рисует строку таблицы: рамки ячеек и сокращённый по ширине ячейки текст.
+        :param painter: qtg.QPainter
+        :param rect: Callable - перевод прямоугольника из пунктов в точки устройства
+        :param y: float
+        :param values: list[str]
+        :param bold: bool = False
+        :return: None
+        """
+        font = self.font(bold=bold)
+        painter.setFont(font)
+        metrics = qtg.QFontMetricsF(font, painter.device())
+        x = 0
+        for width, value in zip(self.column_widths, values):
+            cell = rect(x, y, width, ROW_HEIGHT)
+            painter.drawRect(cell)
+            text_rect = rect(x + CELL_PADDING, y, width - 2 * CELL_PADDING, ROW_HEIGHT)
+            painter.drawText(text_rect, qtc.Qt.AlignLeft | qtc.Qt.AlignVCenter,
+                             metrics.elidedText(value, qtc.Qt.ElideRight, text_rect.width()))
+            x += width
+
+    def print_pages(self, printer: "QPrinter", pages: range | None = None) -> int:
+        """
+        Печатает страницы pages (по умолчанию все или диапазон, выбранный в диалоге печати) по одной, не формируя
+        документ целиком. Возвращает количество напечатанных страниц.
+        :param printer: QPrinter
+        :param pages: range | None = None - номера страниц с нуля
+        :return: int
+        """
+        if pages is None:
+            first, last = 1, self.page_count
+            if printer.printRange() == printer.PageRange and printer.fromPage() > 0:
+                first, last = printer.fromPage(), min(printer.toPage() or self.page_count, self.page_count)
+            pages = range(first - 1, last)
+        painter = qtg.QPainter()
+        if not painter.begin(printer):
+            raise RuntimeError("Не удалось начать печать")
+        try:
+            for page in pages:
+                if page != pages.start:
+                    printer.newPage()
+                self.render_page(painter, page)
+        finally:
+            painter.end()
+        return len(pages)
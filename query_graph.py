@@ -0,0 +1,109 @@
+"""
+Графы запросов документов. Документ описывается независимыми запросами и функциями, объединяющими их результаты
+в Python. Запросы выполняются одновременно в потоках на отдельных подключениях из пула, поэтому документ
+формируется за время самого долгого запроса, а не за сумму времени всех запросов. Внутри транзакции
+согласованного чтения (OlimpDatabase.snapshot) запросы выполняются по очереди на её подключении.
+"""
+from config import *
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from documents import OlimpDatabase, QueryControl, in_replica_reads, in_snapshot
+from typing import Any, Callable
+import threading
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Возвращает общий пул потоков для выполнения запросов. Количество потоков равно размеру пула подключений (не меньше двух).
+    :return: ThreadPoolExecutor
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(POOL_SIZE, 2), thread_name_prefix="olimp-query")
+        return _executor
+
+
+class QueryGraph:
+    """
+    Класс описывает граф запросов документа: узлы-запросы к базе данных и узлы-функции, вычисляемые
+    по результатам других узлов.
+    """
+
+    def __init__(self):
+        self.queries = {}
+        self.joins = {}
+
+    def query(self, name: str, sql: str, params: tuple | None = None, columns: bool = False) -> "QueryGraph":
+        """
+        Добавляет запрос. При columns=True результат возвращается по столбцам (см. OlimpDatabase.query_columns).
+        :param name: str
+        :param sql: str
+        :param params: tuple | None = None
+        :param columns: bool = False
+        :return: QueryGraph
+        """
+        self._check_name(name)
+        self.queries[name] = (sql, params, columns)
+        return self
+
+    def join(self, name: str, func: Callable, *depends: str) -> "QueryGraph":
+        """
+        Добавляет функцию, которая вызывается с результатами узлов depends (в том же порядке).
+        :param name: str
+        :param func: Callable
+        :param depends: str
+        :return: QueryGraph
+        """
+        self._check_name(name)
+        unknown = [node for node in depends if node not in self.queries and node not in self.joins]
+        if unknown:
+            raise ValueError(f"Неизвестные узлы графа запросов: {', '.join(unknown)}")
+        self.joins[name] = (func, depends)
+        return self
+
+    def _check_name(self, name: str) -> None:
+        if name in self.queries or name in self.joins:
+            raise ValueError(f"Узел графа запросов {name} уже существует")
+
+    @staticmethod
+    def _run_query(sql: str, params: tuple | None, columns: bool, control: QueryControl | None = None,
+                   replica: bool | None = None) -> Any:
+        """
+        Выполняет запрос на отдельном подключении. control и replica - QueryControl и выбор реплики потока,
+        запустившего граф.
+        :param sql: str
+        :param params: tuple | None
+        :param columns: bool
+        :param control: QueryControl | None = None
+        :param replica: bool | None = None
+        :return: Any
+        """
+        with control or nullcontext(), OlimpDatabase(replica=replica) as db:
+            return db.query_columns(sql, params) if columns else db.query(sql, params)
+
+    def run(self, result: str | None = None) -> Any:
+        """
+        Выполняет граф и возвращает результат узла result или словарь результатов всех узлов.
+        Если один из запросов завершился с ошибкой, остальные запросы дожидаются завершения,
+        после чего ошибка передаётся вызывающему. Ограничение времени и отмена QueryControl текущего потока
+        действуют и на запросы, выполняемые в других потоках, они же выполняются на реплике, если на ней
+        выполняются запросы текущего потока.
+        :param result: str | None = None
+        :return: Any
+        """
+        if len(self.queries) < 2 or in_snapshot():
+            results = {name: self._run_query(*query) for name, query in self.queries.items()}
+        else:
+            executor = _get_executor()
+            control, replica = QueryControl.current(), in_replica_reads()
+            futures = {name: executor.submit(self._run_query, *query, control, replica)
+                       for name, query in self.queries.items()}
+            wait(futures.values())
+            results = {name: future.result() for name, future in futures.items()}
+        for name, (func, depends) in self.joins.items():
+            results[name] = func(*(results[node] for node in depends))
+        return results if result is None else results[result]
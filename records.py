@@ -0,0 +1,188 @@
+"""
+Типизированные записи строк редактируемых таблиц. Запись - неизменяемый кортеж без словаря атрибутов
+(__slots__ = ()), поэтому занимает столько же памяти, сколько обычная строка результата запроса, и передаётся
+без преобразования в кэш, постоянный кэш на диске, интерфейс и экспорт. Значения хранятся в исходных типах
+(числа, даты), а схема столбцов записи описывает их тип, формат вывода и ключ сортировки.
+"""
+from operator import itemgetter
+from typing import Any, Iterable
+
+INT, FLOAT, DATE, DATETIME, TEXT = "int", "float", "date", "datetime", "text"
+
+
+def format_value(value: Any) -> str:
+    """
+    Возвращает строковое представление значения ячейки без схемы столбца. Пустое значение выводится пустой строкой.
+    :param value: Any
+    :return: str
+    """
+    return "" if value is None else str(value)
+
+
+class Column:
+    """
+    Класс описывает столбец записи: имя поля, заголовок в интерфейсе, тип значения и формат вывода
+    (strftime для дат, format() для чисел).
+    """
+
+    __slots__ = ("name", "header", "kind", "fmt")
+
+    def __init__(self, name: str, header: str, kind: str = TEXT, fmt: str | None = None):
+        self.name = name
+        self.header = header
+        self.kind = kind
+        self.fmt = fmt
+
+    def format(self, value: Any) -> str:
+        """
+        Возвращает значение, отформатированное для вывода в таблице.
+        :param value: Any
+        :return: str
+        """
+        if value is None:
+            return ""
+        if self.fmt is None:
+            return str(value)
+        if self.kind in (DATE, DATETIME):
+            return value.strftime(self.fmt)
+        return format(value, self.fmt)
+
+    def sort_key(self, value: Any) -> tuple:
+        """
+        Возвращает ключ сортировки значения: пустые значения располагаются в конце, строки сравниваются
+        без учёта регистра.
+        :param value: Any
+        :return: tuple
+        """
+        if value is None:
+            return True, ""
+        return False, value.casefold() if self.kind == TEXT else value
+
+    def __repr__(self) -> str:
+        return f"Column({self.name!r}, {self.header!r}, {self.kind!r})"
+
+
+class Record(tuple):
+    """
+    Базовый класс записей. Подкласс задаёт схему columns и объявляет __slots__ = (); для каждого столбца
+    создаётся свойство с его именем, а заголовки таблицы собираются в headers.
+    """
+
+    __slots__ = ()
+    columns: tuple[Column, ...] = ()
+    headers: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.headers = tuple(column.header for column in cls.columns)
+        for index, column in enumerate(cls.columns):
+            setattr(cls, column.name, property(itemgetter(index), doc=column.header))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> list["Record"]:
+        """
+        Возвращает список записей из строк результата запроса.
+        :param rows: Iterable[tuple]
+        :return: list[Record]
+        """
+        return list(map(cls, rows))
+
+    def text(self, index: int) -> str:
+        """
+        Возвращает значение столбца index, отформатированное по схеме.
+        :param index: int
+        :return: str
+        """
+        return self.columns[index].format(self[index])
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{column.name}={value!r}" for column, value in zip(self.columns, self))
+        return f"{type(self).__name__}({values})"
+
+
+class FuncRecord(Record):
+    """
+    Строка таблицы "Структурные подразделения" (Func).
+    """
+
+    __slots__ = ()
+    columns = (
+        Column("function_id", "Код должности", INT),
+        Column("function_name", "Наименование должности"),
+        Column("struct_subdivision", "Отдел"),
+        Column("salary", "Заработная плата, руб", FLOAT, ".2f"),
+    )
+
+
+class DocumentRecord(Record):
+    """
+    Строка таблицы "Документы" (Document с наименованием должности).
+    """
+
+    __slots__ = ()
+    columns = (
+        Column("doc_id", "Код документа", INT),
+        Column("doc_name", "Наименование документа"),
+        Column("function_name", "Должность"),
+        Column("time", "Время, ч", FLOAT, "g"),
+        Column("number", "Количество, шт.", INT),
+        Column("period", "Периодичность шт./год", FLOAT, "g"),
+    )
+
+
+class SpecialistRecord(Record):
+    """
+    Строка таблицы "Сотрудники" (Specialist с наименованием должности).
+    """
+
+    __slots__ = ()
+    columns = (
+        Column("spec_id", "Код специалиста", INT),
+        Column("spec_name", "ФИО"),
+        Column("birthday", "Дата рождения", DATE, "%d.%m.%Y"),
+        Column("function_name", "Должность"),
+        Column("start_date", "Дата вступления в должность", DATE, "%d.%m.%Y"),
+        Column("end_date", "Дата увольнения", DATE, "%d.%m.%Y"),
+    )
+
+
+class DismissalOrderRecord(Record):
+    """
+    Строка таблицы "Приказ об увольнении" (Order_of_dismissal с ФИО сотрудника и причиной).
+    """
+
+    __slots__ = ()
+    columns = (
+        Column("order_id", "Номер приказа", INT),
+        Column("order_date", "Дата приказа", DATE, "%d.%m.%Y"),
+        Column("spec_name", "ФИО специалиста"),
+        Column("short_reason", "Причина увольнения"),
+        Column("true_reason", "Настоящая причина увольнения"),
+    )
+
+
+class DismissalInfoRecord(Record):
+    """
+    Строка таблицы "Расшифровка причин увольнения" (Dismissal_info).
+    """
+
+    __slots__ = ()
+    columns = (
+        Column("reason_id", "Код причины", INT),
+        Column("short_reason", "Причина"),
+        Column("full_reason", "Полная запись"),
+    )
+
+
+class WorkTimeRecord(Record):
+    """
+    Строка таблицы "Данные о рабочем времени" (Work_time_info).
+    """
+
+    __slots__ = ()
+    columns = (
+        Column("current_year", "Год", INT),
+        Column("hour_year", "Количество рабочих часов в году", INT),
+        Column("hour_day", "Количество рабочих часов в сутки", INT),
+        Column("day_year", "Количество рабочих дней в году", INT),
+    )
@@ -0,0 +1,162 @@
+"""
+Постоянный кэш результатов документов и таблиц на диске. Каждый результат хранится в отдельном файле:
+заголовок с версией формата и сжатые zlib данные, строки которых записаны по столбцам вместе с типом
+строк (кортеж или запись из records.py). Вместе с результатом
+сохраняется отметка состояния базы (номер последней записи журнала изменений и дата), по которой проверяется,
+что результат не устарел. При превышении размера кэша удаляются давно не использовавшиеся файлы.
+"""
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import zlib
+from typing import Any
+
+# Версия формата файлов; файлы другой версии не читаются и удаляются.
+CACHE_FORMAT = 2
+_MAGIC = b"OLRC"
+_HEADER = struct.Struct(">4sH")
+
+
+def _pack(result: Any) -> Any:
+    """
+    Переводит результат (заголовки, строки) в представление по столбцам. Строки должны быть одного типа:
+    кортежами или записями одного класса. Остальные значения не изменяются.
+    :param result: Any
+    :return: Any
+    """
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], list):
+        headers, rows = result
+        row_type = type(rows[0]) if rows else tuple
+        if issubclass(row_type, tuple) and all(type(row) is row_type for row in rows):
+            return "columns", headers, len(rows), list(zip(*rows)), row_type
+    return "value", result
+
+
+def _unpack(data: tuple) -> Any:
+    """
+    Восстанавливает результат из представления _pack.
+    :param data: tuple
+    :return: Any
+    """
+    if data[0] == "columns":
+        _, headers, count, columns, row_type = data
+        if not columns:
+            return headers, [row_type()] * count
+        rows = zip(*columns)
+        return headers, list(rows) if row_type is tuple else list(map(row_type, rows))
+    return data[1]
+
+
+class DiskCache:
+    """
+    Класс описывает кэш результатов в каталоге directory общим размером не более max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, namespace: str = ""):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Пространство имён отделяет результаты разных баз данных.
+        self.namespace = namespace
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory) and self.max_bytes > 0
+
+    def path(self, key: tuple) -> str:
+        """
+        Возвращает путь к файлу результата с ключом key.
+        :param key: tuple
+        :return: str
+        """
+        digest = hashlib.sha1(repr((self.namespace, key)).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.olrc")
+
+    def get(self, key: tuple) -> tuple[Any, Any] | None:
+        """
+        Возвращает сохранённые отметку состояния базы и результат или None, если результата нет
+        или файл повреждён.
+        :param key: tuple
+        :return: tuple[Any, Any] | None
+        """
+        if not self.enabled:
+            return None
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                magic, version = _HEADER.unpack(file.read(_HEADER.size))
+                if magic != _MAGIC or version != CACHE_FORMAT:
+                    raise ValueError(f"Неизвестный формат файла кэша: {path}")
+                stored_key, stamp, data = pickle.loads(zlib.decompress(file.read()))
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self._remove(path)
+            return None
+        if stored_key != (self.namespace, key):
+            return None
+        return stamp, _unpack(data)
+
+    def put(self, key: tuple, stamp: Any, result: Any) -> None:
+        """
+        Сохраняет результат с отметкой состояния базы. Файл записывается во временный файл и затем
+        переименовывается, чтобы одновременно работающие программы не прочитали его частично.
+        :param key: tuple
+        :param stamp: Any
+        :param result: Any
+        :return: None
+        """
+        if not self.enabled:
+            return
+        payload = zlib.compress(pickle.dumps(((self.namespace, key), stamp, _pack(result)),
+                                             protocol=pickle.HIGHEST_PROTOCOL))
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(_HEADER.pack(_MAGIC, CACHE_FORMAT))
+                file.write(payload)
+            os.replace(temp_path, self.path(key))
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Удаляет давно не использовавшиеся файлы, пока общий размер кэша больше max_bytes.
+        :return: None
+        """
+        with self._lock:
+            try:
+                entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".olrc")]
+            except OSError:
+                return
+            files = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def clear(self) -> None:
+        """
+        Удаляет все файлы кэша.
+        :return: None
+        """
+        if not self.enabled or not os.path.isdir(self.directory):
+            return
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".olrc"):
+                self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
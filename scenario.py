@@ -0,0 +1,198 @@
+"""
+Моделирование штатного расписания. Данные о трудоёмкости документов загружаются из базы один раз в массивы NumPy,
+после чего количество штатных единиц, отклонение от фактического количества специалистов и фонд заработной платы
+пересчитываются в памяти при каждом изменении. Изменения записываются в базу только при сохранении сценария.
+"""
+from documents import OlimpDatabase, invalidates_cache
+import numpy as np
+
+
+class StaffingScenario:
+    """
+    Класс описывает сценарий изменения норм времени, количества и периодичности документов и годового фонда
+    рабочего времени.
+    """
+
+    staff_headers = ("Структурное подразделение", "Должность", "Количество штатных единиц", "Тарифная ставка, руб")
+    missing_headers = ("Структурное подразделение", "Должность", "Плановое количество", "Фактическое количество",
+                       "Отклонение")
+    doc_fields = ("time", "number", "period")
+
+    def __init__(self, year: str, doc_ids: np.ndarray, doc_names: np.ndarray, doc_func: np.ndarray,
+                 time: np.ndarray, number: np.ndarray, period: np.ndarray, subdivisions: np.ndarray,
+                 functions: np.ndarray, salary: np.ndarray, exist: np.ndarray, hour_year: float):
+        self.year = year
+        self.doc_ids = doc_ids
+        self.doc_names = doc_names
+        self.doc_func = doc_func
+        self.subdivisions = subdivisions
+        self.functions = functions
+        self.salary = salary
+        self.exist = exist
+        self.original = {"time": time, "number": number, "period": period, "hour_year": hour_year}
+        self.time = time.copy()
+        self.number = number.copy()
+        self.period = period.copy()
+        self.hour_year = hour_year
+        self._doc_index = {doc_id: i for i, doc_id in enumerate(doc_ids.tolist())}
+
+    @classmethod
+    def load(cls, year: str) -> "StaffingScenario":
+        """
+        Загружает из базы данные о документах, должностях и рабочем времени за год и создаёт сценарий.
+        :param year: str
+        :return: StaffingScenario
+        """
+        with OlimpDatabase() as db:
+            funcs = db.query_columns("""
+                            SELECT f.id, f.struct_subdivision, f.function_name, f.salary,
+                            count(sp.id) as number_of_exist_spec
+                            FROM Func as f
+                            LEFT JOIN Specialist as sp ON f.id=sp.function_id AND sp.end_date IS NULL
+                            GROUP BY f.id, f.struct_subdivision, f.function_name, f.salary
+                            ORDER BY f.function_name;
+                            """)
+            docs = db.query_columns("""
+                            SELECT doc_id, doc_name, function_id, time, number, period
+                            FROM Document
+                            ORDER BY doc_id;
+                            """)
+            hour_year = db.query("""SELECT hour_year FROM Work_time_info WHERE current_year=%s;""", (year,))
+        if not hour_year:
+            raise ValueError(f"Нет данных о рабочем времени за {year} год")
+        func_index = {func_id: i for i, func_id in enumerate(funcs["id"].tolist())}
+        doc_func = np.fromiter((func_index[func_id] for func_id in docs["function_id"].tolist()),
+                               dtype=np.int64, count=len(docs["function_id"]))
+        return cls(year, docs["doc_id"], docs["doc_name"], doc_func,
+                   np.asarray(docs["time"], dtype=np.float64),
+                   np.asarray(docs["number"], dtype=np.float64),
+                   np.asarray(docs["period"], dtype=np.float64),
+                   funcs["struct_subdivision"], funcs["function_name"],
+                   np.asarray(funcs["salary"], dtype=np.float64),
+                   np.asarray(funcs["number_of_exist_spec"], dtype=np.int64),
+                   float(hour_year[0][0]))
+
+    def documents(self) -> tuple[tuple[str, ...], list[tuple]]:
+        """
+        Возвращает текущие значения документов сценария.
+        :return: tuple[tuple[str, ...], list[tuple[int, str, str, float, float, float]]]
+        """
+        headers = ("Код документа", "Наименование документа", "Должность", "Время, ч", "Количество, шт.",
+                   "Периодичность шт./год")
+        functions = self.functions[self.doc_func].tolist() if len(self.doc_func) else []
+        return headers, list(zip(self.doc_ids.tolist(), self.doc_names.tolist(), functions,
+                                 self.time.tolist(), self.number.tolist(), self.period.tolist()))
+
+    def set_document(self, doc_id: int, **values: float) -> None:
+        """
+        Изменяет норму времени (time), количество (number) или периодичность (period) документа.
+        :param doc_id: int
+        :param values: float
+        :return: None
+        """
+        i = self._doc_index[doc_id]
+        for field, value in values.items():
+            if field not in self.doc_fields:
+                raise ValueError(f"Неизвестное поле документа: {field}")
+            getattr(self, field)[i] = float(value)
+
+    def set_hour_year(self, hour_year: float) -> None:
+        """
+        Изменяет количество рабочих часов в году.
+        :param hour_year: float
+        :return: None
+        """
+        if hour_year <= 0:
+            raise ValueError("Количество рабочих часов в году должно быть больше нуля")
+        self.hour_year = float(hour_year)
+
+    def reset(self) -> None:
+        """
+        Возвращает исходные значения, загруженные из базы.
+        :return: None
+        """
+        self.time = self.original["time"].copy()
+        self.number = self.original["number"].copy()
+        self.period = self.original["period"].copy()
+        self.hour_year = self.original["hour_year"]
+
+    def number_of_spec(self) -> np.ndarray:
+        """
+        Возвращает количество штатных единиц по каждой должности.
+        :return: np.ndarray
+        """
+        workload = np.bincount(self.doc_func, weights=self.number * self.period * self.time,
+                               minlength=len(self.functions))
+        return np.ceil(workload / self.hour_year).astype(np.int64)
+
+    def compute(self) -> dict[str, np.ndarray]:
+        """
+        Пересчитывает штатное расписание. Возвращает количество штатных единиц, отклонение от фактического
+        количества специалистов и фонд заработной платы по должностям.
+        :return: dict[str, np.ndarray]
+        """
+        number_of_spec = self.number_of_spec()
+        return {"number_of_spec": number_of_spec,
+                "deviation": number_of_spec - self.exist,
+                "salary_fund": number_of_spec * self.salary}
+
+    def staff_list(self) -> tuple[tuple[str, ...], list[tuple[str, str, int, float]]]:
+        """
+        Возвращает данные документа "Штатное расписание" для текущего сценария.
+        :return: tuple[tuple[str, str, str, str], list[tuple[str, str, int, float]]]
+        """
+        used = np.bincount(self.doc_func, minlength=len(self.functions)) > 0
+        rows = zip(self.subdivisions[used].tolist(), self.functions[used].tolist(),
+                   self.number_of_spec()[used].tolist(), self.salary[used].tolist())
+        return self.staff_headers, list(rows)
+
+    def missing_unit_info(self) -> tuple[tuple[str, ...], list[tuple[str, str, int, int, int]]]:
+        """
+        Возвращает данные документа "Форма справки о недостающих кадрах" для текущего сценария.
+        :return: tuple[tuple[str, str, str, str, str], list[tuple[str, str, int, int, int]]]
+        """
+        result = self.compute()
+        used = (np.bincount(self.doc_func, minlength=len(self.functions)) > 0) & (self.exist > 0)
+        rows = zip(self.subdivisions[used].tolist(), self.functions[used].tolist(),
+                   result["number_of_spec"][used].tolist(), self.exist[used].tolist(),
+                   result["deviation"][used].tolist())
+        return self.missing_headers, list(rows)
+
+    def salary_fund(self) -> float:
+        """
+        Возвращает общий фонд заработной платы по штатному расписанию сценария.
+        :return: float
+        """
+        return float(self.compute()["salary_fund"].sum())
+
+    def changed_documents(self) -> list[tuple[int, float, float, float]]:
+        """
+        Возвращает изменённые в сценарии документы: код, время, количество и периодичность.
+        :return: list[tuple[int, float, float, float]]
+        """
+        changed = np.zeros(len(self.doc_ids), dtype=bool)
+        for field in self.doc_fields:
+            changed |= getattr(self, field) != self.original[field]
+        return list(zip(self.doc_ids[changed].tolist(), self.time[changed].tolist(),
+                        self.number[changed].tolist(), self.period[changed].tolist()))
+
+    @invalidates_cache
+    def commit(self) -> int:
+        """
+        Записывает изменения сценария в базу данных одной транзакцией. Возвращает количество изменённых записей.
+        :return: int
+        """
+        changes = self.changed_documents()
+        hour_year_changed = self.hour_year != self.original["hour_year"]
+        with OlimpDatabase() as db:
+            for doc_id, time, number, period in changes:
+                db.execute("""
+                    UPDATE Document SET time=%s, number=%s, period=%s WHERE doc_id=%s;
+                """, (time, int(number), period, doc_id))
+            if hour_year_changed:
+                db.execute("""
+                    UPDATE Work_time_info SET hour_year=%s WHERE current_year=%s;
+                """, (int(self.hour_year), self.year))
+        self.original = {"time": self.time.copy(), "number": self.number.copy(), "period": self.period.copy(),
+                         "hour_year": self.hour_year}
+        return len(changes) + hour_year_changed
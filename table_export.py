@@ -0,0 +1,138 @@
+"""
+Потоковая выгрузка таблиц базы данных в CSV и Parquet для передачи данных в системы анализа. Строки читаются
+с сервера частями и сразу записываются в файл (в Parquet - отдельной группой строк с типизированными столбцами),
+поэтому объём используемой памяти не зависит от размера таблицы.
+
+Использование: python table_export.py <таблица> <файл.csv | файл.csv.gz | файл.parquet> [строк в части]
+"""
+from archive import HISTORY_TABLES
+from documents import DataHandler, OlimpDatabase
+import csv
+import gzip
+import sys
+
+EXPORT_BATCH_SIZE = 50000
+PARQUET_COMPRESSION = "zstd"
+FORMATS = {".parquet": "Parquet", ".csv": "CSV", ".csv.gz": "CSV (gzip)"}
+
+
+def exportable_tables() -> list[str]:
+    """
+    Возвращает имена таблиц базы, которые можно выгрузить, включая архивные.
+    :return: list[str]
+    """
+    return [obj.table for obj in DataHandler().data_list.values()] + list(HISTORY_TABLES)
+
+
+def table_query(table: str) -> str:
+    """
+    Возвращает запрос на выборку всей таблицы. Имя таблицы проверяется по списку exportable_tables,
+    так как не может быть передано параметром запроса.
+    :param table: str
+    :return: str
+    """
+    if table not in exportable_tables():
+        raise ValueError(f"Неизвестная таблица: {table}")
+    return f"SELECT * FROM {table} ORDER BY id;"
+
+
+def export_csv(sql: str, file_name: str, params: tuple | None = None, batch_size: int = EXPORT_BATCH_SIZE) -> int:
+    """
+    Записывает результат запроса в файл CSV (в кодировке UTF-8, с заголовком). Файл с расширением .gz
+    сжимается gzip. Возвращает количество выгруженных строк.
+    :param sql: str
+    :param file_name: str
+    :param params: tuple | None = None
+    :param batch_size: int = EXPORT_BATCH_SIZE
+    :return: int
+    """
+    opener = gzip.open if file_name.endswith(".gz") else open
+    count = 0
+    header = None
+    with OlimpDatabase() as db, opener(file_name, "wt", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        for names, _, rows in db.iter_rows(sql, params, batch_size):
+            if header is None:
+                header = names
+                writer.writerow(header)
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def export_parquet(sql: str, file_name: str, params: tuple | None = None, batch_size: int = EXPORT_BATCH_SIZE,
+                   compression: str = PARQUET_COMPRESSION, kinds: list[str] | None = None) -> int:
+    """
+    Записывает результат запроса в файл Parquet, по группе строк на каждую часть выборки. Типы столбцов берутся
+    из kinds (по схеме таблицы), из типов столбцов MySQL или определяются по значениям: части, в которых
+    у столбца ещё нет непустых значений, записываются после определения его типа, поэтому все группы строк
+    имеют одну схему. Требует установленного пакета pyarrow. Возвращает количество выгруженных строк.
+    :param sql: str
+    :param file_name: str
+    :param params: tuple | None = None
+    :param batch_size: int = EXPORT_BATCH_SIZE
+    :param compression: str = PARQUET_COMPRESSION
+    :param kinds: list[str] | None = None
+    :return: int
+    """
+    from columnar import infer_kinds, rows_to_columns, to_arrow
+    import pyarrow.parquet as pq
+
+    writer = None
+    pending = []
+    names = []
+    raw = False
+    count = 0
+
+    def flush() -> None:
+        nonlocal writer
+        for rows in pending:
+            table = to_arrow(rows_to_columns(rows, names, kinds, raw=raw), kinds)
+            if writer is None:
+                writer = pq.ParquetWriter(file_name, table.schema, compression=compression)
+            writer.write_table(table)
+        pending.clear()
+
+    try:
+        with OlimpDatabase() as db:
+            for names, raw_kinds, rows in db.iter_rows(sql, params, batch_size, raw=True):
+                raw = raw_kinds is not None
+                kinds = raw_kinds if raw else infer_kinds(rows, len(names), kinds)
+                pending.append(rows)
+                count += len(rows)
+                if None not in kinds:
+                    flush()
+        # Столбцы, в которых не оказалось ни одного значения, записываются как строковые.
+        flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def export_table(table: str, file_name: str, batch_size: int = EXPORT_BATCH_SIZE) -> int:
+    """
+    Выгружает таблицу базы в файл, формат определяется по расширению файла (см. FORMATS).
+    Возвращает количество выгруженных строк.
+    :param table: str
+    :param file_name: str
+    :param batch_size: int = EXPORT_BATCH_SIZE
+    :return: int
+    """
+    sql = table_query(table)
+    if file_name.endswith(".parquet"):
+        with OlimpDatabase() as db:
+            kinds = db.table_kinds(table)
+        return export_parquet(sql, file_name, batch_size=batch_size, kinds=kinds)
+    if file_name.endswith((".csv", ".csv.gz")):
+        return export_csv(sql, file_name, batch_size=batch_size)
+    raise ValueError(f"Неизвестный формат файла: {file_name}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print(__doc__.strip().splitlines()[-1])
+        print("Таблицы:", ", ".join(exportable_tables()))
+        sys.exit(1)
+    rows_count = export_table(sys.argv[1], sys.argv[2], *(int(arg) for arg in sys.argv[3:]))
+    print(f"Выгружено строк: {rows_count}")
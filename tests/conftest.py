@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Тесты выполняются на встроенной базе SQLite, созданной из OlimpDBsqlite.sql во временном каталоге.
+_TMP_DIR = tempfile.mkdtemp(prefix="olimp-tests-")
+os.environ.setdefault("OLIMP_DB_BACKEND", "sqlite")
+os.environ.setdefault("OLIMP_SQLITE_PATH", os.path.join(_TMP_DIR, "olimp.sqlite3"))
+os.environ.setdefault("OLIMP_SYNC_INTERVAL", "0")
+os.environ.setdefault("OLIMP_REPORT_CACHE_DIR", "")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,95 @@
+from datetime import date
+
+from documents import ChangeLog, OlimpDatabase, RESULT_CACHE, Units
+
+
+def test_pull_keeps_show_order():
+    version = ChangeLog.current_version()
+    _, rows = Units.show()
+    with OlimpDatabase() as db:
+        db.execute("UPDATE Specialist SET start_date=%s WHERE spec_id=%s", (date(1990, 1, 1), rows[-1].spec_id))
+    ChangeLog.pull(version)
+    _, patched = Units.show()
+    RESULT_CACHE.clear()
+    _, reloaded = Units.show()
+    assert [row.spec_id for row in patched][0] == rows[-1].spec_id
+    assert [row.start_date for row in patched] == [row.start_date for row in reloaded]
+
+
+def test_prune_keeps_last_entry_and_reports_gap():
+    _, rows = Units.show()
+    with OlimpDatabase() as db:
+        for row in rows[:3]:
+            db.execute("UPDATE Specialist SET spec_name=spec_name WHERE spec_id=%s", (row.spec_id,))
+        db.execute("UPDATE Change_log SET changed_at='2000-01-01 00:00:00';")
+    version = ChangeLog.current_version()
+    ChangeLog.prune(7)
+    with OlimpDatabase() as db:
+        assert db.query("SELECT version FROM Change_log;") == [(version,)]
+    assert ChangeLog.pull(version) == (version, {})
+    assert ChangeLog.pull(version - 1) == (version, None)
+
+
+def test_pull_picks_up_versions_committed_out_of_order(monkeypatch):
+    _, rows = Units.show()
+    first, second = rows[0], rows[1]
+    version = ChangeLog.current_version()
+    with OlimpDatabase() as db:
+        db.execute("UPDATE Specialist SET spec_name=%s WHERE spec_id=%s", ("Первый", first.spec_id))
+        db.execute("UPDATE Specialist SET spec_name=%s WHERE spec_id=%s", ("Второй", second.spec_id))
+        # Запись первой транзакции ещё не зафиксирована: опрос видит только запись второй.
+        delayed = db.query("SELECT version, table_name, row_key, operation FROM Change_log WHERE version>%s "
+                           "ORDER BY version", (version,))
+        assert [entry[0] for entry in delayed] == [version + 1, version + 2]
+        db.execute("DELETE FROM Change_log WHERE version=%s", (version + 1,))
+    latest, changes = ChangeLog.pull(version)
+    assert latest == version + 2
+    assert [key for rows_by_key in changes.values() for key, _ in rows_by_key] == [str(second.spec_id)]
+    assert ChangeLog.pull(latest) == (latest, {})
+    with OlimpDatabase() as db:
+        db.execute("INSERT INTO Change_log(version, table_name, row_key, operation) VALUES (%s, %s, %s, %s)",
+                   delayed[0])
+    pulled, changes = ChangeLog.pull(latest)
+    assert pulled == latest
+    assert [key for rows_by_key in changes.values() for key, _ in rows_by_key] == [str(first.spec_id)]
+    _, patched = Units.show()
+    names = {row.spec_id: row.spec_name for row in patched}
+    assert (names[first.spec_id], names[second.spec_id]) == ("Первый", "Второй")
+    assert ChangeLog.pull(latest) == (latest, {})
+    # Номер, который так и не был занят, перестаёт запрашиваться через CHANGE_LOG_GAP_TIMEOUT секунд.
+    with OlimpDatabase() as db:
+        db.execute("UPDATE Specialist SET spec_name=%s WHERE spec_id=%s", (first.spec_name, first.spec_id))
+        db.execute("UPDATE Specialist SET spec_name=%s WHERE spec_id=%s", (second.spec_name, second.spec_id))
+        db.execute("DELETE FROM Change_log WHERE version=%s", (latest + 1,))
+    assert ChangeLog.pull(latest)[0] == latest + 2
+    assert ChangeLog._gaps.keys() == {latest + 1}
+    monkeypatch.setattr("documents.CHANGE_LOG_GAP_TIMEOUT", 0)
+    assert ChangeLog.pull(latest + 2) == (latest + 2, {})
+    assert not ChangeLog._gaps
+
+
+def _replace(row, **values):
+    return type(row)(values.get(column.name, value) for column, value in zip(row.columns, row))
+
+
+def test_row_position_follows_show_and_user_sort():
+    _, rows = Units.show()
+    rows = list(rows)
+    moved = _replace(rows.pop(0), start_date=date(2100, 1, 1))
+    assert ChangeLog.row_position(Units, rows, moved) == len(rows)
+    earliest = _replace(moved, start_date=date(1900, 1, 1))
+    assert ChangeLog.row_position(Units, rows, earliest) == 0
+    # Запись с тем же значением ставится после равных, как при вставке bisect.insort.
+    same = _replace(moved, start_date=rows[1].start_date)
+    position = ChangeLog.row_position(Units, rows, same)
+    assert rows[position - 1].start_date == same.start_date
+    assert position == len(rows) or rows[position].start_date > same.start_date
+    # Таблица, отсортированная пользователем по убыванию имени.
+    index = [column.name for column in moved.columns].index("spec_name")
+    by_name = sorted(rows, key=lambda row: row.columns[index].sort_key(row[index]), reverse=True)
+    for name in ("", "Ж", "яяя"):
+        row = _replace(moved, spec_name=name)
+        position = ChangeLog.row_position(Units, by_name, row, (index, True))
+        placed = by_name[:position] + [row] + by_name[position:]
+        assert placed == sorted(placed, key=lambda item: item.columns[index].sort_key(item[index]), reverse=True)
+    assert ChangeLog.row_position(object, rows, moved) is None
@@ -0,0 +1,47 @@
+import io
+import os
+import re
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from pdf_export import _read_pdf, _ref, export_pdf
+
+HEADERS = ["№", "Должность", "Подразделение"]
+ROWS = [[i, f"Должность {i}", f"Подразделение {i % 7}"] for i in range(1, 301)]
+
+
+@pytest.fixture(scope="module")
+def merged(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("pdf")
+    single = str(directory / "single.pdf")
+    merged = str(directory / "merged.pdf")
+    page_count = export_pdf(single, "Штатное расписание", HEADERS, ROWS, workers=1)
+    assert export_pdf(merged, "Штатное расписание", HEADERS, ROWS, workers=2, chunk_pages=2) == page_count
+    assert page_count > 2
+    with open(merged, "rb") as file:
+        return file.read(), page_count
+
+
+def test_merged_pdf_structure(merged):
+    data, page_count = merged
+    xref = int(data[data.rindex(b"startxref") + len(b"startxref"):].split()[0])
+    assert data[xref:].startswith(b"xref")
+    entries = re.findall(rb"(\d{10}) 00000 n \n", data[xref:data.index(b"trailer", xref)])
+    for number, offset in enumerate(entries, 1):
+        assert data[int(offset):].startswith(b"%d 0 obj" % number)
+    objects, trailer = _read_pdf(data)
+    pages_root = objects[_ref(objects[_ref(trailer, b"/Root")], b"/Pages")]
+    assert int(re.search(rb"/Count (\d+)", pages_root).group(1)) == page_count
+    assert len(re.findall(rb"\d+ 0 R", pages_root)) == page_count
+
+
+def test_merged_pdf_pages(merged):
+    pypdf = pytest.importorskip("pypdf")
+    data, page_count = merged
+    reader = pypdf.PdfReader(io.BytesIO(data), strict=True)
+    assert len(reader.pages) == page_count
+    for number, page in enumerate(reader.pages, 1):
+        text = " ".join(page.extract_text().split())
+        assert f"Страница {number} из {page_count}" in text
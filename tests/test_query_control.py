@@ -0,0 +1,37 @@
+import threading
+import time
+
+import pytest
+
+from db_backends import get_backend
+from documents import OlimpDatabase, QueryCancelled, QueryControl
+
+SLOW_SQL = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x+1 FROM c WHERE x<100000000) SELECT count(*) FROM c"
+
+
+def test_cancel_does_not_wait_for_interrupt(monkeypatch):
+    interrupted = []
+
+    def slow_interrupt(conn):
+        time.sleep(0.5)
+        interrupted.append(time.monotonic())
+
+    monkeypatch.setattr(get_backend(), "interrupt", slow_interrupt)
+    control = QueryControl()
+    finished = []
+
+    def run():
+        with pytest.raises(QueryCancelled):
+            with control, OlimpDatabase() as db:
+                db.query(SLOW_SQL)
+        finished.append(time.monotonic())
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    time.sleep(0.2)
+    start = time.monotonic()
+    control.cancel()
+    assert time.monotonic() - start < 0.1
+    worker.join()
+    # Подключение возвращается в пул только после завершения прерывания.
+    assert interrupted and finished[0] >= interrupted[0]
@@ -0,0 +1,47 @@
+import sqlite3
+
+import db_backends
+from db_backends import ReplicaRouter, SQLiteBackend
+from documents import OlimpDatabase
+
+
+def _backend(path):
+    backend = SQLiteBackend(str(path))
+    backend.release(backend.acquire())
+    return backend
+
+
+def test_missing_change_log_disables_replica(tmp_path):
+    primary, replica = _backend(tmp_path / "primary.sqlite3"), _backend(tmp_path / "replica.sqlite3")
+    with sqlite3.connect(str(tmp_path / "primary.sqlite3")) as conn:
+        conn.execute("DROP TABLE Change_log")
+    router = ReplicaRouter(primary, replica, check_interval=0, retry_time=0)
+    assert router.acquire()[0] is primary
+    assert router.disabled
+
+
+def test_primary_error_reads_from_primary(tmp_path):
+    primary, replica = _backend(tmp_path / "primary.sqlite3"), _backend(tmp_path / "replica.sqlite3")
+    router = ReplicaRouter(primary, replica, check_interval=0, retry_time=60)
+    assert router.use_replica()
+
+    def broken_acquire():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    primary.acquire = broken_acquire
+    assert not router.use_replica()
+    assert not router.disabled
+
+
+def test_reads_do_not_mark_written(monkeypatch):
+    written = []
+    router = ReplicaRouter(db_backends.get_backend(), db_backends.get_backend())
+    monkeypatch.setattr(router, "written", lambda: written.append(True))
+    monkeypatch.setattr(db_backends, "_router", router)
+    with OlimpDatabase() as db:
+        db.execute("SELECT count(*) FROM Func;")
+        db.fetchall()
+    assert not written
+    with OlimpDatabase() as db:
+        db.execute("UPDATE Func SET salary=salary WHERE function_id=%s;", (-1,))
+    assert written
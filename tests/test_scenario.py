@@ -0,0 +1,51 @@
+import pytest
+
+from documents import DocumentHandler, OlimpDatabase, RESULT_CACHE
+from scenario import StaffingScenario
+
+YEAR = "2023"
+
+
+@pytest.fixture
+def staffing_data():
+    # Две дополнительные должности с документами, одна из них с действующим специалистом.
+    with OlimpDatabase() as db:
+        for function_id, name, salary in ((901, "Тестовый инженер", 50000), (902, "Тестовый техник", 30000)):
+            db.execute("INSERT INTO Func (function_id, function_name, struct_subdivision, salary) "
+                       "VALUES (%s, %s, %s, %s);", (function_id, name, "Тестовый отдел", salary))
+        ids = dict(db.query("SELECT function_id, id FROM Func WHERE function_id IN (%s, %s);", (901, 902)))
+        for doc_id, name, time, number, period, function_id in (
+                (9001, "Тестовый отчёт", 12.5, 40, 12, 901), (9002, "Тестовый акт", 3, 250, 4, 901),
+                (9003, "Тестовая заявка", 0.5, 700, 12, 902)):
+            db.execute("INSERT INTO Document (doc_id, doc_name, time, number, period, function_id) "
+                       "VALUES (%s, %s, %s, %s, %s, %s);", (doc_id, name, time, number, period, ids[function_id]))
+        db.execute("INSERT INTO Specialist (spec_id, spec_name, birthday, start_date, end_date, function_id) "
+                   "VALUES (%s, %s, %s, %s, %s, %s);", (9901, "Тестов Т.Т.", "1990-01-01", "2020-01-01", None, ids[901]))
+    RESULT_CACHE.clear()
+    yield
+    with OlimpDatabase() as db:
+        db.execute("DELETE FROM Specialist WHERE spec_id=%s;", (9901,))
+        db.execute("DELETE FROM Document WHERE doc_id IN (%s, %s, %s);", (9001, 9002, 9003))
+        db.execute("DELETE FROM Func WHERE function_id IN (%s, %s);", (901, 902))
+    RESULT_CACHE.clear()
+
+
+def test_scenario_matches_reports(staffing_data):
+    scenario = StaffingScenario.load(YEAR)
+    staff_list = DocumentHandler.staff_list(YEAR)
+    assert len(staff_list[1]) >= 3
+    assert scenario.staff_list() == staff_list
+    assert scenario.missing_unit_info() == DocumentHandler.missing_unit_info(YEAR)
+
+
+def test_scenario_recomputes_changed_document(staffing_data):
+    scenario = StaffingScenario.load(YEAR)
+    before = {row[1]: row[2] for row in scenario.staff_list()[1]}
+    # Норма времени заявки увеличивается на годовой фонд рабочего времени 10 штатных единиц.
+    scenario.set_document(9003, time=0.5 + 10 * scenario.hour_year / (700 * 12))
+    after = {row[1]: row[2] for row in scenario.staff_list()[1]}
+    assert after.pop("Тестовый техник") == before.pop("Тестовый техник") + 10
+    assert after == before
+    assert [doc_id for doc_id, *_ in scenario.changed_documents()] == [9003]
+    scenario.reset()
+    assert scenario.changed_documents() == []
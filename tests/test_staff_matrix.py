@@ -0,0 +1,24 @@
+from documents import DocumentHandler, OlimpDatabase, RESULT_CACHE
+
+
+def test_staff_matrix_matches_staff_list():
+    with OlimpDatabase() as db:
+        db.execute("INSERT INTO Work_time_info (current_year, hour_year, hour_day, day_year) VALUES (%s, %s, %s, %s);",
+                   (2031, 1600, 8, 200))
+        db.execute("INSERT INTO Work_time_info (current_year, hour_year, hour_day, day_year) VALUES (%s, %s, %s, %s);",
+                   (2032, 0, 8, 0))
+    RESULT_CACHE.clear()
+    try:
+        headers, rows = DocumentHandler.staff_matrix()
+        years = headers[2:]
+        assert "2023" in years and "2031" in years
+        for year in ("2023", "2031"):
+            column = headers.index(year)
+            expected = {function: number for _, function, number, _ in DocumentHandler.staff_list(year)[1]}
+            assert {row[1]: row[column] for row in rows} == expected
+        # Нулевой фонд рабочего времени: количество не определено, как NULL в SQL.
+        assert {row[headers.index("2032")] for row in rows} == {None}
+    finally:
+        with OlimpDatabase() as db:
+            db.execute("DELETE FROM Work_time_info WHERE current_year IN (%s, %s);", (2031, 2032))
+        RESULT_CACHE.clear()
@@ -0,0 +1,46 @@
+"""
+Проверка времени импорта модулей, необходимых для показа главного окна программы: `python -X importtime`
+в отдельном процессе, суммарное время не должно превышать бюджет, а тяжёлые необязательные модули не должны
+импортироваться до первого обращения к ним.
+"""
+import os
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET_MS = 400
+OPTIONAL_MODULES = ("pandas", "matplotlib", "numpy", "openpyxl", "xlsxwriter", "pyarrow")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_imports(module: str = "app_gui") -> tuple[dict[str, int], set[str]]:
+    """
+    Возвращает словарь, где ключами являются имена импортированных модулей верхнего уровня,
+    а значениями - суммарное время их импорта в микросекундах, и множество всех импортированных модулей.
+    :param module: str
+    :return: tuple[dict[str, int], set[str]]
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True, cwd=ROOT)
+    timings = {}
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imported.add(name.strip())
+        # Модули верхнего уровня записываются с одним пробелом, их время включает время вложенных импортов.
+        if not name[1:].startswith(" "):
+            timings[name.strip()] = int(cumulative)
+    return timings, imported
+
+
+def test_startup_import_budget():
+    timings, imported = measure_imports()
+    total_ms = sum(timings.values()) / 1000
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:5]
+    assert total_ms <= IMPORT_TIME_BUDGET_MS, f"{total_ms:.1f} мс, самые долгие: {slowest}"
+
+
+def test_startup_skips_optional_modules():
+    _, imported = measure_imports()
+    assert sorted(name for name in imported if name.split(".")[0] in OPTIONAL_MODULES) == []
@@ -0,0 +1,24 @@
+import pytest
+
+from table_export import export_parquet, export_table
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_export_table_with_small_batches(tmp_path):
+    file_name = str(tmp_path / "specialist.parquet")
+    count = export_table("Specialist", file_name, batch_size=1)
+    table = pq.read_table(file_name)
+    assert table.num_rows == count
+    assert str(table.schema.field("end_date").type) == "date32[day]"
+    assert str(table.schema.field("spec_id").type) == "int64"
+
+
+def test_export_query_infers_kinds_after_null_batches(tmp_path):
+    file_name = str(tmp_path / "orders.parquet")
+    sql = "SELECT spec_id, end_date FROM Specialist ORDER BY end_date IS NOT NULL, id;"
+    count = export_parquet(sql, file_name, batch_size=1)
+    table = pq.read_table(file_name)
+    assert table.num_rows == count
+    assert str(table.schema.field("end_date").type) == "date32[day]"
+    assert table.column("end_date").null_count < count
@@ -0,0 +1,17 @@
+import sqlite3
+
+import pytest
+
+from documents import OlimpDatabase
+
+
+def test_failed_write_leaves_no_rows():
+    with pytest.raises(sqlite3.IntegrityError):
+        with OlimpDatabase() as db:
+            db.execute("INSERT INTO Dismissal_info (reason_id, short_reason, full_reason) VALUES (%s, %s, %s);",
+                       (901, "Тестовая причина", "Тестовая расшифровка причины"))
+            # Повторяет short_reason первой строки и нарушает ограничение UNIQUE.
+            db.execute("INSERT INTO Dismissal_info (reason_id, short_reason, full_reason) VALUES (%s, %s, %s);",
+                       (902, "Тестовая причина", "Другая расшифровка"))
+    with OlimpDatabase() as db:
+        assert db.query("SELECT id FROM Dismissal_info WHERE reason_id IN (%s, %s);", (901, 902)) == []
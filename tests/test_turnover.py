@@ -0,0 +1,45 @@
+from datetime import date
+
+import numpy as np
+
+from turnover import TurnoverAnalytics
+
+NAT = np.datetime64("NaT")
+
+
+def _analytics() -> TurnoverAnalytics:
+    # A: работает без даты увольнения; уволен ровно на границе периода 2021 г.; проработал год с середины 2021 г.
+    # B: принят в 2022 г. и работает.
+    functions = np.array(["A", "A", "A", "B"], dtype=object)
+    subdivisions = np.array(["Отдел", "Отдел", "Отдел", "Отдел"], dtype=object)
+    start = np.array(["2020-01-01", "2020-01-01", "2021-07-01", "2022-03-01"], dtype="datetime64[D]")
+    end = np.array([NAT, "2021-01-01", "2022-07-01", NAT], dtype="datetime64[D]")
+    return TurnoverAnalytics(functions, subdivisions, start, end, today=date(2023, 1, 1))
+
+
+def test_turnover_by_year():
+    _, rows = _analytics().turnover(by="function_name", first="2020", last="2022")
+    assert rows == [
+        ("A", "2020", 2.0, 2, 0, 0.0),
+        # Уволенный 2021-01-01 работает в этот день и увольняется в периоде, который начинается с этой даты.
+        ("A", "2021", 2.0, 1, 1, 50.0),
+        ("A", "2022", 1.5, 0, 1, 66.67),
+        ("B", "2022", 0.5, 1, 0, 0.0),
+    ]
+
+
+def test_turnover_by_month_counts_boundary_dismissal():
+    _, rows = _analytics().turnover(by=None, freq="M", first="2020-12", last="2021-01")
+    assert rows == [("Организация", "2020-12", 2.0, 0, 0, 0.0), ("Организация", "2021-01", 1.5, 0, 1, 66.67)]
+
+
+def test_average_tenure():
+    analytics = _analytics()
+    assert analytics.tenure_days.tolist() == [1096, 366, 365, 306]
+    _, rows = analytics.average_tenure(by="function_name")
+    assert rows == [("A", 3, 1.67, 2, 1.0), ("B", 1, 0.84, 0, None)]
+
+
+def test_retention():
+    _, rows = _analytics().retention(by="function_name", horizon=2)
+    assert rows == [("A", "2020", 2, 100.0, 50.0), ("A", "2021", 1, 0.0, None), ("B", "2022", 1, None, None)]
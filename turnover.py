@@ -0,0 +1,203 @@
+"""
+Анализ текучести кадров: коэффициент текучести по месяцам и годам, средний стаж работы и удержание сотрудников
+по годам приёма на работу. Данные о всех сотрудниках загружаются одним запросом, показатели вычисляются
+операциями NumPy над массивами дат без обработки каждого сотрудника в отдельности.
+"""
+from datetime import date
+from documents import OlimpDatabase
+import numpy as np
+
+DAYS_IN_YEAR = 365.25
+GROUPS = {"function_name": "Должность", "struct_subdivision": "Структурное подразделение", None: "Организация"}
+
+
+def _dates(values) -> np.ndarray:
+    """
+    Приводит столбец дат (datetime64, date или строки ISO) к массиву datetime64[D], пустые значения - NaT.
+    :param values: np.ndarray
+    :return: np.ndarray
+    """
+    return np.asarray(values, dtype="datetime64[D]")
+
+
+def _percent(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """
+    Возвращает отношение в процентах, округлённое до сотых. При нулевом знаменателе - NaN.
+    :param numerator: np.ndarray
+    :param denominator: np.ndarray
+    :return: np.ndarray
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.round(np.where(denominator > 0, numerator / denominator * 100, np.nan), 2)
+
+
+class TurnoverAnalytics:
+    """
+    Класс описывает показатели текучести кадров, вычисляемые по датам приёма и увольнения сотрудников.
+    Дата увольнения берётся из Specialist.end_date, а если она не указана - из приказа об увольнении.
+    """
+
+    def __init__(self, function_names: np.ndarray, subdivisions: np.ndarray, start: np.ndarray, end: np.ndarray,
+                 today: date | None = None):
+        self.columns = {"function_name": function_names, "struct_subdivision": subdivisions}
+        self.start = _dates(start)
+        self.end = _dates(end)
+        self.today = np.datetime64(today or date.today(), "D")
+
+    @classmethod
+    def load(cls, today: date | None = None) -> "TurnoverAnalytics":
+        """
+        Загружает даты приёма и увольнения всех сотрудников, включая перенесённых в архив, одним запросом.
+        :param today: date | None = None
+        :return: TurnoverAnalytics
+        """
+        with OlimpDatabase() as db:
+            columns = db.query_columns("""
+                            SELECT f.function_name, f.struct_subdivision, sp.start_date, sp.end_date, ood.order_date
+                            FROM Func as f
+                            JOIN Specialist_all as sp ON f.id=sp.function_id
+                            LEFT JOIN (SELECT spec_id, min(order_date) as order_date
+                                       FROM Order_of_dismissal_all
+                                       GROUP BY spec_id) as ood ON sp.id=ood.spec_id;
+                            """)
+        end = _dates(columns["end_date"])
+        end = np.where(np.isnat(end), _dates(columns["order_date"]), end)
+        return cls(columns["function_name"], columns["struct_subdivision"], columns["start_date"], end, today)
+
+    def _group(self, by: str | None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Возвращает наименования групп и номер группы для каждого сотрудника.
+        :param by: str | None - "function_name", "struct_subdivision" или None (вся организация)
+        :return: tuple[np.ndarray, np.ndarray]
+        """
+        if by is None:
+            return np.array([GROUPS[None]], dtype=object), np.zeros(len(self.start), dtype=np.int64)
+        if by not in self.columns:
+            raise ValueError(f"Неизвестная группировка: {by}")
+        labels, codes = np.unique(self.columns[by].astype(str), return_inverse=True)
+        return labels, codes.reshape(-1)
+
+    @property
+    def tenure_days(self) -> np.ndarray:
+        """
+        Возвращает стаж каждого сотрудника в днях на дату увольнения или на текущую дату.
+        :return: np.ndarray
+        """
+        end = np.where(np.isnat(self.end) | (self.end > self.today), self.today, self.end)
+        return (end - self.start).astype(np.int64)
+
+    def turnover(self, by: str | None = "function_name", freq: str = "Y", first: str | None = None,
+                 last: str | None = None) -> tuple[tuple[str, ...], list[tuple]]:
+        """
+        Возвращает коэффициент текучести кадров по группам за каждый год (freq="Y") или месяц (freq="M"):
+        отношение числа уволенных к средней численности (среднее численности на начало и конец периода).
+        Численность на дату считается двоичным поиском по отсортированным датам приёма и увольнения.
+        :param by: str | None = "function_name"
+        :param freq: str = "Y"
+        :param first: str | None = None - первый период ("2020" или "2020-01")
+        :param last: str | None = None - последний период
+        :return: tuple[tuple[str, ...], list[tuple[str, str, float, int, int, float]]]
+        """
+        if freq not in ("Y", "M"):
+            raise ValueError(f"Неизвестная периодичность: {freq}")
+        unit = f"datetime64[{freq}]"
+        headers = (GROUPS[by], "Период", "Средняя численность", "Принято", "Уволено", "Текучесть, %")
+        if not len(self.start):
+            return headers, []
+        labels, codes = self._group(by)
+        first_period = np.datetime64(first, freq) if first else self.start.min().astype(unit)
+        last_period = np.datetime64(last, freq) if last else self.today.astype(unit)
+        periods = np.arange(first_period, last_period + 1)
+        if not len(periods):
+            return headers, []
+        bounds = np.append(periods, periods[-1] + 1).astype("datetime64[D]").astype(np.int64)
+
+        start = self.start.astype(np.int64)
+        end_days = self.end.astype(np.int64)
+        lo = min(start.min(), bounds[0])
+        hi = max(start.max(), bounds[-1], end_days[~np.isnat(self.end)].max(initial=lo)) + 1
+        # Сотрудники без даты увольнения считаются работающими после любой рассматриваемой даты.
+        end = np.where(np.isnat(self.end), hi, end_days)
+        span = hi - lo + 1
+        start_keys = np.sort(codes * span + (start - lo))
+        end_keys = np.sort(codes * span + (end - lo))
+        query = np.arange(len(labels))[:, np.newaxis] * span + (bounds - lo)[np.newaxis, :]
+        # Количество сотрудников группы с датой меньше границы: ключи группы начинаются с group * span.
+        offset_start = np.searchsorted(start_keys, np.arange(len(labels)) * span)[:, np.newaxis]
+        offset_end = np.searchsorted(end_keys, np.arange(len(labels)) * span)[:, np.newaxis]
+        started = np.searchsorted(start_keys, query, side="right") - offset_start
+        started_before = np.searchsorted(start_keys, query) - offset_start
+        ended_before = np.searchsorted(end_keys, query) - offset_end
+
+        # Дата увольнения - последний рабочий день: в этот день сотрудник входит в численность, а увольнение
+        # относится к периоду, в который попадает эта дата.
+        headcount = started - ended_before
+        average = (headcount[:, :-1] + headcount[:, 1:]) / 2
+        hired = np.diff(started_before, axis=1)
+        dismissed = np.diff(ended_before, axis=1)
+        rate = _percent(dismissed, average)
+
+        period_labels = periods.astype(str).tolist()
+        result = []
+        for g, label in enumerate(labels.tolist()):
+            for p in np.flatnonzero((average[g] > 0) | (hired[g] > 0) | (dismissed[g] > 0)).tolist():
+                result.append((label, period_labels[p], float(average[g, p]), int(hired[g, p]),
+                               int(dismissed[g, p]), None if np.isnan(rate[g, p]) else float(rate[g, p])))
+        return headers, result
+
+    def average_tenure(self, by: str | None = "function_name") -> tuple[tuple[str, ...], list[tuple]]:
+        """
+        Возвращает средний стаж работы (в годах) всех сотрудников и уволенных сотрудников по группам.
+        :param by: str | None = "function_name"
+        :return: tuple[tuple[str, ...], list[tuple[str, int, float, int, float | None]]]
+        """
+        headers = (GROUPS[by], "Количество сотрудников", "Средний стаж, лет", "Уволено",
+                   "Средний стаж уволенных, лет")
+        if not len(self.start):
+            return headers, []
+        labels, codes = self._group(by)
+        years = self.tenure_days / DAYS_IN_YEAR
+        dismissed = ~np.isnat(self.end) & (self.end <= self.today)
+        count = np.bincount(codes, minlength=len(labels))
+        dismissed_count = np.bincount(codes, weights=dismissed, minlength=len(labels))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average = np.round(np.bincount(codes, weights=years, minlength=len(labels)) / count, 2)
+            average_dismissed = np.round(np.bincount(codes, weights=years * dismissed, minlength=len(labels))
+                                         / dismissed_count, 2)
+        return headers, [(label, int(count[g]), float(average[g]), int(dismissed_count[g]),
+                          None if np.isnan(average_dismissed[g]) else float(average_dismissed[g]))
+                         for g, label in enumerate(labels.tolist()) if count[g]]
+
+    def retention(self, by: str | None = None, horizon: int = 5) -> tuple[tuple[str, ...], list[tuple]]:
+        """
+        Возвращает кривые удержания по годам приёма на работу: долю сотрудников, проработавших не менее
+        1, 2, ..., horizon лет, среди тех, с даты приёма которых прошло не менее стольких же лет.
+        :param by: str | None = None
+        :param horizon: int = 5
+        :return: tuple[tuple[str, ...], list[tuple[str, str, int, float | None, ...]]]
+        """
+        headers = (GROUPS[by], "Год приёма", "Принято", *(f"Удержание {k} г., %" for k in range(1, horizon + 1)))
+        if not len(self.start):
+            return headers, []
+        labels, codes = self._group(by)
+        cohorts = self.start.astype("datetime64[Y]").astype(np.int64)
+        first_cohort = cohorts.min()
+        cohort_count = cohorts.max() - first_cohort + 1
+        cell = codes * cohort_count + (cohorts - first_cohort)
+        size = np.bincount(cell, minlength=len(labels) * cohort_count)
+        tenure = self.tenure_days
+        elapsed = (self.today - self.start).astype(np.int64)
+        curves = []
+        for k in range(1, horizon + 1):
+            observed = elapsed >= k * DAYS_IN_YEAR
+            retained = observed & (tenure >= k * DAYS_IN_YEAR)
+            curves.append(_percent(np.bincount(cell, weights=retained, minlength=size.size),
+                                   np.bincount(cell, weights=observed, minlength=size.size)))
+        curves = np.column_stack(curves)
+        labels = labels.tolist()
+        result = []
+        for c in np.flatnonzero(size).tolist():
+            g, cohort = divmod(c, cohort_count)
+            result.append((labels[g], str(1970 + first_cohort + cohort), int(size[c]),
+                           *(None if np.isnan(value) else float(value) for value in curves[c])))
+        return headers, result
@@ -0,0 +1,94 @@
+"""
+Выгрузка всех документов программы в одну книгу xlsx, по листу на документ. Данные документов выбираются
+в фоновом потоке в одной транзакции согласованного чтения (DocumentHandler.all_reports), листы записываются
+в книгу по мере готовности данных, строки пишутся построчно без хранения всей книги в памяти.
+
+Использование: python workbook.py <файл.xlsx>
+"""
+from documents import DocumentHandler
+import queue
+import re
+import sys
+import threading
+
+SHEET_NAME_LENGTH = 31
+_SHEET_NAME_RE = re.compile(r"[\[\]:*?/\\]")
+_DONE = object()
+
+
+def sheet_name(title: str, used: set[str]) -> str:
+    """
+    Возвращает допустимое и уникальное в книге имя листа Excel для наименования документа.
+    :param title: str
+    :param used: set[str]
+    :return: str
+    """
+    base = _SHEET_NAME_RE.sub("_", title)[:SHEET_NAME_LENGTH]
+    name, number = base, 1
+    while name.lower() in used:
+        number += 1
+        suffix = f" ({number})"
+        name = base[:SHEET_NAME_LENGTH - len(suffix)] + suffix
+    used.add(name.lower())
+    return name
+
+
+def _produce(reports: queue.Queue) -> None:
+    """
+    Помещает в очередь данные документов, а по завершении - признак окончания или исключение.
+    :param reports: queue.Queue
+    :return: None
+    """
+    try:
+        for report in DocumentHandler.all_reports():
+            reports.put(report)
+    except BaseException as e:
+        reports.put(e)
+    else:
+        reports.put(_DONE)
+
+
+def export_all_reports(file_name: str) -> list[str]:
+    """
+    Сохраняет все документы в книгу xlsx. Возвращает список наименований выгруженных документов.
+    :param file_name: str
+    :return: list[str]
+    """
+    import xlsxwriter
+
+    reports = queue.Queue(maxsize=2)
+    producer = threading.Thread(target=_produce, args=(reports,), daemon=True)
+    producer.start()
+    workbook = xlsxwriter.Workbook(file_name, {"constant_memory": True, "default_date_format": "dd.mm.yyyy"})
+    titles, used = [], set()
+    report = None
+    try:
+        bold = workbook.add_format({"bold": True})
+        while (report := reports.get()) is not _DONE:
+            if isinstance(report, BaseException):
+                raise report
+            title, headers, rows = report
+            worksheet = workbook.add_worksheet(sheet_name(title, used))
+            for col, header in enumerate(headers):
+                width = max([len(str(header))] + [len(str(row[col])) for row in rows if row[col] is not None])
+                worksheet.set_column(col, col, width + 2)
+            worksheet.write(0, 0, title, bold)
+            worksheet.write_row(2, 0, headers, bold)
+            for row_num, row in enumerate(rows, start=3):
+                worksheet.write_row(row_num, 0, row)
+            titles.append(title)
+    finally:
+        # При ошибке записи очередь разбирается до конца, чтобы фоновый поток завершил транзакцию.
+        while report is not _DONE and not isinstance(report, BaseException):
+            report = reports.get()
+        producer.join()
+        workbook.close()
+    return titles
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    for exported in export_all_reports(sys.argv[1]):
+        print(exported)